@@ -2,10 +2,16 @@
 This module contaisn all the necessary arg parsing of jacc.
 """
 import argparse
+from fractions import Fraction
 from fpga_model import FPGAModel
 from fpga_primitives import ClockBlockConfiguration
+from fpga_templates import LANGUAGES, VERILOG
 import sys
 
+# Arguments that shape a single search, the searches over several requests (-cmtb auto, -cm, -finc and -finr) do
+# not support them
+BASE_MODE_ONLY_FLAGS = ("-pf", "-da", "-mppm", "-vcow", "-mw", "-dw", "-ratio", "-oc")
+
 arg_meta_information = [
     {
         "short_flag": "-h",
@@ -22,6 +28,44 @@ arg_meta_information = [
         "flag": "--use_relative_error_only_for_scoring",
         "help": "Activates the use of relative errors instead absoulte errors for scoring."
     },
+    {
+        "short_flag": "-ppm",
+        "flag": "--ppm_error",
+        "help": "Scores the candidates by their relative errors in parts per million."
+    },
+    {
+        "short_flag": "-ow",
+        "flag": "--output_weights",
+        "input": "<index>=<weight> [<index>=<weight> ...]",
+        "help": "Weights of the frequency errors of the output clocks for scoring (default 2), e.g. -ow 0=10 1=1"
+    },
+    {
+        "short_flag": "-psw",
+        "flag": "--phase_shift_weight",
+        "input": "<weight>",
+        "help": "Weight of the phase shift errors for scoring (default 1)."
+    },
+    {
+        "short_flag": "-vp",
+        "flag": "--vco_penalty",
+        "input": "<penalty>",
+        "help": "Adds penalty * (maximum vco frequency - vco frequency) / maximum vco frequency to the score,\n"
+                "\tso higher vco frequencies (less jitter) are preferred."
+    },
+    {
+        "short_flag": "-dp",
+        "flag": "--d_penalty",
+        "input": "<penalty>",
+        "help": "Adds penalty * (D - 1) to the score, so smaller D (higher PFD frequencies) are preferred."
+    },
+    {
+        "short_flag": "-ad",
+        "flag": "--auto_delta",
+        "input": "[{uniform, scaled}]",
+        "help": "Searches the smallest frequency deltas that still allow a configuration.\n"
+                "\tuniform (default): One delta is used for all output clocks, -fdelta<0-6> values are ignored.\n"
+                "\tscaled: The -fdelta<0-6> values (default 0.5) are multiplied by the smallest possible factor."
+    },
     {
         "short_flag": "-model",
         "flag": "--fpga_model_specification",
@@ -31,8 +75,18 @@ arg_meta_information = [
     {
         "short_flag": "-cmtb",
         "flag": "--cmt_block",
-        "input": "{mmcm, pll, MMCM, PLL}",
-        "help": "Specifies the desired clock management tile block."
+        "input": "{mmcm, pll, auto, MMCM, PLL, AUTO}",
+        "help": "Specifies the desired clock management tile block.\n"
+                "\tauto: Configures both blocks in parallel and uses the better one, the PLL is preferred on ties."
+    },
+    {
+        "short_flag": "-rp",
+        "flag": "--race_policy",
+        "input": "{wait, exact}",
+        "help": "Policy of \"-cmtb auto\".\n"
+                "\twait (default): Waits for the configurations of both blocks.\n"
+                "\texact: Cancels the MMCM as soon as the PLL found an exact configuration, the PLL is still\n"
+                "\tpreferred on ties."
     },
     {
         "short_flag": "-fin1",
@@ -41,6 +95,37 @@ arg_meta_information = [
         "help": "Specifies frequency of the input clock 1 for the CMT block.\n"
                 "\tNote: The boundaries of this value depend on the selected CMT block"
     },
+    {
+        "short_flag": "-finc",
+        "flag": "--input_frequency_candidates",
+        "input": "<frequency> [<frequency> ...]",
+        "help": "Treats the input frequency as free and ranks the given candidates by the delta score of their best\n"
+                "\tconfiguration. The configuration of the best candidate is used as result. -fin1 is ignored."
+    },
+    {
+        "short_flag": "-finr",
+        "flag": "--input_frequency_range",
+        "input": "<start> <stop> <step>",
+        "help": "Like -finc, with all candidates from start to stop (inclusive) in steps of step."
+    },
+    {
+        "short_flag": "-cm",
+        "flag": "--cheapest_model",
+        "input": "[<7-series model> ...]",
+        "help": "Solves the request for all fpga models (or all models of the given 7-series models) and uses the\n"
+                "\tcheapest model (artix-7 < kintex-7 < virtex-7, then slowest speed grade, lowest voltage) that has a\n"
+                "\tconfiguration.\n"
+                "\tNote: The arguments are still checked against the limitations of -model."
+    },
+    {
+        "short_flag": "-j",
+        "flag": "--jobs",
+        "input": "<number of processes>",
+        "help": "Maximum number of parallel processes for searches over several candidates.\n"
+                "\tDefault is the number of processors.\n"
+                "\tNote: The searches (-cmtb auto, -cm, -finc and -finr) do not support "
+                f"{', '.join(BASE_MODE_ONLY_FLAGS)}."
+    },
     {
         "short_flag": "-fout<0-6>",
         "flag": "--output_frequency_<0-6>",
@@ -115,6 +200,90 @@ arg_meta_information = [
         "flag": "--module",
         "help": "Output (console and/or file) will be in form of a generated verilog module."
     },
+    {
+        "short_flag": "-fmt",
+        "flag": "--format",
+        "input": "{text, json}",
+        "help": "Format of the console output.\n"
+                "\ttext (default): Human-readable presentation of the configuration followed by its verilog code.\n"
+                "\tjson: Configuration, expected values, score and solver statistics as JSON (schema version 1)."
+    },
+    {
+        "short_flag": "-pf",
+        "flag": "--pareto_front",
+        "help": "Lists the Pareto front of the configuration candidates over frequency error, phase error,\n"
+                "\tvco headroom (distance to the maximum vco frequency) and D."
+    },
+    {
+        "short_flag": "-da",
+        "flag": "--divider_alternatives",
+        "input": "<count>",
+        "help": "Number of the nearest legal output dividers that are considered for every phase shifted output\n"
+                "\t(default 1, the divider closest to the target frequency). Finer phase shifts of other dividers\n"
+                "\tcan lead to better scores."
+    },
+    {
+        "short_flag": "-mppm",
+        "flag": "--margin_ppm",
+        "input": "<ppm>",
+        "help": "Keeps the vco and pfd frequencies within their limitations for an input frequency drift of\n"
+                "\t+- <ppm> (e.g. the tolerance of the oscillator). Configurations with equal scores are ranked by\n"
+                "\ttheir worst-case margin."
+    },
+    {
+        "short_flag": "-vcow",
+        "flag": "--vco_window",
+        "input": "<min> <max>",
+        "help": "Restricts the vco frequency to [<min>; <max>] MHz, e.g. a high vco frequency for low jitter."
+    },
+    {
+        "short_flag": "-mw",
+        "flag": "--m_window",
+        "input": "<min> <max>",
+        "help": "Restricts M (CLKFBOUT_MULT) to [<min>; <max>]."
+    },
+    {
+        "short_flag": "-dw",
+        "flag": "--d_window",
+        "input": "<min> <max>",
+        "help": "Restricts D (DIVCLK_DIVIDE) to [<min>; <max>], e.g. -dw 1 1 for phase alignment."
+    },
+    {
+        "short_flag": "-ratio",
+        "flag": "--ratio",
+        "input": "<index>:<index>[=<ratio>] [...]",
+        "help": "Demands that the frequencies of two outputs have an exact ratio, e.g. -ratio 0:1 1:2 for a\n"
+                "\t1x/2x/4x family. The ratio of the target frequencies is used unless it is given (e.g. 0:1=2).\n"
+                "\tThe dividers of the outputs are derived from each other. Not supported with the divider cascade.\n"
+                "\tCan not be combined with \"-oc\"."
+    },
+    {
+        "short_flag": "-oc",
+        "flag": "--optimality_certificate",
+        "help": "Checks all output divider values within the deltas and certifies whether the configuration has the\n"
+                "\tbest score of all of them. Not supported with the divider cascade.\n"
+                "\tCan not be combined with \"-ad\"."
+    },
+    {
+        "short_flag": "-mn",
+        "flag": "--module_name",
+        "input": "<module name>",
+        "help": "Name of the generated module (default clk)."
+    },
+    {
+        "short_flag": "-hdl",
+        "flag": "--hdl",
+        "input": "{verilog, vhdl}",
+        "help": "Hardware description language of the generated code.\n"
+                "\tverilog (default): Verilog instance, or module if \"-m\" is used.\n"
+                "\tvhdl: VHDL entity with its architecture."
+    },
+    {
+        "short_flag": "-pn",
+        "flag": "--port_names",
+        "input": "<port>=<name> [<port>=<name> ...]",
+        "help": "Renames ports of the generated module, e.g. -pn clkin1=sys_clk locked=clk_locked"
+    },
 ]
 
 
@@ -140,11 +309,37 @@ def get_base_arg_parser(fpga_models: dict, program_name: str) -> argparse.Argume
                         )
 
     # Argument that allows choice between PLL and MMCM
-    parser.add_argument("-cmtb", "--cmt_block", type=str, choices=["mmcm", "pll", "MMCM", "PLL"], default="MMCM")
+    parser.add_argument("-cmtb", "--cmt_block", type=str, choices=["mmcm", "pll", "auto", "MMCM", "PLL", "AUTO"],
+                        default="MMCM")
+
+    # Argument that decides whether or not "-cmtb auto" waits for both blocks
+    parser.add_argument("-rp", "--race_policy", type=str, choices=["wait", "exact"], default="wait")
 
     # Optional Argument for configuration score
     parser.add_argument("-re", "--use_relative_error_only_for_scoring", action="store_true")
 
+    # Optional Arguments that replace the delta score by a weighted score, see fpga_scoring
+    parser.add_argument("-ppm", "--ppm_error", action="store_true")
+    parser.add_argument("-ow", "--output_weights", type=output_weight, nargs="+", default=[])
+    parser.add_argument("-psw", "--phase_shift_weight", type=float, default=1, action=verify_range(0, "+"))
+    parser.add_argument("-vp", "--vco_penalty", type=float, default=0, action=verify_range(0, "+"))
+    parser.add_argument("-dp", "--d_penalty", type=float, default=0, action=verify_range(0, "+"))
+
+    # Optional Argument that replaces the user deltas by the smallest possible ones
+    parser.add_argument("-ad", "--auto_delta", type=str, nargs="?", choices=["uniform", "scaled"], const="uniform",
+                        default=None)
+
+    # Arguments that treat the input frequency as free variable
+    parser.add_argument("-finc", "--input_frequency_candidates", type=float, nargs="+", default=None)
+    parser.add_argument("-finr", "--input_frequency_range", type=float, nargs=3, default=None)
+
+    # Argument that searches the cheapest fpga model for the request
+    parser.add_argument("-cm", "--cheapest_model", type=str, nargs="*", default=None,
+                        choices=sorted({key[0] for key in fpga_models if key != ("dummy", "dummy")}))
+
+    # Argument that limits the number of processes of parallel searches
+    parser.add_argument("-j", "--jobs", type=int, default=None, action=verify_range(1, "+"))
+
     # Argument that mutes console output
     parser.add_argument("-q", "--quiet", action="store_true")
 
@@ -154,6 +349,35 @@ def get_base_arg_parser(fpga_models: dict, program_name: str) -> argparse.Argume
     # Turns the output into a verilog module
     parser.add_argument("-m", "--module", action="store_true")
 
+    # Format of the console output
+    parser.add_argument("-fmt", "--format", type=str.lower, choices=["text", "json"], default="text",
+                        dest="output_format")
+
+    # Argument that lists the Pareto front of the candidates
+    parser.add_argument("-pf", "--pareto_front", action="store_true")
+
+    # Argument that considers more than the nearest output divider for phase shifted outputs
+    parser.add_argument("-da", "--divider_alternatives", type=int, default=1, action=verify_range(1, "+"))
+
+    # Argument that keeps the vco and pfd frequencies away from their limitations under input drift
+    parser.add_argument("-mppm", "--margin_ppm", type=float, default=None, action=verify_range(0, 999999))
+
+    # Arguments that restrict the search windows of the vco frequency, M and D
+    parser.add_argument("-vcow", "--vco_window", type=float, nargs=2, default=None, metavar=("MIN", "MAX"))
+    parser.add_argument("-mw", "--m_window", type=float, nargs=2, default=None, metavar=("MIN", "MAX"))
+    parser.add_argument("-dw", "--d_window", type=int, nargs=2, default=None, metavar=("MIN", "MAX"))
+
+    # Argument that demands exact frequency ratios between outputs, see fpga_ratio
+    parser.add_argument("-ratio", "--ratio", type=ratio, nargs="+", default=[])
+
+    # Argument that certifies the optimality of the configuration
+    parser.add_argument("-oc", "--optimality_certificate", action="store_true")
+
+    # Arguments for the generated module
+    parser.add_argument("-mn", "--module_name", type=str, default="clk")
+    parser.add_argument("-hdl", "--hdl", type=str.lower, choices=LANGUAGES, default=VERILOG)
+    parser.add_argument("-pn", "--port_names", type=port_name, nargs="+", default=[])
+
     return parser
 
 
@@ -213,6 +437,243 @@ def get_configuration_arg_parser(parent: argparse.ArgumentParser, fpga_model: FP
     return parser
 
 
+def add_model_argument(parser: argparse.ArgumentParser, fpga_models: dict) -> None:
+    """
+    Adds the fpga model argument to the parser of a mode.
+    :param parser: Parser of the mode
+    :param fpga_models: Dictionary of all supported fpga models
+    :return: None
+    """
+    parser.add_argument("-model", "--fpga_model_specification", nargs="+", default=("artix-7", "3", "1.0V"),
+                        action=verify_technical_specification(fpga_models),
+                        help="Specifies the used fpga model: <7-series model> <speed grade> [<voltage>]")
+
+
+def add_model_and_block_arguments(parser: argparse.ArgumentParser, fpga_models: dict) -> None:
+    """
+    Adds the fpga model and CMT block arguments to the parser of a mode.
+    :param parser: Parser of the mode
+    :param fpga_models: Dictionary of all supported fpga models
+    :return: None
+    """
+    add_model_argument(parser, fpga_models)
+
+    parser.add_argument("-cmtb", "--cmt_block", type=str, choices=["mmcm", "pll", "MMCM", "PLL"], default="MMCM",
+                        help="Specifies the desired clock management tile block.")
+
+
+def get_table_arg_parser(fpga_models: dict, default_input_frequencies: list) -> argparse.ArgumentParser:
+    """
+    Arg parser of the "table" mode, which precomputes a frequency table file.
+    :param fpga_models: Dictionary of all supported fpga models
+    :param default_input_frequencies: Input frequencies that are used if the user does not specify any
+    :return: ArgumentParser
+    """
+    parser = argparse.ArgumentParser(prog="jacc.py table",
+                                     description="Precomputes all achievable output frequencies of a CMT block for "
+                                                 "some input frequencies and writes them into a table file.")
+    add_model_and_block_arguments(parser, fpga_models)
+
+    parser.add_argument("-fin", "--input_frequencies", type=float, nargs="+", default=None,
+                        help="Input frequencies the table is computed for. Defaults to common oscillator frequencies "
+                             f"within the limits of the CMT block: {default_input_frequencies}")
+
+    parser.add_argument("-f", "--file", type=str, required=True, help="Path of the table file that is written.")
+
+    return parser
+
+
+def get_query_arg_parser(fpga_models: dict) -> argparse.ArgumentParser:
+    """
+    Arg parser of the "query" mode, which lists the achievable output frequencies closest to some targets.
+    :param fpga_models: Dictionary of all supported fpga models
+    :return: ArgumentParser
+    """
+    parser = argparse.ArgumentParser(prog="jacc.py query",
+                                     description="Lists the achievable output frequencies that are closest to the "
+                                                 "target frequency of each output.")
+    add_model_and_block_arguments(parser, fpga_models)
+
+    parser.add_argument("-fin1", "--input_frequency_1", type=float, dest="f_in_1", default=10,
+                        help="Specifies frequency of the input clock 1 for the CMT block.")
+
+    for index in range(7):
+        parser.add_argument(f"-fout{index}", f"--output_frequency_{index}", type=float, dest=f"f_out_{index}",
+                            help=f"Target frequency of the output clock {index}.")
+
+    parser.add_argument("-n", "--count", type=int, default=5, action=verify_range(1, "+"),
+                        help="Number of frequencies that are listed per output.")
+
+    parser.add_argument("-t", "--table", type=str, default=None,
+                        help="Frequency table file (see the \"table\" mode) that is used if it contains the input "
+                             "frequency.")
+
+    return parser
+
+
+def get_plan_arg_parser(fpga_models: dict) -> argparse.ArgumentParser:
+    """
+    Arg parser of the "plan" mode, which distributes the clocks of a design onto CMT blocks.
+    :param fpga_models: Dictionary of all supported fpga models
+    :return: ArgumentParser
+    """
+    parser = argparse.ArgumentParser(prog="jacc.py plan",
+                                     description="Distributes the clocks of a design onto as few CMT blocks as "
+                                                 "possible and generates one verilog module per CMT block.")
+    add_model_argument(parser, fpga_models)
+
+    parser.add_argument("-cmtb", "--cmt_blocks", type=str.lower, nargs="+", choices=["pll", "mmcm"],
+                        default=["pll", "mmcm"],
+                        help="Usable clock management tile blocks, the first one that can generate the clocks of a "
+                             "block is used.")
+
+    parser.add_argument("-c", "--clocks", type=str, required=True,
+                        help="JSON file with a list of clocks: "
+                             "[{\"name\": ..., \"f_in_1\": ..., \"f_out\": ..., \"delta\": ...}, ...]")
+
+    parser.add_argument("-p", "--module_prefix", type=str, default="clk_tile",
+                        help="The modules are named <module_prefix><number of the block>.")
+
+    parser.add_argument("-f", "--file", type=str, default=None,
+                        help="Writes the modules of all CMT blocks into the named file.")
+
+    parser.add_argument("-hdl", "--hdl", type=str.lower, choices=LANGUAGES, default=VERILOG,
+                        help="Hardware description language of the modules (default verilog).")
+
+    parser.add_argument("-pn", "--port_names", type=port_name, nargs="+", default=[],
+                        help="Renames ports of all modules: <port>=<name>, e.g. clkin1=sys_clk")
+
+    return parser
+
+
+def get_chain_arg_parser(fpga_models: dict) -> argparse.ArgumentParser:
+    """
+    Arg parser of the "chain" mode, which searches two cascaded CMT blocks.
+    :param fpga_models: Dictionary of all supported fpga models
+    :return: ArgumentParser
+    """
+    parser = argparse.ArgumentParser(prog="jacc.py chain",
+                                     description="Searches two cascaded CMT blocks, output 0 of the first block drives "
+                                                 "the input clock of the second block, which generates the outputs.")
+    add_model_argument(parser, fpga_models)
+
+    parser.add_argument("-first", "--first_cmt_block", type=str.lower, choices=["pll", "mmcm"], default="mmcm",
+                        help="CMT block that generates the intermediate frequency.")
+    parser.add_argument("-second", "--second_cmt_block", type=str.lower, choices=["pll", "mmcm"], default="mmcm",
+                        help="CMT block that generates the output frequencies.")
+
+    parser.add_argument("-fin1", "--input_frequency_1", type=float, dest="f_in_1", default=10,
+                        help="Specifies frequency of the input clock 1 of the first CMT block.")
+
+    for index in range(7):
+        parser.add_argument(f"-fout{index}", f"--output_frequency_{index}", type=float, dest=f"f_out_{index}",
+                            default=133.7 if index == 0 else None,
+                            help=f"Target frequency of the output clock {index} of the second CMT block.")
+        parser.add_argument(f"-fdelta{index}", f"--frequency_delta_{index}", type=float, dest=f"delta_{index}",
+                            action=verify_range(0, "+"),
+                            help=f"Highest allowed relative error of the output clock {index} (default 0.5).")
+
+    parser.add_argument("-m", "--module", action="store_true",
+                        help="Output will be in form of generated verilog modules.")
+
+    return parser
+
+
+def get_sweep_arg_parser(fpga_models: dict) -> argparse.ArgumentParser:
+    """
+    Arg parser of the "sweep" mode, which solves a request for a range of target frequencies of one output.
+    :param fpga_models: Dictionary of all supported fpga models
+    :return: ArgumentParser
+    """
+    parser = argparse.ArgumentParser(prog="jacc.py sweep",
+                                     description="Solves a request for a range of target frequencies of one output "
+                                                 "and writes one row per target frequency as CSV or JSON lines.")
+    add_model_and_block_arguments(parser, fpga_models)
+
+    parser.add_argument("-fin1", "--input_frequency_1", type=float, dest="f_in_1", default=10,
+                        help="Specifies frequency of the input clock 1 for the CMT block.")
+
+    for index in range(7):
+        parser.add_argument(f"-fout{index}", f"--output_frequency_{index}", type=float, dest=f"f_out_{index}",
+                            help=f"Target frequency of the output clock {index}, ignored for the swept output.")
+        parser.add_argument(f"-fdelta{index}", f"--frequency_delta_{index}", type=float, dest=f"delta_{index}",
+                            action=verify_range(0, "+"),
+                            help=f"Highest allowed relative error of the output clock {index} (default 0.5).")
+
+    parser.add_argument("-so", "--sweep_output", type=int, default=0, action=verify_range(0, 6),
+                        help="Index of the swept output clock.")
+
+    parser.add_argument("-fr", "--frequency_range", type=float, nargs=3, required=True,
+                        metavar=("START", "STOP", "STEP"),
+                        help="Target frequencies of the swept output from start to stop (inclusive) in steps of step.")
+
+    parser.add_argument("-re", "--use_relative_error_only_for_scoring", action="store_true",
+                        help="Activates the use of relative errors instead absolute errors for scoring.")
+
+    parser.add_argument("-of", "--output_format", type=str.lower, choices=["csv", "jsonl"], default="csv",
+                        help="Format of the rows.")
+
+    parser.add_argument("-f", "--file", type=str, default=None,
+                        help="Writes the rows into the named file instead of the standard output.")
+
+    parser.add_argument("-drp", "--drp_rom", type=str, default=None,
+                        help="Writes the DRP register values of every row into the named ROM initialization file "
+                             "($readmemh), configuration i belongs to row i. The entries of rows without a "
+                             "configuration keep the registers.")
+
+    parser.add_argument("-lt", "--lookup_tables", type=str, default=None,
+                        help="JSON file with the lock and filter look-up tables of XAPP888 for the DRP ROM: "
+                             "{\"lock\": [...], \"filter_low\": [...], \"filter_high\": [...], "
+                             "\"filter_optimized\": [...]}")
+
+    return parser
+
+
+def get_analyze_arg_parser(fpga_models: dict) -> argparse.ArgumentParser:
+    """
+    Arg parser of the "analyze" mode, which analyzes the selected configuration of a request under input drift.
+    :param fpga_models: Dictionary of all supported fpga models
+    :return: ArgumentParser
+    """
+    parser = argparse.ArgumentParser(prog="jacc.py analyze",
+                                     description="Solves a request and analyzes the selected configuration under the "
+                                                 "drift of the input frequency: output frequency ranges, worst-case "
+                                                 "errors and vco, pfd and input limit violations.")
+    add_model_and_block_arguments(parser, fpga_models)
+
+    parser.add_argument("-fin1", "--input_frequency_1", type=float, dest="f_in_1", default=10,
+                        help="Specifies frequency of the input clock 1 for the CMT block.")
+
+    for index in range(7):
+        parser.add_argument(f"-fout{index}", f"--output_frequency_{index}", type=float, dest=f"f_out_{index}",
+                            help=f"Target frequency of the output clock {index}.")
+        parser.add_argument(f"-fdelta{index}", f"--frequency_delta_{index}", type=float, dest=f"delta_{index}",
+                            action=verify_range(0, "+"),
+                            help=f"Highest allowed relative error of the output clock {index} (default 0.5).")
+
+    parser.add_argument("-re", "--use_relative_error_only_for_scoring", action="store_true",
+                        help="Activates the use of relative errors instead absolute errors for scoring.")
+
+    parser.add_argument("-dd", "--drift_distribution", type=str.lower, choices=["uniform", "normal"],
+                        default="uniform",
+                        help="Distribution of the input frequency drift: uniform within +- ppm or normal with the "
+                             "standard deviation ppm.")
+
+    parser.add_argument("-dppm", "--drift_ppm", type=float, default=50, action=verify_range(0, "+"),
+                        help="Drift of the input frequency in ppm (half width or standard deviation).")
+
+    parser.add_argument("-doff", "--drift_offset_ppm", type=float, default=0,
+                        help="Offset (mean) of the input frequency drift in ppm.")
+
+    parser.add_argument("-ds", "--drift_sigmas", type=float, default=3, action=verify_range(0, "+"),
+                        help="Number of standard deviations of the worst cases of the normal distribution.")
+
+    parser.add_argument("-of", "--output_format", type=str.lower, choices=["text", "json"], default="text",
+                        help="Format of the analysis.")
+
+    return parser
+
+
 def generate_help_string(arg_meta_information: list, program_name: str) -> str:
     usage_str = f"\nUsage: {program_name} [options]\n\n"
 
@@ -229,6 +690,34 @@ def generate_help_string(arg_meta_information: list, program_name: str) -> str:
     return usage_str + optional_arguments_str
 
 
+def port_name(string: str) -> tuple:
+    """
+    Type of the "--port_names" arguments.
+    :param string: <default port name>=<port name>
+    :return: Tuple (default port name, port name)
+    """
+    default_name, separator, name = string.partition("=")
+    if not separator or not default_name or not name:
+        raise argparse.ArgumentTypeError(f"\"{string}\" is not of the form <port>=<name>")
+    return default_name.lower(), name
+
+
+def output_weight(string: str) -> tuple:
+    """
+    Type of the "--output_weights" arguments.
+    :param string: <index>=<weight>
+    :return: Tuple (index, weight)
+    """
+    index, separator, weight = string.partition("=")
+    try:
+        index, weight = int(index), float(weight)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"\"{string}\" is not of the form <index>=<weight>")
+    if not separator or not 0 <= index <= 6 or weight < 0:
+        raise argparse.ArgumentTypeError(f"\"{string}\" needs an index in [0; 6] and a weight that is not negative")
+    return index, weight
+
+
 # Code modeled after: https://stackoverflow.com/a/4195302
 def verify_technical_specification(fpga_models: dict) -> argparse.Action:
     """
@@ -263,6 +752,25 @@ def verify_technical_specification(fpga_models: dict) -> argparse.Action:
     return ModelVerifier
 
 
+def ratio(string: str) -> tuple:
+    """
+    Type of the "--ratio" arguments.
+    :param string: <index>:<index>, optionally followed by =<ratio> (e.g. 0:1=2 or 0:2=3/2)
+    :return: Tuple (first index, second index, Fraction or None if the ratio of the target frequencies is used)
+    """
+    indices, separator, value = string.partition("=")
+    first, colon, second = indices.partition(":")
+    try:
+        first, second = int(first), int(second)
+        value = Fraction(value) if separator else None
+    except (ValueError, ZeroDivisionError):
+        raise argparse.ArgumentTypeError(f"\"{string}\" is not of the form <index>:<index>[=<ratio>]")
+    if not colon or not 0 <= first <= 6 or not 0 <= second <= 6 or first == second or \
+            (value is not None and value <= 0):
+        raise argparse.ArgumentTypeError(f"\"{string}\" needs two different indices in [0; 6] and a positive ratio")
+    return first, second, value
+
+
 # Code modeled after: https://stackoverflow.com/a/4195302
 def verify_range(start: float, end: float, specification: str = None) -> argparse.Action:
     class RangeVerifier(argparse.Action):
@@ -0,0 +1,271 @@
+"""
+This module contains the optimality certificate of jacc.
+The ClockingConfigurator chooses the divider of every output greedily (the one closest to the target frequency) and
+drops (M, D) combinations whose greedy dividers violate a delta. The certificate checks instead all output divider
+values within the deltas for every vco candidate and proves whether the selected configuration has the best score
+of all of them.
+
+Separable scores (see fpga_scoring.SeparableScoringFunction) are minimized output by output. For an output the valid
+dividers form a contiguous window of the divider lattice, which is found by binary search. The window is walked
+outwards from the ideal divider, the frequency cost grows with every step, so a side is pruned as soon as its frequency
+cost alone exceeds the second best cost of the output. The sums of the smallest frequency costs are lower bounds of
+the vco candidates, the candidates are visited in the order of these bounds and the rest is pruned as soon as a bound
+exceeds the runner-up score.
+"""
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from math import prod
+from fpga_configurator import ClockingConfigurator
+from fpga_primitives import ClockBlockConfiguration
+from fpga_scoring import SeparableScoringFunction, DeltaScore
+from utility import relative_error, period_to_frequency_mhz_precision, frequency_to_period_ns_precision
+
+# Tolerance of the lower bounds and scores, they are summed up in another order than the scores of the configurator
+SCORE_TOLERANCE = 1e-9
+
+
+@dataclass
+class OptimalityCertificate:
+    """
+    Result of "certify_optimality".
+    The search space contains all combinations of output dividers within the frequency deltas (and the output
+    frequency limitations) of all vco candidates. Combinations whose phase shifts violate their deltas are part of
+    the search space, but are no configurations.
+    """
+    selected_score: float
+    optimal_score: float
+    runner_up_score: float
+    optimal_configuration: ClockBlockConfiguration
+    vco_candidates: int
+    search_space: int
+    pruned_vco_candidates: int
+    evaluated_dividers: int
+    pruned_dividers: int
+
+    def is_optimal(self) -> bool:
+        """
+        :return: True if no configuration of the search space has a better score than the selected configuration
+        """
+        if self.optimal_score is None:
+            return self.selected_score is None
+        return self.selected_score is not None and self.selected_score <= self.optimal_score + SCORE_TOLERANCE
+
+
+@dataclass
+class OutputCosts:
+    """Best and second best divider of one output for one vco candidate"""
+    best_cost: float = None
+    best_divider: float = None
+    second_cost: float = None
+
+    def add(self, cost: float, divider: float) -> None:
+        if self.best_cost is None or cost < self.best_cost:
+            self.best_cost, self.best_divider, self.second_cost = cost, divider, self.best_cost
+        elif self.second_cost is None or cost < self.second_cost:
+            self.second_cost = cost
+
+    def get_bound(self) -> float:
+        """
+        :return: Cost above which a divider can neither become the best nor the second best one
+        """
+        return self.second_cost if self.second_cost is not None else float("inf")
+
+
+class OptimalityCheck:
+    def __init__(self, configurator: ClockingConfigurator, frequency_args: dict, phase_shift_args: dict,
+                 scoring_function: SeparableScoringFunction):
+        """
+        :param configurator: Used ClockingConfigurator, its primitive, fpga model and limitations are used
+        :param frequency_args: Arguments for "configure_frequency_parameters" as a kwargs dict
+        :param phase_shift_args: Arguments for "configure_phase_shift_parameters" as a kwargs dict
+        :param scoring_function: Scoring function of the configurator
+        """
+        if frequency_args.get("f_out_4_cascade", False):
+            raise ValueError("Error, the optimality certificate does not support the divider cascade")
+        if configurator.ratio_constraints:
+            raise ValueError("Error, the optimality certificate does not support ratio constraints")
+        if not isinstance(scoring_function, SeparableScoringFunction):
+            raise ValueError("Error, the optimality certificate needs a separable scoring function")
+
+        self.configurator = configurator
+        self.primitive = configurator.primitive
+        self.scoring_function = scoring_function
+        self.f_in_1 = frequency_args["f_in_1"]
+        # The output frequencies are computed from the input period like in "get_output_frequency"
+        self.f_in_from_period = period_to_frequency_mhz_precision(frequency_to_period_ns_precision(self.f_in_1))
+        self.vco_max = configurator.fpga.get_vco_max(self.primitive.specification)
+
+        self.output_frequencies = {int(key[-1]): value for key, value in frequency_args.items()
+                                   if "f_out_" in key and "cascade" not in key and value is not None}
+        self.deltas = {index: frequency_args.get(f"delta_{index}", 0.5) for index in self.output_frequencies}
+        self.phase_shifts = {int(key[-1]): value for key, value in phase_shift_args.items()
+                             if "phase_shift_" in key and value is not None}
+        # Defaults of "configure_phase_shift_parameters"
+        self.phase_shift_deltas = {index: phase_shift_args.get(f"delta_{index}", 0.15 if index == 0 else 0.5)
+                                   for index in self.phase_shifts}
+        self.lattices = {index: self.primitive.o_list[index].get_possible_values()
+                         for index in self.output_frequencies}
+
+        self.evaluated_dividers = 0
+        self.pruned_dividers = 0
+
+    def get_window(self, index: int, base: float) -> tuple:
+        """
+        :param base: M * f_in / D of the vco candidate
+        :return: Tuple (first position, end position) of the dividers of the lattice that are within the delta and the
+                 output frequency limitations
+        """
+        lattice = self.lattices[index]
+        target = self.output_frequencies[index]
+        delta = self.deltas[index]
+
+        def is_valid(divider: float) -> bool:
+            f_out = base / divider
+            return relative_error(target, f_out) <= delta and \
+                self.configurator.f_out_min <= f_out <= self.configurator.f_out_max
+
+        # The bounds are widened a little bit and then narrowed by the exact check
+        lower_divider = max(base / (target * (1 + delta)), base / self.configurator.f_out_max)
+        upper_divider = base / self.configurator.f_out_min
+        if delta < 1:
+            upper_divider = min(upper_divider, base / (target * (1 - delta)))
+        first = bisect_left(lattice, lower_divider * (1 - SCORE_TOLERANCE))
+        end = bisect_right(lattice, upper_divider * (1 + SCORE_TOLERANCE))
+        while first < end and not is_valid(lattice[first]):
+            first += 1
+        while end > first and not is_valid(lattice[end - 1]):
+            end -= 1
+        return first, end
+
+    def get_phase_shift_cost(self, index: int, divider: float):
+        """
+        :return: Cost of the phase shift that the divider allows, None if it violates the delta
+        """
+        if index not in self.phase_shifts:
+            return 0
+        target = self.phase_shifts[index]
+        phase_shift = self.primitive.get_phase_shift(index).copy()
+        ClockingConfigurator.set_phase_shift(phase_shift, divider, target)
+        if relative_error(target, phase_shift.value) > self.phase_shift_deltas[index]:
+            return None
+        return self.scoring_function.get_phase_shift_cost(index, target, phase_shift.value)
+
+    def get_output_costs(self, index: int, base: float, window: tuple) -> OutputCosts:
+        """
+        Walks the window outwards from the ideal divider and prunes each side by the frequency cost.
+        :return: OutputCosts of the output
+        """
+        lattice = self.lattices[index]
+        target = self.output_frequencies[index]
+        first, end = window
+        center = min(max(bisect_left(lattice, base / target), first), end)
+        costs = OutputCosts()
+
+        for positions in [range(center, end), range(center - 1, first - 1, -1)]:
+            for step, position in enumerate(positions):
+                divider = lattice[position]
+                frequency_cost = self.scoring_function.get_frequency_cost(index, target, base / divider)
+                if frequency_cost > costs.get_bound() + SCORE_TOLERANCE:
+                    self.pruned_dividers += len(positions) - step
+                    break
+                self.evaluated_dividers += 1
+                phase_shift_cost = self.get_phase_shift_cost(index, divider)
+                if phase_shift_cost is not None:
+                    costs.add(frequency_cost + phase_shift_cost, divider)
+        return costs
+
+    def get_lower_bound(self, index: int, base: float, window: tuple) -> float:
+        """
+        :return: Smallest frequency cost of the output within the window
+        """
+        lattice = self.lattices[index]
+        target = self.output_frequencies[index]
+        first, end = window
+        center = min(max(bisect_left(lattice, base / target), first), end)
+        return min(self.scoring_function.get_frequency_cost(index, target, base / lattice[position])
+                   for position in [center - 1, center] if first <= position < end)
+
+    def certify(self) -> OptimalityCertificate:
+        vco_candidates = self.configurator.get_vco_candidates(self.f_in_1)
+        search_space = 0
+        bounded_candidates = []
+        for m, d, _ in vco_candidates:
+            base = m * self.f_in_from_period / d
+            windows = {index: self.get_window(index, base) for index in self.output_frequencies}
+            size = prod(end - first for first, end in windows.values())
+            if size == 0:
+                continue
+            search_space += size
+            vco_cost = self.scoring_function.get_vco_cost(m * self.f_in_from_period / d, d, self.vco_max)
+            lower_bound = vco_cost + sum(self.get_lower_bound(index, base, window) for index, window in windows.items())
+            bounded_candidates.append((lower_bound, len(bounded_candidates), m, d, vco_cost, windows))
+        bounded_candidates.sort(key=lambda candidate: candidate[:2])
+
+        # Best and runner-up as tuples (score, m, d, dividers)
+        best, runner_up = None, None
+        pruned_vco_candidates = 0
+        for position, (lower_bound, _, m, d, vco_cost, windows) in enumerate(bounded_candidates):
+            if runner_up is not None and lower_bound > runner_up[0] + SCORE_TOLERANCE:
+                pruned_vco_candidates = len(bounded_candidates) - position
+                break
+            base = m * self.f_in_from_period / d
+            output_costs = {index: self.get_output_costs(index, base, window) for index, window in windows.items()}
+            if any(costs.best_cost is None for costs in output_costs.values()):
+                continue
+
+            score = vco_cost + sum(costs.best_cost for costs in output_costs.values())
+            dividers = {index: costs.best_divider for index, costs in output_costs.items()}
+            results = [(score, m, d, dividers)]
+            second_differences = [costs.second_cost - costs.best_cost for costs in output_costs.values()
+                                  if costs.second_cost is not None]
+            if second_differences:
+                results.append((score + min(second_differences), m, d, None))
+            for result in results:
+                if best is None or result[0] < best[0]:
+                    best, runner_up = result, best
+                elif runner_up is None or result[0] < runner_up[0]:
+                    runner_up = result
+
+        optimal_configuration = None if best is None else self.get_configuration(*best[1:])
+        selected = self.configurator.selected_candidate
+        return OptimalityCertificate(
+            selected_score=None if selected is None else self.score(selected),
+            optimal_score=None if optimal_configuration is None else self.score(optimal_configuration),
+            runner_up_score=None if runner_up is None else runner_up[0],
+            optimal_configuration=optimal_configuration,
+            vco_candidates=len(vco_candidates),
+            search_space=search_space,
+            pruned_vco_candidates=pruned_vco_candidates,
+            evaluated_dividers=self.evaluated_dividers,
+            pruned_dividers=self.pruned_dividers
+        )
+
+    def get_configuration(self, m, d, dividers: dict) -> ClockBlockConfiguration:
+        """
+        :return: New configuration with the dividers and the phase shifts of the outputs
+        """
+        configuration = self.configurator.get_configuration_from_vco_state(self.f_in_1, [m, d, dividers, {}])
+        for index, target in self.phase_shifts.items():
+            ClockingConfigurator.set_phase_shift(configuration.get_phase_shift(index), dividers[index], target)
+        return configuration
+
+    def score(self, configuration: ClockBlockConfiguration) -> float:
+        return self.scoring_function.score(configuration, self.output_frequencies, self.phase_shifts, self.vco_max)
+
+
+def certify_optimality(configurator: ClockingConfigurator, frequency_args: dict, phase_shift_args: dict = None,
+                       use_relative_error: bool = False) -> OptimalityCertificate:
+    """
+    Checks whether the selected configuration of the configurator has the best score of all output divider choices
+    within the deltas, see module docstring. The configurator has to be configured with the same arguments before.
+    :param configurator: ClockingConfigurator that solved the request
+    :param frequency_args: Arguments for "configure_frequency_parameters" as a kwargs dict
+    :param phase_shift_args: Arguments for "configure_phase_shift_parameters" as a kwargs dict
+    :param use_relative_error: Used if the configurator has no scoring function
+    :return: OptimalityCertificate
+    """
+    scoring_function = configurator.scoring_function
+    if scoring_function is None:
+        scoring_function = DeltaScore(use_relative_error)
+    return OptimalityCheck(configurator, frequency_args, {} if phase_shift_args is None else phase_shift_args,
+                           scoring_function).certify()
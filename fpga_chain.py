@@ -0,0 +1,230 @@
+"""
+This module contains the search for cascaded CMT chains.
+Output 0 of a first CMT block drives the input clock 1 of a second CMT block, which generates the requested outputs.
+
+A full search would solve the second block for every frequency the first block can generate.
+Instead the vco frequencies of the second block that allow every requested output within its delta are computed once as
+a list of intervals. For every M/D ratio of the second block these intervals are mapped back to intervals of
+intermediate frequencies, which are looked up in the sorted intermediate frequencies of the first block by binary search.
+Every hit tightens the allowed error (branch and bound), so the intervals shrink while the search goes on.
+"""
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from math import floor
+from fpga_configurator import ClockingConfigurator
+from fpga_model import FPGAModel
+from fpga_primitives import ClockBlockConfiguration
+from utility import relative_error
+
+# Relative tolerance of the interval limits, otherwise exact frequencies (delta 0) could be missed
+INTERVAL_TOLERANCE = 1e-9
+
+
+@dataclass
+class ChainResult:
+    """
+    Configurations of both blocks of a chain.
+    errors are the relative errors of the outputs of the second block, they contain the approximations of both blocks.
+    """
+    f_mid: float
+    first_configuration: ClockBlockConfiguration
+    second_configuration: ClockBlockConfiguration
+    errors: dict = field(default_factory=lambda: {})
+
+    def get_max_error(self) -> float:
+        return max(self.errors.values())
+
+
+def merge_intervals(intervals: list) -> list:
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def intersect_intervals(intervals_a: list, intervals_b: list) -> list:
+    """
+    :param intervals_a: Sorted list of disjoint intervals (start, end)
+    :param intervals_b: Sorted list of disjoint intervals (start, end)
+    :return: Sorted list of the disjoint intervals that are part of both lists
+    """
+    intersection = []
+    index_a = index_b = 0
+    while index_a < len(intervals_a) and index_b < len(intervals_b):
+        start = max(intervals_a[index_a][0], intervals_b[index_b][0])
+        end = min(intervals_a[index_a][1], intervals_b[index_b][1])
+        if start <= end:
+            intersection.append((start, end))
+        if intervals_a[index_a][1] < intervals_b[index_b][1]:
+            index_a += 1
+        else:
+            index_b += 1
+    return intersection
+
+
+def get_valid_vco_intervals(fpga: FPGAModel, primitive: ClockBlockConfiguration, output_frequencies: dict,
+                            deltas: dict) -> list:
+    """
+    :return: Sorted list of the intervals of vco frequencies that allow an output divider within the delta of every
+             output
+    """
+    specification = primitive.specification
+    intervals = [(fpga.get_vco_min(specification), fpga.get_vco_max(specification))]
+    for index, target_f_out in output_frequencies.items():
+        f_out_min = max(target_f_out * (1 - deltas[index]), fpga.get_f_out_min(specification))
+        f_out_max = min(target_f_out * (1 + deltas[index]), fpga.get_f_out_max(specification))
+        if f_out_min > f_out_max:
+            return []
+
+        output_intervals = merge_intervals([(f_out_min * o * (1 - INTERVAL_TOLERANCE),
+                                             f_out_max * o * (1 + INTERVAL_TOLERANCE))
+                                            for o in primitive.get_output_divider(index).get_possible_values()])
+        intervals = intersect_intervals(intervals, output_intervals)
+    return intervals
+
+
+def get_intermediate_frequencies(fpga: FPGAModel, primitive: ClockBlockConfiguration, f_in_1: float,
+                                 f_mid_min: float, f_mid_max: float) -> list:
+    """
+    :return: Sorted list of all distinct frequencies within [f_mid_min; f_mid_max] output 0 of the primitive can
+             generate
+    """
+    lattice = primitive.get_output_divider(0).get_possible_values()
+    intermediate_frequencies = set()
+    for _, _, f_vco in ClockingConfigurator(fpga, primitive).get_vco_candidates(f_in_1):
+        for o in lattice[bisect_left(lattice, f_vco / f_mid_max):bisect_right(lattice, f_vco / f_mid_min)]:
+            intermediate_frequencies.add(round(f_vco / o, 9))
+    return sorted(intermediate_frequencies)
+
+
+def get_output_errors(fpga: FPGAModel, primitive: ClockBlockConfiguration, f_vco: float,
+                      output_frequencies: dict) -> dict:
+    """
+    :return: Smallest relative error of every output for the vco frequency {index: error}
+    """
+    specification = primitive.specification
+    f_out_min, f_out_max = fpga.get_f_out_min(specification), fpga.get_f_out_max(specification)
+    errors = {}
+    for index, target_f_out in output_frequencies.items():
+        lattice = primitive.get_output_divider(index).get_possible_values()
+        position = bisect_left(lattice, f_vco / target_f_out)
+        errors[index] = min([relative_error(target_f_out, f_vco / o)
+                             for o in lattice[max(position - 1, 0):position + 1]
+                             if f_out_min <= f_vco / o <= f_out_max], default=float("inf"))
+    return errors
+
+
+def get_ratio_windows(fpga: FPGAModel, primitive: ClockBlockConfiguration, f_in_min: float, f_in_max: float) -> list:
+    """
+    Lists the distinct M/D ratios of the primitive with the interval of input frequencies they can be used for.
+    A ratio can be realized by several D, every D keeps the pfd frequency within its limitations for another interval
+    of input frequencies. These intervals overlap, so they are merged into one.
+    :return: List of tuples (ratio, minimal input frequency, maximal input frequency)
+    """
+    pfd_min, pfd_max = fpga.get_pfd_min(primitive.specification), fpga.get_pfd_max(primitive.specification)
+    windows = {}
+    for d in primitive.get_d_generator(end=floor(f_in_max / pfd_min)):
+        window_min, window_max = max(d * pfd_min, f_in_min), min(d * pfd_max, f_in_max)
+        if window_min > window_max:
+            continue
+        for m in primitive.get_m_generator():
+            ratio = m / d
+            if ratio in windows:
+                windows[ratio] = (min(windows[ratio][0], window_min), max(windows[ratio][1], window_max))
+            else:
+                windows[ratio] = (window_min, window_max)
+    return [(ratio, window_min, window_max) for ratio, (window_min, window_max) in windows.items()]
+
+
+def search_chain(fpga: FPGAModel, first_primitive: ClockBlockConfiguration, second_primitive: ClockBlockConfiguration,
+                 f_in_1: float, output_frequencies: dict, deltas: dict = None) -> ChainResult:
+    """
+    Searches the chain with the smallest maximum relative error of all outputs.
+    :param fpga: Used fpga model
+    :param first_primitive: Block that generates the intermediate frequency on its output 0
+    :param second_primitive: Block that generates the requested outputs from the intermediate frequency
+    :param f_in_1: Input frequency of the first block
+    :param output_frequencies: Target frequencies of the second block {output index: target frequency}
+    :param deltas: Allowed relative errors {output index: delta}, missing deltas default to 0.5
+    :return: ChainResult or None if no chain fulfills the deltas
+    """
+    deltas = {index: ({} if deltas is None else deltas).get(index, 0.5) for index in output_frequencies}
+    first_specification, second_specification = first_primitive.specification, second_primitive.specification
+
+    if not fpga.get_f_in_min(first_specification) <= f_in_1 <= fpga.get_f_in_max(first_specification):
+        return None
+    # Like the ClockingConfigurator the search needs the output 0
+    if 0 not in output_frequencies:
+        raise ValueError("Error, the output frequency 0 has to be specified")
+    for index in output_frequencies:
+        # Raises an error for outputs that do not exist
+        second_primitive.get_output_divider(index)
+
+    intermediate_frequencies = get_intermediate_frequencies(
+        fpga, first_primitive, f_in_1,
+        max(fpga.get_f_out_min(first_specification), fpga.get_f_in_min(second_specification)),
+        min(fpga.get_f_out_max(first_specification), fpga.get_f_in_max(second_specification)))
+
+    if not intermediate_frequencies:
+        return None
+    valid_vco_intervals = get_valid_vco_intervals(fpga, second_primitive, output_frequencies, deltas)
+
+    # Best chain so far as (maximum error, sum of errors, f_mid)
+    best = None
+    for ratio, f_mid_min, f_mid_max in get_ratio_windows(fpga, second_primitive, intermediate_frequencies[0],
+                                                         intermediate_frequencies[-1]):
+        # Only the vco intervals that can be reached with intermediate frequencies of the window (f_vco = f_mid * ratio)
+        first_interval = bisect_left(valid_vco_intervals, (f_mid_min * ratio,))
+        if first_interval > 0 and valid_vco_intervals[first_interval - 1][1] >= f_mid_min * ratio:
+            first_interval -= 1
+        last_interval = bisect_right(valid_vco_intervals, (f_mid_max * ratio, float("inf")))
+
+        for vco_start, vco_end in valid_vco_intervals[first_interval:last_interval]:
+            start = bisect_left(intermediate_frequencies, max(vco_start / ratio, f_mid_min))
+            end = bisect_right(intermediate_frequencies, min(vco_end / ratio, f_mid_max))
+            for f_mid in intermediate_frequencies[start:end]:
+                errors = get_output_errors(fpga, second_primitive, f_mid * ratio, output_frequencies)
+                key = (max(errors.values()), sum(errors.values()), f_mid)
+                if all(errors[index] <= deltas[index] * (1 + INTERVAL_TOLERANCE) for index in errors) and \
+                        (best is None or key < best):
+                    best = key
+                    # Only chains that are at least as good as the best one are of interest from now on
+                    deltas = {index: min(delta, best[0]) for index, delta in deltas.items()}
+                    valid_vco_intervals = get_valid_vco_intervals(fpga, second_primitive, output_frequencies, deltas)
+
+        # No chain can be better than an exact one
+        if best is not None and best[0] == 0:
+            break
+
+    if best is None:
+        return None
+    return configure_chain(fpga, first_primitive, second_primitive, f_in_1, best[2], output_frequencies, best[0])
+
+
+def configure_chain(fpga: FPGAModel, first_primitive: ClockBlockConfiguration,
+                    second_primitive: ClockBlockConfiguration, f_in_1: float, f_mid: float, output_frequencies: dict,
+                    max_error: float) -> ChainResult:
+    """
+    Configures both blocks of a chain with the ClockingConfigurator.
+    :return: ChainResult or None if the ClockingConfigurator does not find the configurations
+    """
+    first_configuration = ClockingConfigurator(fpga, first_primitive.get_new_instance()).configure_primitive(
+        {"f_in_1": f_in_1, "f_out_0": f_mid, "delta_0": INTERVAL_TOLERANCE}, {}, {})
+    if first_configuration is None:
+        return None
+
+    # The second block is driven by the actual output frequency of the first block
+    actual_f_mid = first_configuration.get_output_frequency(0)
+    second_configuration = ClockingConfigurator(fpga, second_primitive.get_new_instance()).configure_primitive(
+        {"f_in_1": actual_f_mid,
+         **{f"f_out_{index}": target_f_out for index, target_f_out in output_frequencies.items()},
+         **{f"delta_{index}": max_error + INTERVAL_TOLERANCE for index in output_frequencies}}, {}, {})
+    if second_configuration is None:
+        return None
+
+    errors = {index: relative_error(target_f_out, second_configuration.get_output_frequency(index))
+              for index, target_f_out in output_frequencies.items()}
+    return ChainResult(actual_f_mid, first_configuration, second_configuration, errors)
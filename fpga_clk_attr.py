@@ -5,30 +5,113 @@ https://www.xilinx.com/support/documentation/sw_manuals/xilinx14_1/7series_hdl.p
 https://www.xilinx.com/support/documentation/sw_manuals/xilinx14_1/7series_hdl.pdf#419842590
 """
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from typing import Any
 from bisect import bisect
+from functools import lru_cache
 from math import ceil, floor
 from utility import relative_error
 
 
 
-@dataclass
-class ClockAttribute(ABC):
-    """Base Class for all different kinds of Attributes that can be set in order to configure a fpga clock block"""
+# Properties of AttributeDescriptor in the order of the arguments of "get_attribute_descriptor"
+DESCRIPTOR_FIELDS = ("name", "default_value", "template", "start", "end", "decimal_places", "increment",
+                     "additional_values", "values")
+
+
+@dataclass(frozen=True)
+class AttributeDescriptor:
+    """
+    Constant properties of a clock attribute.
+    Descriptors are shared by all attributes with the same properties (see "get_attribute_descriptor"), an attribute
+    only stores its descriptor, its value and its on state.
+    """
     name: str
     default_value: Any
     template: str
+    start: float = None
+    end: float = None
+    decimal_places: int = None
+    increment: float = None
+    additional_values: tuple = ()
+    values: tuple = ()
+
+    def replace(self, **changes) -> "AttributeDescriptor":
+        """
+        The descriptor itself is never changed, since it is shared.
+        :param changes: Properties that are changed, e.g. increment=0.125
+        :return: Shared descriptor with the changed properties
+        """
+        return get_attribute_descriptor(*[changes[field_name] if field_name in changes else getattr(self, field_name)
+                                          for field_name in DESCRIPTOR_FIELDS])
+
 
-    on = False
-    value = None
+@lru_cache(maxsize=None, typed=True)
+def get_attribute_descriptor(name: str, default_value: Any, template: str, start: float = None, end: float = None,
+                             decimal_places: int = None, increment: float = None, additional_values: tuple = (),
+                             values: tuple = ()) -> AttributeDescriptor:
+    """
+    Returns the shared descriptor with the given properties, it is only created once.
+    The arguments have to be hashable, so lists (additional values, values) are passed as tuples.
+    :return: AttributeDescriptor
+    """
+    return AttributeDescriptor(name, default_value, template, start, end, decimal_places, increment,
+                               additional_values, values)
+
+
+class ClockAttribute(ABC):
+    """
+    Base Class for all different kinds of Attributes that can be set in order to configure a fpga clock block.
+    The constant properties (name, template, range, ...) are stored in a shared AttributeDescriptor, only the value and
+    the on state belong to the attribute.
+    """
+    __slots__ = ("descriptor", "value", "on")
 
-    def __post_init__(self) -> None:
+    def __init__(self, name: str, default_value: Any, template: str) -> None:
         """
         Sets the value of the attribute to the default value.
-        :return: None
         """
-        self.value = self.default_value
+        self.descriptor = get_attribute_descriptor(name, default_value, template)
+        self.value = default_value
+        self.on = False
+
+    @classmethod
+    def from_descriptor(cls, descriptor: AttributeDescriptor) -> "ClockAttribute":
+        """
+        Creates an attribute with the default value that shares the given descriptor.
+        :param descriptor: Descriptor of an attribute of this class
+        :return: New attribute
+        """
+        attribute = cls.__new__(cls)
+        attribute.descriptor = descriptor
+        attribute.value = descriptor.default_value
+        attribute.on = False
+        return attribute
+
+    def copy(self) -> "ClockAttribute":
+        """
+        :return: New attribute with the same descriptor, value and on state
+        """
+        attribute = object.__new__(type(self))
+        attribute.descriptor = self.descriptor
+        attribute.value = self.value
+        attribute.on = self.on
+        return attribute
+
+    @property
+    def name(self) -> str:
+        return self.descriptor.name
+
+    @property
+    def default_value(self) -> Any:
+        return self.descriptor.default_value
+
+    @property
+    def template(self) -> str:
+        return self.descriptor.template
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(name={self.name!r}, value={self.value!r}, on={self.on!r})"
 
     @abstractmethod
     def set_value(self, value: Any) -> None:
@@ -68,12 +151,35 @@ class ClockAttribute(ABC):
                     and type(self) == type(other))
 
 
-@dataclass
 class RangeAttribute(ClockAttribute):
     """Class for number Attributes whose value has to be within a specific range (e.g.: [0.0; 52.631])"""
-    start: float
-    end: float
-    decimal_places: int
+    __slots__ = ()
+
+    def __init__(self, name: str, default_value: float, template: str, start: float, end: float,
+                 decimal_places: int) -> None:
+        self.descriptor = get_attribute_descriptor(name, default_value, template, start, end, decimal_places)
+        self.value = default_value
+        self.on = False
+
+    @property
+    def start(self) -> float:
+        return self.descriptor.start
+
+    @start.setter
+    def start(self, start: float) -> None:
+        self.descriptor = self.descriptor.replace(start=start)
+
+    @property
+    def end(self) -> float:
+        return self.descriptor.end
+
+    @end.setter
+    def end(self, end: float) -> None:
+        self.descriptor = self.descriptor.replace(end=end)
+
+    @property
+    def decimal_places(self) -> int:
+        return self.descriptor.decimal_places
 
     def set_value(self, value: float) -> None:
         """
@@ -95,18 +201,37 @@ class RangeAttribute(ClockAttribute):
         Float values are truncated to their right amount of decimal places before being put into the string
         :return: Verilog module attribute representation of the attribute
         """
-        # Value is truncated here. Truncation is preferred over rounding because it is vivados way of doing things
-        value_str = str(int(self.value * 10 ** self.decimal_places) / (10 ** self.decimal_places))
-        return self.template.replace("@value@", value_str)
+        return self.template.replace("@value@", str(self.get_truncated_value()))
+
+    def get_truncated_value(self) -> float:
+        """
+        :return: The value truncated to the decimal places of this attribute
+        """
+        # Truncation is preferred over rounding because it is vivados way of doing things
+        return int(self.value * 10 ** self.decimal_places) / (10 ** self.decimal_places)
 
 
-@dataclass
 class IncrementRangeAttribute(RangeAttribute):
     """
     Class for Range Attributes whose value can only be incremented by a specific value. (e.g. 0.125)
     It also provides a generator (get_range_as_generator) which iterates through all possible values within the range.
     """
-    increment: float
+    __slots__ = ()
+
+    def __init__(self, name: str, default_value: float, template: str, start: float, end: float,
+                 decimal_places: int, increment: float) -> None:
+        self.descriptor = get_attribute_descriptor(name, default_value, template, start, end, decimal_places,
+                                                   increment)
+        self.value = default_value
+        self.on = False
+
+    @property
+    def increment(self) -> float:
+        return self.descriptor.increment
+
+    @increment.setter
+    def increment(self, increment: float) -> None:
+        self.descriptor = self.descriptor.replace(increment=increment)
 
     def set_and_correct_value(self, target_value: float) -> None:
         """
@@ -142,15 +267,27 @@ class IncrementRangeAttribute(RangeAttribute):
         else:
             self.value = upper_bound
 
+    def align_value(self, value: float, rounding) -> float:
+        """
+        :param value: Value within the range
+        :param rounding: ceil or floor, the direction of the alignment
+        :return: The possible value next to value (in the direction of rounding), value if it is possible already
+        """
+        steps = rounding(round((value - self.start) / self.increment, 9))
+        return self.start + steps * self.increment
+
     def get_range_as_generator(self, start: float = None, end: float = None) -> float:
         """
         Generator that goes through all possible values for the instance of RangeIncrementAttribute
-        :param start: Alternative start value for the generator
-        :param end: Alternative end value for the generator
+        :param start: Alternative start value for the generator, it is aligned to the next possible value
+        :param end: Alternative end value for the generator, it is aligned to the previous possible value
         :return: Last value that was produced by the generator. It is within the defined range.
         """
-        generator_start = self.start if start is None or start < self.start else start
-        generator_end = self.end if end is None or end > self.end else end
+        generator_start = self.start if start is None or start < self.start else self.align_value(start, ceil)
+        generator_end = self.end if end is None or end > self.end else self.align_value(end, floor)
+        # Empty ranges (e.g. narrow windows of the ClockingConfigurator) do not produce any value
+        if generator_start > generator_end:
+            return
         # Multiplication is used here because it is safer than Addition when it comes to floating point precision
         factor = 0
 
@@ -160,17 +297,31 @@ class IncrementRangeAttribute(RangeAttribute):
         yield generator_end
 
 
-@dataclass
 class OutputDivider(RangeAttribute):
     """
     Class specifically made for the output dividers (like CLKOUT1_DIVIDE).
     It seems very similar to IncrementRangeAttribute but it functionality is different.
     It does not use any of IncrementRangeAttributes' methods and does therefore not inherit from it.
     """
-    increment: float
-    # A list of values that can be set, but are not within the "range"
-    # Also https://docs.python.org/3/library/dataclasses.html#dataclasses.field
-    additional_values: list = field(default_factory=lambda: [])
+    __slots__ = ()
+
+    def __init__(self, name: str, default_value: float, template: str, start: float, end: float,
+                 decimal_places: int, increment: float, additional_values: list = ()) -> None:
+        """
+        :param additional_values: Values that can be set, but are not within the "range"
+        """
+        self.descriptor = get_attribute_descriptor(name, default_value, template, start, end, decimal_places,
+                                                   increment, tuple(additional_values))
+        self.value = default_value
+        self.on = False
+
+    @property
+    def increment(self) -> float:
+        return self.descriptor.increment
+
+    @property
+    def additional_values(self) -> tuple:
+        return self.descriptor.additional_values
 
     def set_value(self, value: float = None) -> None:
         """
@@ -181,6 +332,16 @@ class OutputDivider(RangeAttribute):
         """
         pass
 
+    def get_possible_values(self) -> tuple:
+        """
+        Returns all values this divider can be set to, sorted in ascending order.
+        The divider lattice only depends on the range, increment and additional values, so it is cached per lattice.
+        :return: Sorted tuple of all possible divider values
+        """
+        descriptor = self.descriptor
+        return get_divider_lattice(descriptor.start, descriptor.end, descriptor.increment,
+                                   descriptor.additional_values)
+
     def get_bounds_based_on_value(self, target_value: float) -> (float, float):
         """
         The target_value is often between two possible values.
@@ -192,13 +353,7 @@ class OutputDivider(RangeAttribute):
         :return: Nearest possible values. (lower boundary, upper boundary)
         """
         # ValueError check is not needed since it will be thrown anyway if bisect of str and numbers is attempted
-
-        # This list comprehension way is rather inefficient
-        # But it looks cleaner than going through "additional_values" and values within the range separately
-        possible_values = self.additional_values + [self.start + self.increment * n
-                                                    for n
-                                                    in range(round((self.end - self.start) / self.increment) + 1)]
-        possible_values.sort()
+        possible_values = self.get_possible_values()
         # Usage of the bisect method from bisect https://docs.python.org/3.7/library/bisect.html#module-bisect
         upper_bound_index = bisect(possible_values, target_value)
         if upper_bound_index == len(possible_values):
@@ -210,10 +365,34 @@ class OutputDivider(RangeAttribute):
         # -> Should never happen in the given fpga scenario
 
 
-@dataclass
+@lru_cache(maxsize=None)
+def get_divider_lattice(start: float, end: float, increment: float, additional_values: tuple = ()) -> tuple:
+    """
+    Computes all values of an output divider lattice.
+    Multiplication is used instead of addition to avoid the accumulation of floating point errors.
+    :param start: Smallest value of the divider range
+    :param end: Biggest value of the divider range
+    :param increment: Step width of the divider range
+    :param additional_values: Values that can be set but are not within the range
+    :return: Sorted tuple of all values
+    """
+    return tuple(sorted(list(additional_values) + [start + increment * n
+                                                   for n in range(round((end - start) / increment) + 1)]))
+
+
 class ListAttribute(ClockAttribute):
     """Class for Attributes whose values are limited to a specific (and small) list of predefined values."""
-    values: list
+    __slots__ = ()
+
+    def __init__(self, name: str, default_value: str, template: str, values: list) -> None:
+        self.descriptor = get_attribute_descriptor(name, default_value, template, None, None, None, None, (),
+                                                   tuple(values))
+        self.value = default_value
+        self.on = False
+
+    @property
+    def values(self) -> tuple:
+        return self.descriptor.values
 
     def set_value(self, value: str) -> None:
         """
@@ -222,7 +401,7 @@ class ListAttribute(ClockAttribute):
         :return: None
         """
         if value not in self.values:
-            raise ValueError(f"Error, value \"{value}\" is not valid. Valid values are {self.values}")
+            raise ValueError(f"Error, value \"{value}\" is not valid. Valid values are {list(self.values)}")
 
         self.value = value
         self.on = True
@@ -235,12 +414,12 @@ class ListAttribute(ClockAttribute):
         return self.template.replace("@value@", f"\"{self.value}\"")
 
 
-@dataclass
 class BoolAttribute(ClockAttribute):
     """
     Class for boolean Attributes.
     It may seem redundant, but it takes care of TypeErrors and the template instantiation
     """
+    __slots__ = ()
 
     def set_value(self, value: bool) -> None:
         """
@@ -1,11 +1,18 @@
 """
 This module contains the ClockingConfigurator class only.
 """
-from fpga_primitives import ClockBlockConfiguration
+from fpga_primitives import ClockBlockConfiguration, get_ratio_table
+from fpga_clk_attr import IncrementRangeAttribute
 from fpga_model import FPGAModel
-from math import floor, ceil
+from fpga_feasibility import check_feasibility
+from fpga_pareto import ParetoFront, get_pareto_point
+from fpga_ratio import get_ratio_groups
+from fpga_scoring import ScoringFunction, SeparableScoringFunction, DeltaScore
+from fpga_templates import VERILOG
+from bisect import bisect_left, bisect_right
+from math import floor, ceil, inf, gcd
 from operator import attrgetter, itemgetter
-from utility import relative_error
+from utility import relative_error, period_to_frequency_mhz_precision, frequency_to_period_ns_precision
 
 
 class ClockingConfigurator:
@@ -23,6 +30,47 @@ class ClockingConfigurator:
         self.selected_candidate = None
         self.f_in_1 = None
         self.d_min = None
+        self.output_frequencies = {}
+        self.delta_scale = None
+        self.feasibility_issues = []
+        # State of every (M, D) combination of the last solve: [m, d, {index: divider value}, {index: relative error}]
+        # It is only kept for requests without the cascade of divider 6 into divider 4 (see "update")
+        self.vco_states = []
+        # Number of (M, D) combinations of the last solve whose vco frequency is within the limitations, equivalent
+        # combinations are counted once (see "get_vco_candidates")
+        self.vco_candidate_count = 0
+        # Arguments of the last "configure_primitive" call
+        self.last_request = None
+        # Number of (M, D) combinations and configurations of the last solve that were left out because an equivalent
+        # one (same vco frequency and output dividers) was already considered
+        self.collapsed_equivalents = 0
+        # If set, the Pareto front of the candidates (see fpga_pareto) is collected while they are scored
+        self.collect_pareto_front = False
+        self.pareto_front = None
+        # Scoring function of the candidates (see fpga_scoring), None uses the delta score
+        self.scoring_function: ScoringFunction = None
+        self.use_relative_error = False
+        # Number of the nearest legal dividers that are considered for every phase shifted output,
+        # 1 keeps the divider that is closest to the target frequency
+        self.divider_alternatives = 1
+        self.output_deltas = {}
+        # If set, the vco and pfd frequencies have to stay within their limitations for a drift of the input frequency
+        # of +- margin_ppm, candidates with larger margins are preferred if their scores are equal
+        self.margin_ppm = None
+        # Worst-case margin in ppm of every vco candidate of the last "get_vco_candidates" call {(m, d): margin}
+        self.vco_margins = {}
+        # Search windows (minimum, maximum) of the vco frequency, M and D within the limitations, None is unrestricted
+        self.vco_window = None
+        self.m_window = None
+        self.d_window = None
+        # If set, the vco candidates are looked up in the (M, D) ratio table of the primitive (see "get_ratio_table").
+        # Building the table takes longer than one search through M and D, it pays off if a process solves many
+        # input frequencies (see fpga_search)
+        self.use_ratio_table = False
+        # RatioConstraints between outputs (see fpga_ratio), they are enforced through the output dividers
+        self.ratio_constraints = []
+        self.ratio_groups = []
+        self.ratio_outputs = set()
 
     def configure_primitive(self, frequency_args: dict, phase_shift_args: dict, other_args: dict,
                             duty_cycle_args: dict = None, use_relative_error: bool = False) -> ClockBlockConfiguration:
@@ -36,6 +84,17 @@ class ClockingConfigurator:
         :param other_args: Arguments for "configure_other_parameters" as a kwargs dict
         :return: The most fitting configuration candidate
         """
+        self.last_request = {"frequency_args": dict(frequency_args), "phase_shift_args": dict(phase_shift_args),
+                             "other_args": dict(other_args), "use_relative_error": use_relative_error}
+        self.use_relative_error = use_relative_error
+        # The delta scale is only searched by "configure_primitive_with_minimal_delta"
+        self.delta_scale = None
+
+        # Requests that can not be fulfilled at all are rejected before any M, D combination is evaluated
+        if self.check_feasibility(frequency_args, phase_shift_args):
+            self.vco_states = []
+            self.vco_candidate_count = self.collapsed_equivalents = 0
+            return self.reject_request()
 
         # This call is not part of the loop below because the frequency_args should never be empty
         # and this call is obligatory
@@ -51,8 +110,227 @@ class ClockingConfigurator:
             self.configure_duty_cycles_parameters(**duty_cycle_args)
         '''
 
+        return self.score_and_select_candidate(frequency_args, phase_shift_args, other_args, use_relative_error)
+
+    def configure_primitive_with_minimal_delta(self, frequency_args: dict, phase_shift_args: dict, other_args: dict,
+                                               use_relative_error: bool = False,
+                                               scale_user_deltas: bool = False) -> ClockBlockConfiguration:
+        """
+        Configures the primitive with the smallest frequency deltas that still allow a configuration.
+        The deltas are either one uniform delta for all outputs or the user deltas multiplied by one common scale.
+        The output dividers of a (M, D) combination do not depend on the deltas, the deltas only decide whether or not
+        a combination is kept.
+        So all combinations are computed only once without delta limitation and the smallest scale each of them needs
+        is derived from its errors. This makes the minimal scale exact and no search over scales is needed.
+        The minimal scale is saved in "delta_scale", the errors of the selection can be read with "get_achieved_errors".
+        :param frequency_args: Arguments for "configure_frequency_parameters" as a kwargs dict
+        :param phase_shift_args: Arguments for "configure_phase_shift_parameters" as a kwargs dict
+        :param other_args: Arguments for "configure_other_parameters" as a kwargs dict
+        :param use_relative_error:
+        :param scale_user_deltas: If True the user deltas (default 0.5) are scaled, otherwise one delta is used for all
+        :return: The most fitting configuration candidate
+        """
+        # "update" is only supported for requests of "configure_primitive"
+        self.last_request = None
+        self.use_relative_error = use_relative_error
+
+        targets = {key: value for key, value in frequency_args.items() if "delta_" not in key}
+        output_frequencies = {int(key[-1]): value for key, value in targets.items()
+                              if "f_out_" in key and "cascade" not in key}
+        base_deltas = {index: frequency_args.get(f"delta_{index}", 0.5) if scale_user_deltas else 1
+                       for index in output_frequencies}
+
+        # Unlimited deltas keep every (M, D) combination
+        unlimited_frequency_args = {**targets, **{f"delta_{index}": inf for index in output_frequencies}}
+        if self.check_feasibility(unlimited_frequency_args):
+            self.delta_scale = None
+            self.vco_candidate_count = self.collapsed_equivalents = 0
+            return self.reject_request()
+
+        self.configure_frequency_parameters(**unlimited_frequency_args)
+
+        if phase_shift_args:
+            self.configure_phase_shift_parameters(**phase_shift_args)
+
+        required_scales = [max([self.get_required_delta_scale(relative_error(target, config.get_output_frequency(index)),
+                                                              base_deltas[index])
+                                for index, target in output_frequencies.items()])
+                           for config in self.configuration_candidates]
+
+        self.delta_scale = min(required_scales) if required_scales and min(required_scales) < inf else None
+        self.configuration_candidates = [config
+                                         for config, scale in zip(self.configuration_candidates, required_scales)
+                                         if self.delta_scale is not None and scale <= self.delta_scale]
+
+        return self.score_and_select_candidate(frequency_args, phase_shift_args, other_args, use_relative_error)
+
+    def update(self, **changes) -> ClockBlockConfiguration:
+        """
+        Solves the request of the last "configure_primitive" call again with some changed arguments.
+        Changes of output frequencies and their deltas (e.g. f_out_2=125.0, delta_2=0.01) are incremental:
+        The state of every (M, D) combination is kept from the last solve, only the dividers of changed outputs are
+        computed again. A value of None removes an output or delta.
+        All other changes (and requests with the cascade of divider 6 into divider 4) lead to a full solve.
+        :param changes: Changed arguments of "configure_frequency_parameters"
+        :return: The most fitting configuration candidate
+        """
+        if self.last_request is None:
+            raise ValueError("Error, \"update\" needs a previous \"configure_primitive\" call")
+
+        frequency_args = {key: value for key, value in {**self.last_request["frequency_args"], **changes}.items()
+                          if value is not None}
+        phase_shift_args = self.last_request["phase_shift_args"]
+        other_args = self.last_request["other_args"]
+        use_relative_error = self.last_request["use_relative_error"]
+
+        incremental = self.vco_states and not frequency_args.get("f_out_4_cascade", False) and \
+            not self.ratio_constraints and \
+            all(key[:-1] in ["f_out_", "delta_"] and key[-1].isdigit() for key in changes)
+        if not incremental:
+            return self.configure_primitive(frequency_args, phase_shift_args, other_args,
+                                            use_relative_error=use_relative_error)
+
+        self.last_request["frequency_args"] = frequency_args
+        output_frequencies = {int(key[-1]): value for key, value in frequency_args.items() if "f_out_" in key}
+        deltas = {index: frequency_args.get(f"delta_{index}", 0.5) for index in output_frequencies}
+        self.output_frequencies, self.output_deltas = output_frequencies, deltas
+
+        # The states have to be up to date even if the request is rejected, later updates build on them
+        changed_outputs = {int(key[-1]) for key in changes if "f_out_" in key}
+        for m, d, dividers, errors in self.vco_states:
+            for index in changed_outputs:
+                if index in output_frequencies and index < self.primitive.output_clocks:
+                    dividers[index], f_out = self.primitive.get_approximated_o_divider(
+                        index, m, d, self.f_in_1, output_frequencies[index], self.f_out_min, self.f_out_max)
+                    errors[index] = relative_error(output_frequencies[index], f_out)
+                else:
+                    dividers.pop(index, None)
+                    errors.pop(index, None)
+
+        if self.check_feasibility(frequency_args):
+            return self.reject_request()
+
+        # Changed outputs are checked first since they are the most likely to reject a state
+        deltas = {index: deltas[index]
+                  for index in sorted(deltas, key=lambda index: index not in changed_outputs)}
+        self.configuration_candidates = [self.get_configuration_from_vco_state(self.f_in_1, vco_state)
+                                         for vco_state in self.vco_states
+                                         if self.is_vco_state_valid(vco_state, deltas)]
+
+        if phase_shift_args:
+            self.configure_phase_shift_parameters(**phase_shift_args)
+
+        return self.score_and_select_candidate(frequency_args, phase_shift_args, other_args, use_relative_error)
+
+    def get_vco_state(self, f_in_1: float, m, d, output_frequencies: dict) -> list:
+        """
+        :return: State of the (M, D) combination: [m, d, {index: divider value}, {index: relative error}]
+        """
+        dividers, errors = {}, {}
+        for index, target_f_out in output_frequencies.items():
+            if index in self.ratio_outputs:
+                continue
+            dividers[index], f_out = self.primitive.get_approximated_o_divider(index, m, d, f_in_1, target_f_out,
+                                                                               self.f_out_min, self.f_out_max)
+            errors[index] = relative_error(target_f_out, f_out)
+
+        if self.ratio_groups:
+            base = m * period_to_frequency_mhz_precision(frequency_to_period_ns_precision(f_in_1)) / d
+            for group in self.ratio_groups:
+                dividers.update(group.get_dividers(base, output_frequencies, self.output_deltas, self.f_out_min,
+                                                   self.f_out_max))
+            for index in self.ratio_outputs:
+                errors[index] = relative_error(output_frequencies[index], base / dividers[index])
+        return [m, d, dividers, errors]
+
+    @staticmethod
+    def is_vco_state_valid(vco_state: list, deltas: dict) -> bool:
+        """
+        :param deltas: Deltas of all requested outputs
+        :return: True if every output frequency of the state is within its delta
+        """
+        errors = vco_state[3]
+        return all(errors[index] <= delta for index, delta in deltas.items())
+
+    def get_configuration_from_vco_state(self, f_in_1: float, vco_state: list) -> ClockBlockConfiguration:
+        """
+        :return: New configuration with the M, D and output dividers of the state
+        """
+        m, d, dividers, _ = vco_state
+        config = self.primitive.get_clone()
+        config.set_in_period_based_on_frequency(f_in_1)
+        config.m.value = m
+        config.m.on = True
+        config.d.value = d
+        config.d.on = True
+        for index, divider_value in dividers.items():
+            config.o_list[index].value = divider_value
+            config.o_list[index].on = True
+        return config
+
+    def check_feasibility(self, frequency_args: dict, phase_shift_args: dict = None) -> list:
+        """
+        Runs the feasibility pre-check (see fpga_feasibility) on arguments for "configure_frequency_parameters".
+        It does not iterate through any M, D combination and is therefore much faster than the configuration itself.
+        :param frequency_args: Arguments for "configure_frequency_parameters" as a kwargs dict
+        :param phase_shift_args: Arguments for "configure_phase_shift_parameters" as a kwargs dict
+        :return: List of FeasibilityIssues, which is also saved in "feasibility_issues"
+        """
+        output_frequencies = {int(key[-1]): value for key, value in frequency_args.items()
+                              if "f_out_" in key and "cascade" not in key and value is not None}
+        deltas = {int(key[-1]): value for key, value in frequency_args.items() if "delta_" in key}
+        phase_shifts = {int(key[-1]): value for key, value in (phase_shift_args or {}).items()
+                        if "phase_shift_" in key and value is not None}
+
+        self.feasibility_issues = check_feasibility(self.fpga, self.primitive, frequency_args["f_in_1"],
+                                                    output_frequencies, deltas,
+                                                    frequency_args.get("f_out_4_cascade", False), phase_shifts)
+        return self.feasibility_issues
+
+    def get_solve_stats(self) -> dict:
+        """
+        :return: Counts of the last solve {"vco_candidates": ..., "configuration_candidates": ...,
+                 "collapsed_equivalents": ...}
+        """
+        return {"vco_candidates": self.vco_candidate_count,
+                "configuration_candidates": len(self.configuration_candidates),
+                "collapsed_equivalents": self.collapsed_equivalents}
+
+    def reject_request(self) -> None:
+        """
+        Clears all candidates, so no configuration is selected.
+        :return: None
+        """
+        self.configuration_candidates = []
+        self.selected_candidate = None
+        self.pareto_front = ParetoFront() if self.collect_pareto_front else None
+        return None
+
+    @staticmethod
+    def get_required_delta_scale(error: float, base_delta: float) -> float:
+        """
+        :return: The smallest factor for base_delta that makes the error acceptable
+        """
+        if error == 0:
+            return 0
+        return error / base_delta if base_delta > 0 else inf
+
+    def get_achieved_errors(self) -> dict:
+        """
+        Note: This will only work after a candidate has been selected
+        :return: Dictionary of the relative frequency errors of the selected candidate {output index: relative error}
+        """
+        return {index: relative_error(target, self.selected_candidate.get_output_frequency(index))
+                for index, target in self.output_frequencies.items()}
+
+    def score_and_select_candidate(self, frequency_args: dict, phase_shift_args: dict, other_args: dict,
+                                   use_relative_error: bool = False) -> ClockBlockConfiguration:
+        """
+        Scores the remaining configuration candidates and selects the most fitting one.
+        :return: The most fitting configuration candidate
+        """
         # Convert the dictionaries for the next step
-        output_frequencies = {
+        self.output_frequencies = {
             int(key[-1]): value
             for key, value in frequency_args.items()
             if "f_out_" in key and "cascade" not in key
@@ -60,12 +338,21 @@ class ClockingConfigurator:
 
         phase_shifts = {
             int(key[-1]): value
-            for key,value in phase_shift_args.items()
+            for key, value in phase_shift_args.items()
             if "phase_shift_" in key
         }
 
-        for config in self.configuration_candidates:
-            config.set_delta_score(output_frequencies, phase_shifts, use_relative_error=use_relative_error)
+        vco_max = self.fpga.get_vco_max(self.primitive.specification)
+        scoring_function = DeltaScore(use_relative_error) if self.scoring_function is None else self.scoring_function
+        scores = scoring_function.score_candidates(self.configuration_candidates, self.output_frequencies,
+                                                   phase_shifts, vco_max)
+        pareto_front = ParetoFront() if self.collect_pareto_front else None
+        for config, score in zip(self.configuration_candidates, scores):
+            config.delta_score = score
+            if pareto_front is not None:
+                pareto_front.add(get_pareto_point(config, vco_max, self.output_frequencies, phase_shifts,
+                                                  use_relative_error))
+        self.pareto_front = pareto_front
 
         if self.select_candidate():
             # Those "other" arguments are independent of previous steps, which is why they are added only at the end.
@@ -103,94 +390,255 @@ class ClockingConfigurator:
 
         # Get some boundary values based on the input frequency, pfd and vco
         # Also d_min is saved as in an attribute for later usage in the "select_candidate" method
-        self.d_min, d_max, m_min, m_max = self.get_d_m_min_max(f_in_1)
+        self.d_min = self.get_d_m_min_max(f_in_1)[0]
 
-        # This list contains fractions that have already been evaluated as not fitting
-        # So m = 2, d = 5 wont be evaluated if 0.4 is already in this list
-        checked_m_d_combinations = []
         valid_configurations = []
 
-        for m_temp in self.primitive.get_m_generator(start=m_min, end=m_max):
-            for d_temp in self.primitive.get_d_generator(start=self.d_min, end=d_max):
-                # The generator does limit m and d already
-                # But there are still m, d combinations that are filtered here
-                if not (self.fpga.get_vco_min(self.primitive.specification) <= (f_in_1 * m_temp) / d_temp
-                        <= self.fpga.get_vco_max(self.primitive.specification)):
+        # Without the cascade the output dividers of every (M, D) combination are computed without creating a
+        # configuration, only valid combinations become configurations. The states are kept for "update".
+        use_vco_states = not (self.primitive.specification == "mmcm" and f_out_4_cascade and 4 in output_frequencies)
+        self.vco_states = []
+        output_deltas = {index: deltas[index] for index in output_frequencies}
+        self.output_frequencies, self.output_deltas = output_frequencies, output_deltas
+        # With the cascade one (M, D) combination can lead to the same configuration twice (e.g. if the cascade is not
+        # used), the duplicates are collapsed by their output signatures
+        signatures = set()
+
+        # The ratio constraints fix the possible dividers of their outputs before any (M, D) combination is evaluated,
+        # combinations whose vco frequency none of them can fulfill are skipped (and not kept for "update")
+        self.ratio_groups, self.ratio_outputs = [], set()
+        if self.ratio_constraints:
+            if not use_vco_states:
+                raise ValueError("Error, ratio constraints can not be combined with the divider cascade")
+            self.ratio_groups = get_ratio_groups(self.primitive, self.ratio_constraints, output_frequencies)
+            self.ratio_outputs = {index for group in self.ratio_groups for index in group.factors}
+            for group in self.ratio_groups:
+                group.set_vco_intervals(output_frequencies, output_deltas, self.f_out_min, self.f_out_max)
+        f_in_from_period = period_to_frequency_mhz_precision(frequency_to_period_ns_precision(f_in_1))
+
+        # The vco candidates are already filtered by the vco limitations
+        # and do not contain m, d combinations with the same fraction (like m = 2, d = 5 and m = 4, d = 10)
+        vco_candidates = self.get_vco_candidates(f_in_1)
+        self.vco_candidate_count = len(vco_candidates)
+        for m_temp, d_temp, _ in vco_candidates:
+            if use_vco_states:
+                if self.ratio_groups and not all(group.is_vco_possible(m_temp * f_in_from_period / d_temp)
+                                                 for group in self.ratio_groups):
                     continue
-                if m_temp / d_temp in checked_m_d_combinations:
-                    continue
-                config = self.get_new_configuration_with_o_dividers(f_in_1, m_temp, d_temp, output_frequencies, deltas)
+                vco_state = self.get_vco_state(f_in_1, m_temp, d_temp, output_frequencies)
+                self.vco_states.append(vco_state)
+                if self.is_vco_state_valid(vco_state, output_deltas):
+                    valid_configurations.append(self.get_configuration_from_vco_state(f_in_1, vco_state))
+                continue
 
-                # config is either empty, an error code ("4") or a viable configuration
-                if config and config != "4":
-                    valid_configurations.append(config)
-                # The block below is only relevant if the cascade of the divider 6 into the divider 4 is activated
-                if self.primitive.specification == "mmcm" and f_out_4_cascade and 4 in output_frequencies:
-                    # Use a copy of the dictionary which uses a different value for the output frequency 4
-                    # though the actual output frequency 4 will not change because of the cascade
-                    temp_output_frequencies = output_frequencies.copy()
-                    temp_conf = self.primitive.get_new_instance()
-
-                    # Take the output target output frequency 6 into account (if it exists)
-                    if 6 in output_frequencies and output_frequencies[6] > output_frequencies[4]:
-                        o6_value = temp_conf.approximate_o_divider(6, m_temp, d_temp, f_in_1, output_frequencies[6],
-                                                                   deltas[6], self.f_out_min, self.f_out_max)
-
-                        if o6_value is not None:
-                            temp_output_frequencies[4] = temp_output_frequencies[4] * o6_value
-
-                            config = self.get_new_configuration_with_o_dividers(f_in_1, m_temp, d_temp,
-                                                                                temp_output_frequencies, deltas)
+            config = self.get_new_configuration_with_o_dividers(f_in_1, m_temp, d_temp, output_frequencies, deltas)
+
+            # config is either empty, an error code ("4") or a viable configuration
+            if config and config != "4":
+                self.add_unique_candidate(valid_configurations, signatures, config)
+            # The block below is only relevant if the cascade of the divider 6 into the divider 4 is activated
+            if self.primitive.specification == "mmcm" and f_out_4_cascade and 4 in output_frequencies:
+                # Use a copy of the dictionary which uses a different value for the output frequency 4
+                # though the actual output frequency 4 will not change because of the cascade
+                temp_output_frequencies = output_frequencies.copy()
+                temp_conf = self.primitive.get_clone()
+
+                # Take the output target output frequency 6 into account (if it exists)
+                if 6 in output_frequencies and output_frequencies[6] > output_frequencies[4]:
+                    o6_value = temp_conf.approximate_o_divider(6, m_temp, d_temp, f_in_1, output_frequencies[6],
+                                                               deltas[6], self.f_out_min, self.f_out_max)
+
+                    if o6_value is not None:
+                        temp_output_frequencies[4] = temp_output_frequencies[4] * o6_value
+
+                        config = self.get_new_configuration_with_o_dividers(f_in_1, m_temp, d_temp,
+                                                                            temp_output_frequencies, deltas)
+                        # Set cascade manually
+                        if config and config != "4":
+                            config.clkout4_cascade.set_value(True)
+
+                elif 6 not in output_frequencies:
+                    # Another support function will compute o4 and o6 in this specific case and set them manually
+                    tupl = self.precompute_o6_divider(f_in_1, m_temp, d_temp, output_frequencies[4],
+                                                      deltas[4])
+                    if tupl is not None:
+                        o4_value, o6_value = tupl
+
+                        # Remove output 4 from dictionary since it will be set manually
+                        temp_output_frequencies.pop(6, None)
+                        temp_output_frequencies.pop(4, None)
+                        # Try to create new config
+                        config = self.get_new_configuration_with_o_dividers(f_in_1, m_temp, d_temp,
+                                                                            temp_output_frequencies, deltas)
+                        if config and config != "4":
+                            # Set o4 and o6 manually
+                            config.clkout4_divide.value = o4_value
+                            config.clkout4_divide.on = True
+                            config.clkout6_divide.value = o6_value
+                            config.clkout6_divide.on = True
                             # Set cascade manually
-                            if config and config != "4":
-                                config.clkout4_cascade.set_value(True)
-
-                    elif 6 not in output_frequencies:
-                        # Another support function will compute o4 and o6 in this specific case and set them manually
-                        tupl = self.precompute_o6_divider(f_in_1, m_temp, d_temp, output_frequencies[4],
-                                                          deltas[4])
-                        if tupl is not None:
-                            o4_value, o6_value = tupl
-
-                            # Remove output 4 from dictionary since it will be set manually
-                            temp_output_frequencies.pop(6, None)
-                            temp_output_frequencies.pop(4, None)
-                            # Try to create new config
-                            config = self.get_new_configuration_with_o_dividers(f_in_1, m_temp, d_temp,
-                                                                                temp_output_frequencies, deltas)
-                            if config and config != "4":
-                                # Set o4 and o6 manually
-                                config.clkout4_divide.value = o4_value
-                                config.clkout4_divide.on = True
-                                config.clkout6_divide.value = o6_value
-                                config.clkout6_divide.on = True
-                                # Set cascade manually
-                                config.clkout4_cascade.set_value(True)
-
-                    if config and config != "4":
-                        valid_configurations.append(config)
-
-                checked_m_d_combinations.append(m_temp / d_temp)
+                            config.clkout4_cascade.set_value(True)
+
+                if config and config != "4":
+                    self.add_unique_candidate(valid_configurations, signatures, config)
 
         self.configuration_candidates = valid_configurations
         return valid_configurations
 
+    def add_unique_candidate(self, candidates: list, signatures: set, config: ClockBlockConfiguration) -> None:
+        """
+        Adds the configuration to the candidates, unless a configuration with the same output signature (see
+        "get_output_signature") has already been added. The first configuration has the smallest D.
+        :param signatures: Output signatures of the candidates
+        """
+        signature = config.get_output_signature()
+        if signature in signatures:
+            self.collapsed_equivalents += 1
+            return
+        signatures.add(signature)
+        candidates.append(config)
+
+    def get_vco_limits(self) -> tuple:
+        """
+        :return: Tuple (vco_min, vco_max) of the fpga model, narrowed by the drift margin (see "margin_ppm") and the
+                 vco window
+        """
+        vco_min = self.fpga.get_vco_min(self.primitive.specification)
+        vco_max = self.fpga.get_vco_max(self.primitive.specification)
+        if self.margin_ppm is not None:
+            vco_min, vco_max = vco_min / (1 - self.margin_ppm * 1e-6), vco_max / (1 + self.margin_ppm * 1e-6)
+        if self.vco_window is not None:
+            vco_min, vco_max = max(vco_min, self.vco_window[0]), min(vco_max, self.vco_window[1])
+        return vco_min, vco_max
+
+    def get_pfd_limits(self) -> tuple:
+        """
+        :return: Tuple (pfd_min, pfd_max) of the fpga model, narrowed by the drift margin (see "margin_ppm")
+        """
+        pfd_min = self.fpga.get_pfd_min(self.primitive.specification)
+        pfd_max = self.fpga.get_pfd_max(self.primitive.specification)
+        if self.margin_ppm is None:
+            return pfd_min, pfd_max
+        return pfd_min / (1 - self.margin_ppm * 1e-6), pfd_max / (1 + self.margin_ppm * 1e-6)
+
     # Compute min and max values for m and d according to Xilinx
     def get_d_m_min_max(self, f_in: float):
+        pfd_min, pfd_max = self.get_pfd_limits()
 
         # find the min and max values for the frequency divider d (DIVCLK_DIVIDE)
-        d_min = ceil(f_in / self.fpga.get_pfd_max(self.primitive.specification))
-        d_max = floor(f_in / self.fpga.get_pfd_min(self.primitive.specification))
+        d_min = ceil(f_in / pfd_max)
+        d_max = floor(f_in / pfd_min)
+        if self.d_window is not None:
+            d_min, d_max = max(d_min, ceil(self.d_window[0])), min(d_max, floor(self.d_window[1]))
 
         # find the min and values for the frequency divider m (CLKFBOUT_MULT_F or CLKFBOUT_MULT,
         # aka frequency multiplier)
+        # The limitations of the fpga model are used since M can be fractional, "get_vco_candidates" checks the
+        # narrowed limitations of every vco frequency
         m_min = ceil((self.fpga.get_vco_min(self.primitive.specification) * d_min) / f_in)
         m_max = floor((self.fpga.get_vco_max(self.primitive.specification) * d_max) / f_in)
+        # The windows narrow the range further, the M generator aligns the bounds to the possible values of M
+        if self.vco_window is not None:
+            m_min, m_max = max(m_min, self.vco_window[0] * d_min / f_in), min(m_max, self.vco_window[1] * d_max / f_in)
+        if self.m_window is not None:
+            m_min, m_max = max(m_min, self.m_window[0]), min(m_max, self.m_window[1])
 
         return d_min, d_max, m_min, m_max
 
+    def get_vco_candidates(self, f_in_1: float) -> list:
+        """
+        Lists all (M, D) combinations whose vco frequency is within the limitations of the fpga model.
+        Combinations with an M/D ratio that has already been listed are skipped since they produce the same frequencies,
+        their number is stored in "collapsed_equivalents". The ratios are compared exactly (see "utility.exact_ratio").
+        The first combination of a ratio is kept, it has the smallest D, which is preferred by Xilinx.
+        If "margin_ppm" is set, the limitations are narrowed by it and the worst-case margins of the combinations are
+        stored in "vco_margins".
+        :param f_in_1: Input frequency
+        :return: List of tuples (m, d, f_vco)
+        """
+        d_min, d_max, m_min, m_max = self.get_d_m_min_max(f_in_1)
+        vco_min, vco_max = self.get_vco_limits()
+
+        self.collapsed_equivalents = 0
+        if self.use_ratio_table:
+            vco_candidates = self.get_vco_candidates_from_ratio_table(f_in_1, d_min, d_max, m_min, m_max, vco_min,
+                                                                      vco_max)
+        else:
+            checked_ratios = set()
+            vco_candidates = []
+            for m_temp in self.primitive.get_m_generator(start=m_min, end=m_max):
+                # Inlined version of "utility.exact_ratio", M is only converted once
+                m_numerator, m_denominator = m_temp.as_integer_ratio()
+                # Only D values whose vco frequency can be within the limitations are visited, the bounds are widened
+                # a little bit and then narrowed by the exact check below
+                for d_temp in self.primitive.get_d_generator(
+                        start=max(d_min, ceil(f_in_1 * m_temp / vco_max - 1e-9)),
+                        end=min(d_max, floor(f_in_1 * m_temp / vco_min + 1e-9))):
+                    f_vco = (f_in_1 * m_temp) / d_temp
+                    if not vco_min <= f_vco <= vco_max:
+                        continue
+                    d_numerator, d_denominator = d_temp.as_integer_ratio()
+                    numerator, denominator = m_numerator * d_denominator, m_denominator * d_numerator
+                    divisor = gcd(numerator, denominator)
+                    ratio = (numerator // divisor, denominator // divisor)
+                    if ratio in checked_ratios:
+                        self.collapsed_equivalents += 1
+                        continue
+                    checked_ratios.add(ratio)
+                    vco_candidates.append((m_temp, d_temp, f_vco))
+
+        # All frequencies are proportional to the input frequency, so a frequency f stays within [f_min, f_max] for
+        # input drifts up to min(f_max / f - 1, 1 - f_min / f). The margins of the pfd only depend on D.
+        self.vco_margins = {}
+        if self.margin_ppm is not None:
+            fpga_vco_min = self.fpga.get_vco_min(self.primitive.specification)
+            fpga_vco_max = self.fpga.get_vco_max(self.primitive.specification)
+            fpga_pfd_min = self.fpga.get_pfd_min(self.primitive.specification)
+            fpga_pfd_max = self.fpga.get_pfd_max(self.primitive.specification)
+            for m_temp, d_temp, f_vco in vco_candidates:
+                self.vco_margins[(m_temp, d_temp)] = min(fpga_vco_max / f_vco - 1, 1 - fpga_vco_min / f_vco,
+                                                         fpga_pfd_max * d_temp / f_in_1 - 1,
+                                                         1 - fpga_pfd_min * d_temp / f_in_1) * 1e6
+
+        return vco_candidates
+
+    def get_vco_candidates_from_ratio_table(self, f_in_1: float, d_min, d_max, m_min, m_max, vco_min: float,
+                                            vco_max: float) -> list:
+        """
+        Same as the search of "get_vco_candidates", but only the groups of the ratio table (see "get_ratio_table")
+        whose vco frequency is within the limitations are visited. The first combination of every group that passes
+        the checks is kept.
+        :return: List of tuples (m, d, f_vco) sorted by M and D
+        """
+        # The bounds are aligned to the possible values exactly like in the search
+        m_values = list(self.primitive.get_m_generator(start=m_min, end=m_max))
+        d_values = list(self.primitive.get_d_generator(start=d_min, end=d_max))
+        if not m_values or not d_values:
+            return []
+        m_low, m_high, d_low, d_high = m_values[0], m_values[-1], d_values[0], d_values[-1]
+
+        ratios, groups = get_ratio_table(tuple(self.primitive.get_m_generator()),
+                                         tuple(self.primitive.get_d_generator()))
+        vco_candidates = []
+        # The range of the ratios is widened a little bit and then narrowed by the exact check below
+        for d_group, m_group in groups[bisect_left(ratios, vco_min / f_in_1 * (1 - 1e-9)):
+                                       bisect_right(ratios, vco_max / f_in_1 * (1 + 1e-9))]:
+            kept = False
+            for position in range(bisect_left(d_group, d_low), bisect_right(d_group, d_high)):
+                m_temp, d_temp = m_group[position], d_group[position]
+                f_vco = (f_in_1 * m_temp) / d_temp
+                if not m_low <= m_temp <= m_high or not vco_min <= f_vco <= vco_max:
+                    continue
+                if kept:
+                    self.collapsed_equivalents += 1
+                else:
+                    vco_candidates.append((m_temp, d_temp, f_vco))
+                    kept = True
+
+        return sorted(vco_candidates, key=itemgetter(0, 1))
+
     def get_new_configuration_with_o_dividers(self, f_in_1: float, m, d, output_frequencies: dict, deltas: dict):
-        config = self.primitive.get_new_instance()
+        config = self.primitive.get_clone()
         config.set_in_period_based_on_frequency(f_in_1)
         found = config.configure_approximated_o_dividers(m, d, f_in_1, output_frequencies, deltas, self.f_out_min,
                                                          self.f_out_max)
@@ -264,21 +712,17 @@ class ClockingConfigurator:
 
             viable_candidate = True
             for index in phase_shifts:
+                # The outputs 4 and 6 of the cascade and outputs with ratio constraints keep their dividers
+                if self.divider_alternatives > 1 and not (index in [4, 6] and config.get_cascade_divider(4) != 1) \
+                        and index not in self.ratio_outputs:
+                    if not self.set_best_divider_alternative(config, index, phase_shifts[index], deltas[index]):
+                        viable_candidate = False
+                        break
+                    continue
+
                 # Quicksave reference to current phase shift in order to not call a get function over and over again
                 current_pshift = config.get_phase_shift(index)
-
-                # Initiate increment and end value (in degrees)
-                divider_value = config.get_output_divider(index).value
-                current_pshift.increment = 45 / divider_value
-
-                if divider_value > 64:
-                    current_pshift.end = (63 / divider_value) * 360 + 7 * (45 / divider_value)
-
-                # Set next best phase shift
-                # The cp_value is subtracted from the target value since all clocks will the shifted backwards by
-                # the value of clkfbout_phase (which is cp_value)
-                current_pshift.set_and_correct_value(phase_shifts[index])
-                current_pshift.on = True
+                self.set_phase_shift(current_pshift, config.get_output_divider(index).value, phase_shifts[index])
 
                 # Reject this combination of clkfbout_phase and output phase shifts if it goes beyond delta
                 if relative_error(phase_shifts[index], current_pshift.value) > deltas[index]:
@@ -291,6 +735,66 @@ class ClockingConfigurator:
         self.configuration_candidates = updated_candidates
         return updated_candidates
 
+    @staticmethod
+    def set_phase_shift(phase_shift: IncrementRangeAttribute, divider_value: float, target_phase_shift: float) -> None:
+        """
+        Sets the phase shift of an output as close as possible to the target, its resolution depends on the divider.
+        :param phase_shift: Phase shift attribute of the output, its increment and end are changed
+        :param divider_value: Value of the output divider
+        """
+        # Initiate increment and end value (in degrees)
+        phase_shift.increment = 45 / divider_value
+
+        if divider_value > 64:
+            phase_shift.end = (63 / divider_value) * 360 + 7 * (45 / divider_value)
+
+        # Set next best phase shift
+        # The cp_value is subtracted from the target value since all clocks will the shifted backwards by
+        # the value of clkfbout_phase (which is cp_value)
+        phase_shift.set_and_correct_value(target_phase_shift)
+        phase_shift.on = True
+
+    def set_best_divider_alternative(self, config: ClockBlockConfiguration, index: int, target_phase_shift: float,
+                                     phase_shift_delta: float) -> bool:
+        """
+        Sets the output divider out of the "divider_alternatives" nearest legal dividers that scores best together
+        with the phase shift it allows (its increment is 45 / divider). The score is a sum of one cost per output
+        (see fpga_scoring.SeparableScoringFunction), so every output is chosen on its own and the combinations of the
+        alternatives of several outputs never have to be tried.
+        Scoring functions that are no such sums choose the alternatives by the costs of the delta score.
+        :return: False if no alternative fulfills the frequency and the phase shift delta
+        """
+        scoring_function = self.scoring_function if isinstance(self.scoring_function, SeparableScoringFunction) \
+            else DeltaScore(self.use_relative_error)
+        target_f_out = self.output_frequencies[index]
+
+        best = None
+        for divider_value, f_out in config.get_nearest_o_dividers(index, config.m.value, config.d.value, self.f_in_1,
+                                                                   target_f_out, self.divider_alternatives,
+                                                                   self.f_out_min, self.f_out_max):
+            # The alternatives are sorted by their frequency errors, the phase shift cost is never negative
+            frequency_cost = scoring_function.get_frequency_cost(index, target_f_out, f_out)
+            if relative_error(target_f_out, f_out) > self.output_deltas[index] or \
+                    (best is not None and frequency_cost >= best[0]):
+                break
+
+            phase_shift = config.get_phase_shift(index).copy()
+            self.set_phase_shift(phase_shift, divider_value, target_phase_shift)
+            if relative_error(target_phase_shift, phase_shift.value) > phase_shift_delta:
+                continue
+            cost = frequency_cost + scoring_function.get_phase_shift_cost(index, target_phase_shift, phase_shift.value)
+            if best is None or cost < best[0]:
+                best = (cost, divider_value, phase_shift)
+
+        if best is None:
+            return False
+        _, divider_value, phase_shift = best
+        config.get_output_divider(index).value = divider_value
+        current_pshift = config.get_phase_shift(index)
+        current_pshift.descriptor, current_pshift.value, current_pshift.on = \
+            phase_shift.descriptor, phase_shift.value, phase_shift.on
+        return True
+
     # Duty cycle function was dropped because there were cases where it did not work.
     '''
     def configure_duty_cycle_parameters(self, duty_cycle_0: float = None, duty_cycle_1: float = None,
@@ -386,14 +890,20 @@ class ClockingConfigurator:
             self.configuration_candidates = sorted(self.configuration_candidates,
                                                    key=lambda config: relative_error(m_ideal, config.m.value))
 
+            # With a drift margin candidates with larger worst-case margins are preferred if their scores are equal
+            if self.margin_ppm is not None:
+                self.configuration_candidates = sorted(
+                    self.configuration_candidates,
+                    key=lambda config: -self.vco_margins.get((config.m.value, config.d.value), 0))
+
             # Last but most importantly sort them by their delta score
             self.configuration_candidates = sorted(self.configuration_candidates, key=attrgetter("delta_score"))
 
         self.selected_candidate = self.configuration_candidates[0]
         return self.selected_candidate
 
-    def generate_template(self):
-        return self.selected_candidate.generate_template()
+    def generate_template(self, module_name: str = "clk", language: str = VERILOG, port_names: dict = None):
+        return self.selected_candidate.generate_template(module_name, language, port_names)
 
     def write_verilog_file(self, path: str):
         with open(path) as file:
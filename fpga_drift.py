@@ -0,0 +1,215 @@
+"""
+This module contains the input drift analysis of jacc.
+Reference oscillators have a tolerance and a temperature drift (e.g. +-50 ppm), so the input frequency of a CMT block is
+f_in * (1 + e) with a random relative drift e.
+
+All frequencies of a configuration are proportional to the input frequency:
+    f_out = f_in * M / (D * O), f_vco = f_in * M / D, f_pfd = f_in / D
+So every frequency follows the drift distribution scaled by its nominal value, and every requirement (the delta of an
+output, the vco, pfd and input limits) is an interval of e. The worst cases are found at the bounds of the drift and the
+probabilities of violations are the probability mass of the drift outside these intervals. Both are computed in closed
+form from the distribution, which is exact (like infinitely many Monte Carlo samples) and takes microseconds.
+"""
+from dataclasses import dataclass
+from math import sqrt
+from statistics import NormalDist
+from fpga_model import FPGAModel
+from fpga_primitives import ClockBlockConfiguration
+from utility import relative_error, period_to_frequency_mhz_precision
+
+UNIFORM = "uniform"
+NORMAL = "normal"
+DISTRIBUTIONS = [UNIFORM, NORMAL]
+
+PPM = 1e-6
+
+
+@dataclass(frozen=True)
+class DriftDistribution:
+    """
+    Distribution of the relative drift e of the input frequency in ppm.
+    UNIFORM: e is uniformly distributed within offset_ppm +- ppm
+    NORMAL: e is normally distributed with the mean offset_ppm and the standard deviation ppm, the worst cases are
+            taken at +- sigmas standard deviations
+    """
+    kind: str = UNIFORM
+    ppm: float = 50
+    offset_ppm: float = 0
+    sigmas: float = 3
+
+    def __post_init__(self):
+        if self.kind not in DISTRIBUTIONS:
+            raise ValueError(f"Error, unknown drift distribution {self.kind}, supported are {DISTRIBUTIONS}")
+        if self.ppm < 0 or self.sigmas < 0:
+            raise ValueError("Error, the drift and the number of standard deviations must not be negative")
+
+    def get_bounds(self) -> tuple:
+        """
+        :return: Tuple (lowest drift, highest drift) of the worst cases as relative drifts
+        """
+        width = self.ppm if self.kind == UNIFORM else self.ppm * self.sigmas
+        return (self.offset_ppm - width) * PPM, (self.offset_ppm + width) * PPM
+
+    def get_standard_deviation(self) -> float:
+        return self.ppm * PPM / sqrt(3) if self.kind == UNIFORM else self.ppm * PPM
+
+    def cdf(self, drift: float) -> float:
+        """
+        :param drift: Relative drift
+        :return: Probability that the drift is at most drift
+        """
+        if self.ppm == 0:
+            return 1.0 if drift >= self.offset_ppm * PPM else 0.0
+        if self.kind == NORMAL:
+            return NormalDist(self.offset_ppm * PPM, self.ppm * PPM).cdf(drift)
+        low, high = self.get_bounds()
+        return min(max((drift - low) / (high - low), 0.0), 1.0)
+
+    def get_probability_outside(self, low: float, high: float) -> float:
+        """
+        :param low: Lowest allowed relative drift
+        :param high: Highest allowed relative drift
+        :return: Probability that the drift is not within [low, high]
+        """
+        if low > high:
+            return 1.0
+        inside = self.cdf(high) - self.cdf(low)
+        # A drift without spread is either inside or outside
+        if self.ppm == 0 and low <= self.offset_ppm * PPM <= high:
+            inside = 1.0
+        return min(max(1.0 - inside, 0.0), 1.0)
+
+
+@dataclass(frozen=True)
+class DriftRange:
+    """
+    A frequency of the configuration under the drift and its allowed range.
+    The margin is the distance of the worst-case drift to the closest limit in ppm of the input frequency, it is
+    negative if a worst case violates the limits.
+    """
+    name: str
+    nominal: float
+    minimum: float
+    maximum: float
+    mean: float
+    standard_deviation: float
+    limit_min: float
+    limit_max: float
+    margin_ppm: float
+    violation_probability: float
+
+
+@dataclass(frozen=True)
+class OutputDrift(DriftRange):
+    """DriftRange of an output whose limits are target * (1 +- delta), see "worst_error" for the largest error"""
+    index: int = None
+    target: float = None
+    delta: float = None
+    worst_error: float = None
+
+
+@dataclass(frozen=True)
+class DriftAnalysis:
+    """Result of "analyze_input_drift", violation_probability is the probability that any range is violated"""
+    distribution: DriftDistribution
+    f_in: float
+    outputs: list
+    limits: list
+    violation_probability: float
+    margin_ppm: float
+
+    def get_ranges(self) -> list:
+        return [*self.outputs, *self.limits]
+
+    def get_violations(self) -> list:
+        """
+        :return: Ranges whose worst cases violate their limits
+        """
+        return [drift_range for drift_range in self.get_ranges() if drift_range.margin_ppm < 0]
+
+
+def get_drift_interval(nominal: float, limit_min: float, limit_max: float) -> tuple:
+    """
+    :return: Tuple (lowest, highest) relative drift of the input frequency for which the frequency with the nominal
+             value stays within [limit_min, limit_max]
+    """
+    return limit_min / nominal - 1, limit_max / nominal - 1
+
+
+def get_drift_range(name: str, nominal: float, limit_min: float, limit_max: float,
+                    distribution: DriftDistribution, **kwargs) -> DriftRange:
+    """
+    :param name: Name of the frequency
+    :param nominal: Frequency without drift
+    :param limit_min: Lowest allowed frequency
+    :param limit_max: Highest allowed frequency
+    :param distribution: Drift distribution of the input frequency
+    :param kwargs: Additional fields of an OutputDrift
+    :return: DriftRange (or OutputDrift if kwargs are given)
+    """
+    low, high = distribution.get_bounds()
+    allowed_low, allowed_high = get_drift_interval(nominal, limit_min, limit_max)
+    return (OutputDrift if kwargs else DriftRange)(
+        name=name,
+        nominal=nominal,
+        minimum=nominal * (1 + low),
+        maximum=nominal * (1 + high),
+        mean=nominal * (1 + distribution.offset_ppm * PPM),
+        standard_deviation=nominal * distribution.get_standard_deviation(),
+        limit_min=limit_min,
+        limit_max=limit_max,
+        margin_ppm=min(allowed_high - high, low - allowed_low) / PPM,
+        violation_probability=distribution.get_probability_outside(allowed_low, allowed_high),
+        **kwargs
+    )
+
+
+def analyze_input_drift(fpga: FPGAModel, configuration: ClockBlockConfiguration, output_frequencies: dict,
+                        deltas: dict, distribution: DriftDistribution) -> DriftAnalysis:
+    """
+    Analyzes a configuration under the drift of its input frequency, see module docstring.
+    :param fpga: Used fpga model
+    :param configuration: Configuration whose input frequency, M, D and dividers are set
+    :param output_frequencies: Target output frequencies {index: frequency}
+    :param deltas: Highest allowed relative errors {index: delta}, missing outputs use 0.5
+    :param distribution: Drift distribution of the input frequency
+    :return: DriftAnalysis
+    """
+    specification = configuration.specification
+    f_in = period_to_frequency_mhz_precision(configuration.clkin1_period.value)
+
+    low, high = distribution.get_bounds()
+
+    outputs = []
+    for index, target in sorted(output_frequencies.items()):
+        delta = deltas.get(index, 0.5)
+        nominal = configuration.get_output_frequency(index)
+        # The error is linear in the drift, so the worst error is reached at a bound of the drift
+        worst_error = max(relative_error(target, nominal * (1 + low)), relative_error(target, nominal * (1 + high)))
+        outputs.append(get_drift_range(f"clkout{index}", nominal, target * (1 - delta), target * (1 + delta),
+                                       distribution, index=index, target=target, delta=delta,
+                                       worst_error=worst_error))
+
+    limits = [
+        get_drift_range("f_in", f_in, fpga.get_f_in_min(specification), fpga.get_f_in_max(specification),
+                        distribution),
+        get_drift_range("f_vco", configuration.get_vco_frequency(), fpga.get_vco_min(specification),
+                        fpga.get_vco_max(specification), distribution),
+        get_drift_range("f_pfd", f_in / configuration.d.value, fpga.get_pfd_min(specification),
+                        fpga.get_pfd_max(specification), distribution),
+    ]
+
+    # All allowed intervals of the drift intersect in one interval, a drift outside of it violates at least one range
+    intervals = [get_drift_interval(drift_range.nominal, drift_range.limit_min, drift_range.limit_max)
+                 for drift_range in [*outputs, *limits]]
+    allowed_low = max(interval[0] for interval in intervals)
+    allowed_high = min(interval[1] for interval in intervals)
+
+    return DriftAnalysis(
+        distribution=distribution,
+        f_in=f_in,
+        outputs=outputs,
+        limits=limits,
+        violation_probability=distribution.get_probability_outside(allowed_low, allowed_high),
+        margin_ppm=min(drift_range.margin_ppm for drift_range in [*outputs, *limits])
+    )
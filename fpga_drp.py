@@ -0,0 +1,191 @@
+"""
+This module contains the generation of DRP (dynamic reconfiguration port) register values for the reconfiguration of a
+CMT block at runtime, modeled after Xilinx' XAPP888.
+Every register write is a tuple (address, mask, data), the bits set in the mask keep their value during the
+read-modify-write of the DRP state machine.
+
+The counters of a configuration (output dividers, M and D) are encoded into high time, low time, edge, no count, phase
+mux and delay time. Many operating points share the same counter settings, so these encodings are cached and bulk
+conversions mostly consist of lookups.
+The lock and filter registers depend on look-up tables of Xilinx (indexed by M and the bandwidth) that are not part of
+jacc. They can be passed as a JSON file (see "load_lookup_tables"), otherwise these registers are left out.
+
+Fractional dividers (CLKOUT0_DIVIDE_F, CLKFBOUT_MULT_F) and the cascade of the divider 6 into the divider 4 are not
+supported.
+"""
+from functools import lru_cache
+from math import floor
+import json
+from fpga_primitives import ClockBlockConfiguration
+
+# Addresses of the counter registers (register 1, register 2) of the outputs 0 to 6
+OUTPUT_ADDRESSES = [(0x08, 0x09), (0x0A, 0x0B), (0x0C, 0x0D), (0x0E, 0x0F), (0x10, 0x11), (0x06, 0x07), (0x12, 0x13)]
+CLKFBOUT_ADDRESSES = (0x14, 0x15)
+DIVCLK_ADDRESS = 0x16
+LOCK_ADDRESSES = (0x18, 0x19, 0x1A)
+FILTER_ADDRESSES = (0x4E, 0x4F)
+POWER_ADDRESS = 0x28
+
+BANDWIDTHS = ["LOW", "HIGH", "OPTIMIZED"]
+
+
+@lru_cache(maxsize=None)
+def get_divider_fields(divide: int, duty_cycle: float = 0.5) -> tuple:
+    """
+    :return: Tuple (edge, no count, high time, low time) of a counter
+    """
+    if divide == 1:
+        return 0, 1, 1, 1
+
+    # The high time is rounded to half cycles, the half cycle is the edge bit
+    half_cycles = floor(duty_cycle * divide * 2 + 0.5)
+    high_time, edge = half_cycles // 2, half_cycles % 2
+    if high_time == 0:
+        high_time, edge = 1, 0
+    elif high_time >= divide:
+        high_time, edge = divide - 1, 1
+    return edge, 0, high_time, divide - high_time
+
+
+@lru_cache(maxsize=None)
+def get_phase_fields(divide: int, phase: float = 0.0) -> tuple:
+    """
+    :return: Tuple (mx, phase mux, delay time) of a counter, the phase is rounded to eighths of a vco cycle
+    """
+    eighths = floor((phase % 360) * divide * 8 / 360 + 0.5)
+    return 0, eighths % 8, eighths // 8
+
+
+@lru_cache(maxsize=None)
+def get_counter_registers(divide: int, phase: float = 0.0, duty_cycle: float = 0.5) -> tuple:
+    """
+    :return: Tuple (register 1, register 2) of a counter
+    """
+    edge, no_count, high_time, low_time = get_divider_fields(divide, duty_cycle)
+    mx, phase_mux, delay_time = get_phase_fields(divide, phase)
+    # Times of 64 are encoded as 0
+    register_1 = (phase_mux << 13) | ((high_time & 0x3F) << 6) | (low_time & 0x3F)
+    register_2 = (mx << 8) | (edge << 7) | (no_count << 6) | (delay_time & 0x3F)
+    return register_1, register_2
+
+
+def get_integer_divider(attribute) -> int:
+    if attribute.value != int(attribute.value):
+        raise ValueError(f"Error, {attribute.name} = {attribute.value} is fractional, only integer dividers are "
+                         "supported by the DRP registers")
+    return int(attribute.value)
+
+
+def load_lookup_tables(path: str) -> dict:
+    """
+    Reads the lock and filter look-up tables of XAPP888 from a JSON file:
+    {"lock": [...], "filter_low": [...], "filter_high": [...], "filter_optimized": [...]}
+    Every list has one entry per M, starting with M = 1. Lock entries have 40 bits, filter entries 10 bits, both may be
+    given as integers or hexadecimal strings.
+    :return: Dictionary {"lock": list of int, "LOW"/"HIGH"/"OPTIMIZED": list of int}
+    """
+    with open(path) as file:
+        content = json.load(file)
+
+    def to_int(value) -> int:
+        return int(value, 16) if isinstance(value, str) else int(value)
+
+    try:
+        tables = {"lock": [to_int(value) for value in content["lock"]]}
+        for bandwidth in BANDWIDTHS:
+            tables[bandwidth] = [to_int(value) for value in content[f"filter_{bandwidth.lower()}"]]
+    except KeyError as error:
+        raise ValueError(f"Error, the look-up table {error} is missing in {path}")
+    return tables
+
+
+def get_lock_and_filter_registers(m: int, bandwidth: str, lookup_tables: dict) -> list:
+    """
+    :return: List of the register writes (address, mask, data) of the lock and filter registers
+    """
+    if not 1 <= m <= min(len(lookup_tables["lock"]), len(lookup_tables[bandwidth])):
+        raise ValueError(f"Error, the look-up tables do not contain M = {m}")
+    lock, digital_filter = lookup_tables["lock"][m - 1], lookup_tables[bandwidth][m - 1]
+
+    def bits(value: int, high: int, low: int) -> int:
+        return (value >> low) & ((1 << (high - low + 1)) - 1)
+
+    return [
+        (LOCK_ADDRESSES[0], 0xFC00, bits(lock, 29, 20)),
+        (LOCK_ADDRESSES[1], 0x8000, (bits(lock, 34, 30) << 10) | bits(lock, 9, 0)),
+        (LOCK_ADDRESSES[2], 0x8000, (bits(lock, 39, 35) << 10) | bits(lock, 19, 10)),
+        (FILTER_ADDRESSES[0], 0x66FF,
+         (bits(digital_filter, 9, 9) << 15) | (bits(digital_filter, 8, 7) << 11) | (bits(digital_filter, 6, 6) << 8)),
+        (FILTER_ADDRESSES[1], 0x666F,
+         (bits(digital_filter, 5, 5) << 15) | (bits(digital_filter, 4, 3) << 11) | (bits(digital_filter, 2, 1) << 7)
+         | (bits(digital_filter, 0, 0) << 4)),
+    ]
+
+
+def get_drp_registers(configuration: ClockBlockConfiguration, lookup_tables: dict = None) -> list:
+    """
+    Converts a configuration into the register writes of the DRP. All outputs are written, unused outputs keep their
+    default divider 1.
+    :param configuration: PllBlockConfiguration or MmcmBlockConfiguration
+    :param lookup_tables: Lock and filter look-up tables (see "load_lookup_tables"), None leaves these registers out
+    :return: List of tuples (address, mask, data)
+    """
+    if configuration.specification == "mmcm" and configuration.clkout4_cascade.value:
+        raise ValueError("Error, the cascade of the divider 6 into the divider 4 is not supported by the DRP "
+                         "registers")
+
+    # The mmcm has the fractional settings of the outputs 0 and clkfbout in register 2 (and in register 2 of the
+    # outputs 5 and 6), they are written as 0
+    fractional = configuration.specification == "mmcm"
+
+    registers = [(POWER_ADDRESS, 0x0000, 0xFFFF)]
+    for index in range(configuration.output_clocks):
+        register_1, register_2 = get_counter_registers(get_integer_divider(configuration.o_list[index]),
+                                                       configuration.get_phase_shift(index).value,
+                                                       configuration.get_duty_cycle(index).value)
+        address_1, address_2 = OUTPUT_ADDRESSES[index]
+        mask_2 = 0x8000 if fractional and index == 0 else 0xC000 if fractional and index in [5, 6] else 0xFC00
+        registers += [(address_1, 0x1000, register_1), (address_2, mask_2, register_2)]
+
+    m = get_integer_divider(configuration.m)
+    register_1, register_2 = get_counter_registers(m, configuration.clkfbout_phase.value)
+    registers += [(CLKFBOUT_ADDRESSES[0], 0x1000, register_1),
+                  (CLKFBOUT_ADDRESSES[1], 0x8000 if fractional else 0xFC00, register_2)]
+
+    edge, no_count, high_time, low_time = get_divider_fields(get_integer_divider(configuration.d))
+    registers.append((DIVCLK_ADDRESS, 0xC000,
+                      (edge << 13) | (no_count << 12) | ((high_time & 0x3F) << 6) | (low_time & 0x3F)))
+
+    if lookup_tables is not None:
+        registers += get_lock_and_filter_registers(m, configuration.bandwidth.value, lookup_tables)
+    return registers
+
+
+def generate_drp_rom(configurations: list, lookup_tables: dict = None) -> str:
+    """
+    Generates a ROM initialization file for $readmemh with the register writes of several configurations.
+    Every entry is {1'b0, address[6:0], mask[15:0], data[15:0]}. All configurations have the same number of entries,
+    so the entries of configuration i start at i * <entries per configuration>.
+    A missing configuration (None) keeps its place: its entries write the same registers with the mask 0xFFFF and the
+    data 0x0000, which leaves them unchanged.
+    :param configurations: PllBlockConfigurations or MmcmBlockConfigurations of the same primitive, or None
+    :param lookup_tables: Lock and filter look-up tables (see "load_lookup_tables")
+    :return: Content of the ROM file
+    """
+    found = [configuration for configuration in configurations if configuration is not None]
+    if not found:
+        raise ValueError("Error, a ROM needs at least one configuration")
+    if len({configuration.specification for configuration in found}) > 1:
+        raise ValueError("Error, all configurations of a ROM have to use the same primitive")
+
+    placeholder = [(address, 0xFFFF, 0x0000) for address, _, _ in get_drp_registers(found[0], lookup_tables)]
+    lines = []
+    for number, configuration in enumerate(configurations):
+        if configuration is None:
+            lines.append(f"// configuration {number}: none, the registers are kept")
+            registers = placeholder
+        else:
+            lines.append(f"// configuration {number}")
+            registers = get_drp_registers(configuration, lookup_tables)
+        lines += [f"{address:02X}{mask:04X}{data:04X}" for address, mask, data in registers]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,109 @@
+"""
+This module contains the feasibility pre-check of jacc.
+It finds requests that can not be fulfilled by a primitive without iterating through any M, D combination.
+Interval arithmetic on the input, pfd, vco and divider ranges gives the frequencies a primitive can produce at all.
+The check is only a necessary condition, a request that passes it may still not have a configuration.
+"""
+from dataclasses import dataclass
+from math import ceil, floor
+from fpga_model import FPGAModel
+from fpga_primitives import ClockBlockConfiguration
+
+# Reasons of FeasibilityIssues
+INPUT_FREQUENCY_OUT_OF_RANGE = "input_frequency_out_of_range"
+NO_VALID_DIVIDER = "no_valid_divider"
+NO_VALID_VCO_FREQUENCY = "no_valid_vco_frequency"
+OUTPUT_NOT_AVAILABLE = "output_not_available"
+OUTPUT_FREQUENCY_OUT_OF_RANGE = "output_frequency_out_of_range"
+OUTPUT_FREQUENCY_UNREACHABLE = "output_frequency_unreachable"
+
+
+@dataclass(frozen=True)
+class FeasibilityIssue:
+    """
+    Reason why a request can not be fulfilled.
+    index is the index of the output clock or None if the issue concerns the whole primitive.
+    """
+    reason: str
+    message: str
+    index: int = None
+
+
+def check_feasibility(fpga: FPGAModel, primitive: ClockBlockConfiguration, f_in_1: float, output_frequencies: dict,
+                      deltas: dict = None, f_out_4_cascade: bool = False, phase_shifts: dict = None) -> list:
+    """
+    Checks whether or not a request can be fulfilled at all.
+    :param fpga: Used fpga model
+    :param primitive: Used primitive
+    :param f_in_1: Input frequency
+    :param output_frequencies: Target frequencies as a dictionary {output index: target frequency}
+    :param deltas: Allowed relative errors as a dictionary {output index: delta}, missing deltas default to 0.5
+    :param f_out_4_cascade: True if the divider 6 may be cascaded into the divider 4
+    :param phase_shifts: Target phase shifts as a dictionary {output index: phase shift}
+    :return: List of FeasibilityIssues, an empty list if no issue was found
+    """
+    specification = primitive.specification
+    deltas = {} if deltas is None else deltas
+
+    # Phase shifts of outputs the primitive does not have can not be configured at all
+    issues = [FeasibilityIssue(OUTPUT_NOT_AVAILABLE, f"{specification} does not have an output clock {index} for "
+                                                     f"the phase shift", index)
+              for index in sorted(phase_shifts or {}) if not 0 <= index < primitive.output_clocks]
+    if issues:
+        return issues
+
+    f_in_min, f_in_max = fpga.get_f_in_min(specification), fpga.get_f_in_max(specification)
+    if not f_in_min <= f_in_1 <= f_in_max:
+        return [FeasibilityIssue(INPUT_FREQUENCY_OUT_OF_RANGE,
+                                 f"Input frequency {f_in_1} is not within [{f_in_min}; {f_in_max}] "
+                                 f"for {specification}")]
+
+    # Interval of D that keeps the pfd frequency within its limitations
+    d_min = max(ceil(f_in_1 / fpga.get_pfd_max(specification)), primitive.d.start)
+    d_max = min(floor(f_in_1 / fpga.get_pfd_min(specification)), primitive.d.end)
+    if d_min > d_max:
+        return [FeasibilityIssue(NO_VALID_DIVIDER,
+                                 f"No D keeps the pfd frequency of input frequency {f_in_1} within "
+                                 f"[{fpga.get_pfd_min(specification)}; {fpga.get_pfd_max(specification)}]")]
+
+    # Interval of the vco frequency that can be reached with M and D
+    vco_min = max(f_in_1 * primitive.m.start / d_max, fpga.get_vco_min(specification))
+    vco_max = min(f_in_1 * primitive.m.end / d_min, fpga.get_vco_max(specification))
+    if vco_min > vco_max:
+        return [FeasibilityIssue(NO_VALID_VCO_FREQUENCY,
+                                 f"No M, D combination keeps the vco frequency of input frequency {f_in_1} within "
+                                 f"[{fpga.get_vco_min(specification)}; {fpga.get_vco_max(specification)}]")]
+
+    f_out_min, f_out_max = fpga.get_f_out_min(specification), fpga.get_f_out_max(specification)
+
+    issues = []
+    for index, target_f_out in output_frequencies.items():
+        if not 0 <= index < primitive.output_clocks:
+            issues.append(FeasibilityIssue(OUTPUT_NOT_AVAILABLE,
+                                           f"{specification} does not have an output clock {index}", index))
+            continue
+
+        # Any frequency within this band is accepted
+        delta = deltas.get(index, 0.5)
+        band_min, band_max = target_f_out * (1 - delta), target_f_out * (1 + delta)
+
+        if band_max < f_out_min or band_min > f_out_max:
+            issues.append(FeasibilityIssue(OUTPUT_FREQUENCY_OUT_OF_RANGE,
+                                           f"Output frequency {target_f_out} (delta {delta}) of clock {index} is not "
+                                           f"within [{f_out_min}; {f_out_max}]", index))
+            continue
+
+        lattice = primitive.get_output_divider(index).get_possible_values()
+        o_min, o_max = lattice[0], lattice[-1]
+        if index == 4 and f_out_4_cascade and specification == "mmcm":
+            o_max *= primitive.get_output_divider(6).get_possible_values()[-1]
+
+        reachable_min = max(vco_min / o_max, f_out_min)
+        reachable_max = min(vco_max / o_min, f_out_max)
+        if band_max < reachable_min or band_min > reachable_max:
+            issues.append(FeasibilityIssue(OUTPUT_FREQUENCY_UNREACHABLE,
+                                           f"Output frequency {target_f_out} (delta {delta}) of clock {index} can not "
+                                           f"be reached, reachable frequencies are within "
+                                           f"[{reachable_min}; {reachable_max}]", index))
+
+    return issues
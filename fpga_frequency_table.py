@@ -0,0 +1,284 @@
+"""
+This module contains the precomputed frequency tables of jacc.
+A frequency table lists every output frequency a primitive of a fpga model can achieve for a fixed input frequency,
+together with the M, D and O values that produce it.
+Tables are written once into a binary file and are memory-mapped at query time.
+A query is a binary search that only touches the records it needs, the file is never loaded as a whole.
+Queries for input frequencies without a table are answered by an enumeration over the divider lattices.
+"""
+import json
+import mmap
+import struct
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from fpga_configurator import ClockingConfigurator
+from fpga_model import FPGAModel
+from fpga_primitives import ClockBlockConfiguration
+
+# Layout of a table file:
+# MAGIC | length of the json header (uint32) | json header | records of all sections
+# A record consists of f_out (float64), m * 8 (uint16), d (uint8) and o * 8 (uint16)
+MAGIC = b"JACCFT01"
+HEADER_LENGTH_STRUCT = struct.Struct("<I")
+RECORD_STRUCT = struct.Struct("<dHBH")
+# M and O are stored as fixed point numbers since their smallest increment is 0.125
+FIXED_POINT_FACTOR = 8
+
+
+@dataclass(frozen=True)
+class FrequencyRecord:
+    """One achievable output frequency and the M, D and O values that produce it"""
+    f_out: float
+    m: float
+    d: int
+    o: float
+
+    def get_vco_frequency(self) -> float:
+        return self.f_out * self.o
+
+
+def get_output_frequency_records(configurator: ClockingConfigurator, f_in_1: float, lattice: tuple) -> list:
+    """
+    Enumerates all output frequencies that can be achieved with one divider lattice.
+    Frequencies that can be produced by multiple (M, D, O) combinations are only listed once.
+    The combination with the smallest D and then the highest vco frequency is kept, as preferred by Xilinx.
+    :param configurator: Configurator of the fpga model and primitive
+    :param f_in_1: Input frequency
+    :param lattice: Sorted tuple of all possible values of the output divider
+    :return: List of FrequencyRecords sorted by their output frequency
+    """
+    rows = []
+    for m, d, f_vco in configurator.get_vco_candidates(f_in_1):
+        # Only dividers that keep the output frequency within the limitations of the fpga model are used
+        rows.extend([(round(f_vco / o, 9), d, -f_vco, m, o)
+                     for o in lattice[bisect_left(lattice, f_vco / configurator.f_out_max):
+                                      bisect_right(lattice, f_vco / configurator.f_out_min)]])
+    rows.sort()
+
+    records = []
+    last_key = None
+    for key, d, negative_f_vco, m, o in rows:
+        if key != last_key:
+            records.append(FrequencyRecord(-negative_f_vco / o, m, d, o))
+            last_key = key
+    return records
+
+
+def write_frequency_table(path: str, fpga: FPGAModel, primitive: ClockBlockConfiguration,
+                          input_frequencies: list) -> None:
+    """
+    Precomputes the achievable output frequencies of a primitive for some input frequencies and writes them into a
+    binary table file.
+    Outputs that share a divider lattice (e.g. all integer dividers) share one section per input frequency.
+    :param path: Path of the table file
+    :param fpga: Used fpga model
+    :param primitive: Used primitive
+    :param input_frequencies: Input frequencies the table is computed for
+    :return: None
+    """
+    configurator = ClockingConfigurator(fpga, primitive)
+    f_in_min = fpga.get_f_in_min(primitive.specification)
+    f_in_max = fpga.get_f_in_max(primitive.specification)
+
+    # Group the outputs by their divider lattice
+    lattices = {}
+    for index in range(primitive.output_clocks):
+        lattices.setdefault(primitive.get_output_divider(index).get_possible_values(), []).append(index)
+
+    sections = []
+    data = []
+    offset = 0
+    for f_in_1 in input_frequencies:
+        if not f_in_min <= f_in_1 <= f_in_max:
+            raise ValueError(f"Error, input frequency {f_in_1} is invalid. Value should be within "
+                             f"[{f_in_min}; {f_in_max}] for {primitive.specification}")
+        for lattice, outputs in lattices.items():
+            records = get_output_frequency_records(configurator, f_in_1, lattice)
+            data.append(b"".join([RECORD_STRUCT.pack(record.f_out, round(record.m * FIXED_POINT_FACTOR),
+                                                     int(record.d), round(record.o * FIXED_POINT_FACTOR))
+                                  for record in records]))
+            sections.append({"f_in_1": f_in_1, "outputs": outputs, "offset": offset, "count": len(records)})
+            offset += len(records) * RECORD_STRUCT.size
+
+    header = json.dumps({"model_name": fpga.model_name, "speed_grades": fpga.speed_grades,
+                         "voltage": fpga.voltage, "specification": primitive.specification,
+                         "sections": sections}).encode()
+
+    with open(path, "wb") as file:
+        file.write(MAGIC + HEADER_LENGTH_STRUCT.pack(len(header)) + header)
+        for section_data in data:
+            file.write(section_data)
+
+
+class FrequencyRecordSection:
+    """
+    Read only sequence view of one section of a memory-mapped table.
+    Indexing returns the output frequency of a record, which allows the usage of the bisect module.
+    """
+
+    def __init__(self, buffer: mmap.mmap, offset: int, count: int):
+        self.buffer = buffer
+        self.offset = offset
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> float:
+        return struct.unpack_from("<d", self.buffer, self.offset + index * RECORD_STRUCT.size)[0]
+
+    def get_record(self, index: int) -> FrequencyRecord:
+        f_out, m, d, o = RECORD_STRUCT.unpack_from(self.buffer, self.offset + index * RECORD_STRUCT.size)
+        return FrequencyRecord(f_out, m / FIXED_POINT_FACTOR, d, o / FIXED_POINT_FACTOR)
+
+
+class FrequencyTable:
+    """
+    Memory-mapped frequency table that has been written by "write_frequency_table".
+    Should be closed after usage, it can also be used as a context manager.
+    """
+
+    def __init__(self, path: str):
+        self.file = open(path, "rb")
+        try:
+            self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can not be mapped
+            self.file.close()
+            raise ValueError(f"Error, \"{path}\" is not a jacc frequency table")
+
+        if self.buffer[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"Error, \"{path}\" is not a jacc frequency table")
+
+        try:
+            header_start = len(MAGIC) + HEADER_LENGTH_STRUCT.size
+            header_length = HEADER_LENGTH_STRUCT.unpack_from(self.buffer, len(MAGIC))[0]
+            header = json.loads(self.buffer[header_start:header_start + header_length])
+            data_start = header_start + header_length
+
+            self.model_name = header["model_name"]
+            self.speed_grades = header["speed_grades"]
+            self.voltage = header["voltage"]
+            self.specification = header["specification"]
+            self.sections = {(section["f_in_1"], index): FrequencyRecordSection(self.buffer,
+                                                                                data_start + section["offset"],
+                                                                                section["count"])
+                             for section in header["sections"]
+                             for index in section["outputs"]}
+        except (struct.error, KeyError, TypeError, ValueError):
+            self.close()
+            raise ValueError(f"Error, the header of the frequency table \"{path}\" is corrupt")
+
+        if any(section.offset + section.count * RECORD_STRUCT.size > len(self.buffer)
+               for section in self.sections.values()):
+            self.close()
+            raise ValueError(f"Error, the frequency table \"{path}\" is truncated")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.buffer.close()
+        self.file.close()
+
+    def is_compatible(self, fpga: FPGAModel, specification: str) -> bool:
+        return self.model_name == fpga.model_name and self.speed_grades == fpga.speed_grades \
+               and self.voltage == fpga.voltage and self.specification == specification
+
+    def get_input_frequencies(self) -> list:
+        return sorted({f_in_1 for f_in_1, _ in self.sections})
+
+    def has_section(self, f_in_1: float, index: int) -> bool:
+        return (f_in_1, index) in self.sections
+
+    def get_nearest(self, f_in_1: float, index: int, target_f_out: float, count: int = 1) -> list:
+        """
+        Looks up the achievable output frequencies that are closest to the target frequency.
+        :param f_in_1: Input frequency, has to be one of the precomputed input frequencies
+        :param index: Index of the output clock
+        :param target_f_out: Target output frequency
+        :param count: Number of records that are returned
+        :return: List of FrequencyRecords sorted by their distance to the target frequency
+        """
+        section = self.sections[(f_in_1, index)]
+        upper_index = bisect_left(section, target_f_out)
+        lower_index = upper_index - 1
+
+        # Walk away from the target in both directions and always take the closer record
+        nearest = []
+        while len(nearest) < count and (lower_index >= 0 or upper_index < len(section)):
+            if upper_index >= len(section) or \
+                    (lower_index >= 0 and target_f_out - section[lower_index] <= section[upper_index] - target_f_out):
+                nearest.append(section.get_record(lower_index))
+                lower_index -= 1
+            else:
+                nearest.append(section.get_record(upper_index))
+                upper_index += 1
+        return nearest
+
+    def get_range(self, f_in_1: float, index: int, f_out_min: float, f_out_max: float) -> list:
+        """
+        :param f_in_1: Input frequency, has to be one of the precomputed input frequencies
+        :param index: Index of the output clock
+        :param f_out_min: Lower boundary of the output frequency range
+        :param f_out_max: Upper boundary of the output frequency range
+        :return: All FrequencyRecords within [f_out_min; f_out_max] sorted by their output frequency
+        """
+        section = self.sections[(f_in_1, index)]
+        return [section.get_record(record_index)
+                for record_index in range(bisect_left(section, f_out_min), bisect_right(section, f_out_max))]
+
+
+def query_nearest_frequencies(fpga: FPGAModel, primitive: ClockBlockConfiguration, f_in_1: float,
+                              output_frequencies: dict, count: int = 5, table: FrequencyTable = None) -> dict:
+    """
+    Looks up the achievable output frequencies that are closest to the target frequency of each output.
+    A compatible table that contains the input frequency is used if one is given.
+    Otherwise only the dividers next to the ideal divider of each vco frequency are enumerated, which is sufficient
+    since the output frequency decreases monotonically with the divider.
+    :param fpga: Used fpga model
+    :param primitive: Used primitive
+    :param f_in_1: Input frequency
+    :param output_frequencies: Target frequencies as a dictionary {output index: target frequency}
+    :param count: Number of frequencies per output
+    :param table: Optional precomputed FrequencyTable
+    :return: Dictionary {output index: list of FrequencyRecords sorted by their distance to the target frequency}
+    """
+    for index in output_frequencies:
+        # Raises a ValueError for outputs the primitive does not have
+        primitive.get_output_divider(index)
+
+    if table is not None and table.is_compatible(fpga, primitive.specification) \
+            and all(table.has_section(f_in_1, index) for index in output_frequencies):
+        return {index: table.get_nearest(f_in_1, index, target_f_out, count)
+                for index, target_f_out in output_frequencies.items()}
+
+    configurator = ClockingConfigurator(fpga, primitive)
+    vco_candidates = configurator.get_vco_candidates(f_in_1)
+
+    nearest_frequencies = {}
+    for index, target_f_out in output_frequencies.items():
+        lattice = primitive.get_output_divider(index).get_possible_values()
+        # Only dividers that keep the output frequency within the limitations of the fpga model are used
+        rows = []
+        for m, d, f_vco in vco_candidates:
+            lower_index = bisect_left(lattice, f_vco / configurator.f_out_max)
+            upper_index = bisect_right(lattice, f_vco / configurator.f_out_min)
+            ideal_index = bisect_left(lattice, f_vco / target_f_out, lower_index, upper_index)
+            rows.extend([(round(f_vco / o, 9), d, -f_vco, m, o)
+                         for o in lattice[max(lower_index, ideal_index - count):min(upper_index, ideal_index + count)]])
+
+        # Frequencies that can be produced by multiple combinations are only listed once (see the table records)
+        records = {}
+        for key, d, negative_f_vco, m, o in sorted(rows, key=lambda row: (abs(target_f_out - row[0]),) + row[:3]):
+            if key not in records:
+                records[key] = FrequencyRecord(-negative_f_vco / o, m, d, o)
+                if len(records) == count:
+                    break
+        nearest_frequencies[index] = list(records.values())
+
+    return nearest_frequencies
@@ -4,6 +4,7 @@ Most of these are here because of separation of concerns.
 They would pollute other modules by making them less readable, if they were defined at other places.
 """
 from fpga_clk_attr import *
+from functools import lru_cache
 import pathlib, os
 from fpga_model import FPGAModel
 
@@ -22,8 +23,39 @@ FPGA_MODELS = {identifier: model
                              for path in FPGA_MODEL_JSON_PATHS]
                for identifier in model.get_identifier()}
 
+# Frequencies (in MHz) of commonly available reference oscillators
+# Used as default input frequencies for precomputed frequency tables
+COMMON_INPUT_FREQUENCIES = [10.0, 12.0, 12.288, 16.0, 19.2, 20.0, 24.0, 25.0, 26.0, 27.0, 32.0, 33.333, 40.0, 48.0,
+                            50.0, 54.0, 62.5, 66.666, 74.25, 100.0, 122.88, 125.0, 148.5, 150.0, 156.25, 200.0]
+
 
 def get_clock_attributes(clock_primitive: str):
+    """
+    :param clock_primitive: "PllBlockConfiguration" or "MmcmBlockConfiguration"
+    :return: Dictionary of new attributes with default values, the keyword arguments of the configuration class
+    """
+    descriptors = get_clock_attribute_descriptors(clock_primitive)
+    if descriptors is None:
+        return None
+
+    # Inlined version of "ClockAttribute.from_descriptor", since every new configuration calls this function
+    clock_attributes = {}
+    for key, attribute_class, descriptor in descriptors:
+        attribute = object.__new__(attribute_class)
+        attribute.descriptor = descriptor
+        attribute.value = descriptor.default_value
+        attribute.on = False
+        clock_attributes[key] = attribute
+    return clock_attributes
+
+
+@lru_cache(maxsize=None)
+def get_clock_attribute_descriptors(clock_primitive: str):
+    """
+    The constant properties of the attributes are only created once and shared by all configurations.
+    :param clock_primitive: "PllBlockConfiguration" or "MmcmBlockConfiguration"
+    :return: Tuple of tuples (key, attribute class, AttributeDescriptor)
+    """
     clock_attributes_pll_and_mmcm = {
         "bandwidth": ListAttribute("BANDWIDTH", "OPTIMIZED", ".BANDWIDTH(@value@)", ["OPTIMIZED", "HIGH", "LOW"]),
 
@@ -107,10 +139,12 @@ def get_clock_attributes(clock_primitive: str):
     }
 
     if clock_primitive == "PllBlockConfiguration":
-        return {**clock_attributes_pll_and_mmcm, **clock_attributes_pll}
+        clock_attributes = {**clock_attributes_pll_and_mmcm, **clock_attributes_pll}
 
     elif clock_primitive == "MmcmBlockConfiguration":
-        return {**clock_attributes_pll_and_mmcm, **clock_attributes_mmcm}
+        clock_attributes = {**clock_attributes_pll_and_mmcm, **clock_attributes_mmcm}
 
     else:
         return None
+
+    return tuple((key, type(attribute), attribute.descriptor) for key, attribute in clock_attributes.items())
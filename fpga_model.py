@@ -50,6 +50,18 @@ class FPGAModel:
         else:
             return [(self.model_name, speed_grade, self.voltage) for speed_grade in self.speed_grades]
 
+    def get_limit_fingerprint(self, specification: str) -> tuple:
+        """
+        Models with the same fingerprint have the same technical limitations for the specified primitive.
+        Therefore a request only has to be solved once for all of them.
+        :param specification: Specification of the primitive ("mmcm" or "pll")
+        :return: Tuple of all limitations of the primitive
+        """
+        return (self.get_f_in_min(specification), self.get_f_in_max(specification),
+                self.get_f_out_min(specification), self.get_f_out_max(specification),
+                self.get_vco_min(specification), self.get_vco_max(specification),
+                self.get_pfd_min(specification), self.get_pfd_max(specification))
+
     def validate_mmcm_input_frequency(self, frequency: float):
         return self.mmcm_f_in_min <= frequency <= self.mmcm_f_in_max
 
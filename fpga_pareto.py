@@ -0,0 +1,96 @@
+"""
+This module contains the multi-objective view on the configuration candidates of jacc.
+
+Instead of the single delta score, every candidate is rated by four objectives that are all minimized:
+    frequency error: Sum of the output frequency errors (absolute or relative like the delta score)
+    phase error: Sum of the phase shift errors
+    vco headroom: Distance of the vco frequency to the maximum vco frequency, a higher vco frequency means less jitter
+    d: DIVCLK_DIVIDE, a smaller D means a higher phase frequency detector (PFD) frequency
+The Pareto front contains all candidates that are not dominated by another candidate, so trade-offs can be picked
+without solving again with different weights.
+
+The front is kept sorted by its objective tuples (lexicographically). A candidate can only be dominated by members that
+are sorted before it and can only dominate members that are sorted after it, so every insert only compares each
+member once and the front is maintained while the candidates are scored.
+"""
+from bisect import bisect_right
+from dataclasses import dataclass
+from fpga_primitives import ClockBlockConfiguration
+from utility import relative_error, absolute_error
+
+
+@dataclass(frozen=True)
+class ParetoPoint:
+    """A configuration and its objectives, see module docstring"""
+    frequency_error: float
+    phase_error: float
+    vco_headroom: float
+    d: int
+    configuration: ClockBlockConfiguration
+
+    def get_objectives(self) -> tuple:
+        return self.frequency_error, self.phase_error, self.vco_headroom, self.d
+
+
+def get_pareto_point(configuration: ClockBlockConfiguration, vco_max: float, output_frequencies: dict,
+                     phase_shifts: dict, use_relative_error: bool = False) -> ParetoPoint:
+    """
+    :param vco_max: Maximum vco frequency of the fpga model and the primitive
+    :param output_frequencies: Target output frequencies {index: frequency}
+    :param phase_shifts: Target phase shifts {index: phase shift}
+    :param use_relative_error: Sum relative instead of absolute errors (like in "set_delta_score")
+    :return: ParetoPoint of the configuration
+    """
+    error = relative_error if use_relative_error else absolute_error
+    return ParetoPoint(
+        frequency_error=sum(error(target, configuration.get_output_frequency(index))
+                            for index, target in output_frequencies.items()),
+        phase_error=sum(error(target, configuration.get_phase_shift(index).value)
+                        for index, target in phase_shifts.items()),
+        vco_headroom=vco_max - configuration.get_vco_frequency(),
+        d=configuration.d.value,
+        configuration=configuration
+    )
+
+
+def dominates(objectives: tuple, other_objectives: tuple) -> bool:
+    """
+    :return: True if no objective is worse than the one of other_objectives, equal objectives dominate each other
+    """
+    return all(objective <= other_objective for objective, other_objective in zip(objectives, other_objectives))
+
+
+class ParetoFront:
+    """
+    Non-dominated ParetoPoints, sorted by their objectives.
+    Points with equal objectives are only kept once (the first one).
+    """
+    def __init__(self):
+        self.objectives = []
+        self.points = []
+
+    def add(self, point: ParetoPoint) -> bool:
+        """
+        Adds the point if it is not dominated and removes the members it dominates.
+        :return: True if the point was added
+        """
+        objectives = point.get_objectives()
+        position = bisect_right(self.objectives, objectives)
+        for index in range(position):
+            if dominates(self.objectives[index], objectives):
+                return False
+
+        kept = [index for index in range(position, len(self.points))
+                if not dominates(objectives, self.objectives[index])]
+        self.objectives[position:] = [objectives] + [self.objectives[index] for index in kept]
+        self.points[position:] = [point] + [self.points[index] for index in kept]
+        return True
+
+    def get_points(self) -> list:
+        """
+        :return: The points of the front sorted by frequency error
+        """
+        return list(self.points)
+
+    def __len__(self) -> int:
+        return len(self.points)
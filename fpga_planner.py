@@ -0,0 +1,211 @@
+"""
+This module contains the clock planner of jacc.
+It distributes all clocks of a design onto as few CMT blocks (tiles) as possible.
+
+All outputs of a tile share one vco frequency, so a set of clocks fits onto one tile if there is an (M, D) combination
+that allows an output divider within the delta of every clock.
+For every clock the compatible (M, D) combinations are stored as bits of an integer (bitset), which makes the check of a
+set of clocks a few AND operations. Sets of clocks that pass this check are confirmed by the ClockingConfigurator.
+"""
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from fpga_configurator import ClockingConfigurator
+from fpga_model import FPGAModel
+from fpga_primitives import ClockBlockConfiguration, get_primitive_by_specification
+from fpga_templates import VERILOG
+
+# Tolerance for the comparison of divider values, otherwise exact frequencies (delta 0) could be missed
+DIVIDER_TOLERANCE = 1e-9
+
+
+@dataclass(frozen=True)
+class ClockRequest:
+    """One clock of a design, delta defaults to 0.5 like in the ClockingConfigurator"""
+    name: str
+    f_in_1: float
+    f_out: float
+    delta: float = 0.5
+
+
+@dataclass
+class TilePlan:
+    """
+    One CMT block of a clock plan.
+    clocks[i] is the clock of output i.
+    """
+    name: str
+    f_in_1: float
+    clocks: list = field(default_factory=lambda: [])
+    configuration: ClockBlockConfiguration = None
+
+    def get_specification(self) -> str:
+        return self.configuration.specification
+
+    def generate_template(self, language: str = VERILOG, port_names: dict = None) -> str:
+        return self.configuration.generate_template(self.name, language, port_names)
+
+
+class ClockPlanner:
+    def __init__(self, fpga: FPGAModel, specifications: tuple = ("pll", "mmcm")):
+        """
+        :param fpga: Used fpga model
+        :param specifications: Usable primitives, the first one that can generate the clocks of a tile is used
+        """
+        self.fpga = fpga
+        self.primitives = {specification: get_primitive_by_specification(specification)
+                           for specification in specifications}
+
+        # Memoization of the vco candidates {(specification, f_in_1): list}, the compatible vco candidates of clocks
+        # {(specification, clock): tuple of bitsets} and the configurations of sets of clocks
+        # {(specification, frozenset of clocks): result of "configure_tile"}
+        self.vco_candidates = {}
+        self.compatible_vco_candidates = {}
+        self.tile_configurations = {}
+
+    def get_vco_candidates(self, specification: str, f_in_1: float) -> list:
+        if (specification, f_in_1) not in self.vco_candidates:
+            primitive = self.primitives[specification]
+            if self.fpga.get_f_in_min(specification) <= f_in_1 <= self.fpga.get_f_in_max(specification):
+                candidates = ClockingConfigurator(self.fpga, primitive).get_vco_candidates(f_in_1)
+            else:
+                candidates = []
+            self.vco_candidates[(specification, f_in_1)] = candidates
+        return self.vco_candidates[(specification, f_in_1)]
+
+    def get_compatible_vco_candidates(self, specification: str, clock: ClockRequest) -> tuple:
+        """
+        :return: Tuple (bitset of output 0, bitset of the other outputs), bit i is set if the vco candidate i has an
+                 output divider that generates the clock within its delta
+        """
+        if (specification, clock) in self.compatible_vco_candidates:
+            return self.compatible_vco_candidates[(specification, clock)]
+
+        primitive = self.primitives[specification]
+        f_out_min = max(clock.f_out * (1 - clock.delta), self.fpga.get_f_out_min(specification))
+        f_out_max = min(clock.f_out * (1 + clock.delta), self.fpga.get_f_out_max(specification))
+
+        bitsets = []
+        for lattice in [primitive.get_output_divider(0).get_possible_values(),
+                        primitive.get_output_divider(1).get_possible_values()]:
+            bitset = 0
+            if f_out_min <= f_out_max:
+                for bit, (_, _, f_vco) in enumerate(self.get_vco_candidates(specification, clock.f_in_1)):
+                    position = bisect_left(lattice, f_vco / f_out_max * (1 - DIVIDER_TOLERANCE))
+                    if position < len(lattice) and lattice[position] <= f_vco / f_out_min * (1 + DIVIDER_TOLERANCE):
+                        bitset |= 1 << bit
+            bitsets.append(bitset)
+
+        self.compatible_vco_candidates[(specification, clock)] = tuple(bitsets)
+        return self.compatible_vco_candidates[(specification, clock)]
+
+    def assign_outputs(self, specification: str, clocks: list) -> list:
+        """
+        Checks whether or not the clocks fit onto one tile based on their compatible vco candidates.
+        Output 0 may have other divider values (fractional divider of the mmcm) than the other outputs, so one clock may
+        use output 0 exclusively.
+        :return: The clocks ordered by their outputs or None if they do not fit onto one tile
+        """
+        if not clocks or len(clocks) > self.primitives[specification].output_clocks:
+            return None
+
+        bitsets = [self.get_compatible_vco_candidates(specification, clock) for clock in clocks]
+
+        # prefixes[i] is the AND of the bitsets of all outputs except output 0 of the clocks before clock i, suffixes
+        # of the clocks after clock i
+        prefixes, suffixes = [-1], [-1]
+        for output_0_bits, other_bits in bitsets:
+            prefixes.append(prefixes[-1] & other_bits)
+        for output_0_bits, other_bits in reversed(bitsets):
+            suffixes.append(suffixes[-1] & other_bits)
+        suffixes.reverse()
+
+        for index, (output_0_bits, other_bits) in enumerate(bitsets):
+            if output_0_bits & prefixes[index] & suffixes[index + 1]:
+                return [clocks[index]] + clocks[:index] + clocks[index + 1:]
+        return None
+
+    def configure_tile(self, specification: str, clocks: list) -> tuple:
+        """
+        :return: Tuple (clocks ordered by their outputs, configuration of the ClockingConfigurator) or None
+        """
+        key = (specification, frozenset(clocks))
+        if key in self.tile_configurations:
+            return self.tile_configurations[key]
+
+        ordered_clocks = self.assign_outputs(specification, clocks)
+        tile = None
+        if ordered_clocks is not None:
+            frequency_args = {"f_in_1": ordered_clocks[0].f_in_1,
+                              **{f"f_out_{index}": clock.f_out for index, clock in enumerate(ordered_clocks)},
+                              **{f"delta_{index}": clock.delta for index, clock in enumerate(ordered_clocks)}}
+            configurator = ClockingConfigurator(self.fpga, self.primitives[specification].get_new_instance())
+            configuration = configurator.configure_primitive(frequency_args, {}, {})
+            if configuration is not None:
+                tile = (ordered_clocks, configuration)
+
+        self.tile_configurations[key] = tile
+        return tile
+
+    def get_tile_configuration(self, clocks: list) -> tuple:
+        """
+        :return: Result of "configure_tile" of the first usable primitive that can generate all clocks or None
+        """
+        for specification in self.primitives:
+            tile = self.configure_tile(specification, clocks)
+            if tile is not None:
+                return tile
+        return None
+
+    def get_flexibility(self, clock: ClockRequest) -> int:
+        """
+        :return: Number of vco candidates the clock is compatible with, used to place inflexible clocks first
+        """
+        return sum(bin(output_0_bits | other_bits).count("1")
+                   for output_0_bits, other_bits
+                   in [self.get_compatible_vco_candidates(specification, clock) for specification in self.primitives])
+
+    def plan(self, clocks: list, module_prefix: str = "clk_tile") -> list:
+        """
+        Distributes the clocks onto tiles by first-fit: clocks are placed on the first tile they fit onto, starting with
+        the least flexible clocks. Only clocks with the same input frequency can share a tile.
+        :param clocks: List of ClockRequests, their names have to be unique
+        :param module_prefix: Tiles are named <module_prefix><tile number>
+        :return: List of TilePlans
+        """
+        if len({clock.name for clock in clocks}) != len(clocks):
+            raise ValueError("Error, the names of the clocks have to be unique")
+
+        for clock in clocks:
+            if self.get_flexibility(clock) == 0:
+                raise ValueError(f"Error, clock {clock.name} ({clock.f_out} MHz from {clock.f_in_1} MHz, delta "
+                                 f"{clock.delta}) can not be generated by any CMT block")
+
+        tiles = []
+        for clock in sorted(clocks, key=lambda clock: (clock.f_in_1, self.get_flexibility(clock), -clock.f_out)):
+            for tile in tiles:
+                if tile.f_in_1 != clock.f_in_1:
+                    continue
+                configured_tile = self.get_tile_configuration(tile.clocks + [clock])
+                if configured_tile is not None:
+                    tile.clocks, tile.configuration = configured_tile
+                    break
+            else:
+                configured_tile = self.get_tile_configuration([clock])
+                if configured_tile is None:
+                    raise ValueError(f"Error, no configuration was found for clock {clock.name}")
+                tiles.append(TilePlan(f"{module_prefix}{len(tiles)}", clock.f_in_1, *configured_tile))
+
+        return tiles
+
+
+def plan_clocks(fpga: FPGAModel, clocks: list, specifications: tuple = ("pll", "mmcm"),
+                module_prefix: str = "clk_tile") -> list:
+    """
+    Distributes the clocks of a design onto as few CMT blocks as possible (see "ClockPlanner.plan").
+    :param fpga: Used fpga model
+    :param clocks: List of ClockRequests
+    :param specifications: Usable primitives, the first one that can generate the clocks of a tile is used
+    :param module_prefix: Tiles are named <module_prefix><tile number>
+    :return: List of TilePlans
+    """
+    return ClockPlanner(fpga, specifications).plan(clocks, module_prefix)
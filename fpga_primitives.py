@@ -2,8 +2,16 @@
 This modules contains classes that save the current state of a configuration.
 """
 from fpga_globals import get_clock_attributes
-from utility import frequency_to_period_ns_precision, period_to_frequency_mhz_precision, absolute_error
+from utility import frequency_to_period_ns_precision, period_to_frequency_mhz_precision
+from utility import exact_ratio
 from fpga_clk_attr import *
+from fpga_templates import generate_module, VERILOG
+from fpga_scoring import DeltaScore
+from collections.abc import Sequence
+from dataclasses import fields
+from functools import lru_cache
+from bisect import bisect_left
+from math import gcd
 
 
 @dataclass
@@ -47,9 +55,14 @@ class ClockBlockConfiguration(ABC):
         # Set specification, m, d, o_list and attributes references
         self.initialize_multiplier_and_divider_references()
 
-    @abstractmethod
-    def generate_template(self) -> str:
-        return ""
+    def generate_template(self, module_name: str = "clk", language: str = VERILOG, port_names: dict = None) -> str:
+        """
+        :param module_name: Name of the module (or entity)
+        :param language: VERILOG or VHDL
+        :param port_names: Dictionary {default port name: port name} of renamed ports
+        :return: Module that instantiates the primitive with this configuration, see fpga_templates
+        """
+        return generate_module(self, module_name, language, port_names)
 
     def get_m_generator(self, start=None, end=None):
         return self.m.get_range_as_generator(start=start, end=end)
@@ -80,6 +93,18 @@ class ClockBlockConfiguration(ABC):
             return self.m.value * period_to_frequency_mhz_precision(self.clkin1_period.value) / \
                    (self.divclk_divide.value * self.o_list[index].value)
 
+    def get_vco_frequency(self) -> float:
+        return self.m.value * period_to_frequency_mhz_precision(self.clkin1_period.value) / self.d.value
+
+    def get_output_signature(self) -> tuple:
+        """
+        Configurations with the same output signature generate the same vco frequency and output clocks.
+        :return: Tuple (exact M/D ratio, ((index, divider value) of all used outputs), cascade of divider 6 into 4)
+        """
+        return (exact_ratio(self.m.value, self.d.value),
+                tuple((index, divider.value) for index, divider in enumerate(self.o_list) if divider.on),
+                self.get_cascade_divider(4) != 1)
+
     def get_output_divider(self, index) -> OutputDivider:
         if not 0 <= index < self.output_clocks:
             raise ValueError(f"Index out of range, primitive does not have output divider with index {index}")
@@ -139,32 +164,8 @@ class ClockBlockConfiguration(ABC):
 
         # Iterate through all outputs that are demanded
         for index, f_out in desired_output_frequencies.items():
-            # Most of the time the divider value cannot be exactly achieved
-            # So instead we have to chose between two values, one of them is greater than our desired value
-            # and the other one is less.
-            # They are called upper and lower bound in this case
-            lower_bound, upper_bound = target_dividers[index].get_bounds_based_on_value((f_in_1 * m) / (d * f_out))
-
-            # Get the output frequencies that would be generated by using the lower/upper bound divider
-            lower_bound_result = self.get_output_frequency(index, o_value=lower_bound)
-            upper_bound_result = self.get_output_frequency(index, o_value=upper_bound)
-
-            # It is possible for the generated frequency to go beyond the technical limitations (fpga_f_out_min/max)
-            # But at least one of them will not make the output frequency go beyond those limitations
-            if lower_bound_result > fpga_f_out_max:
-                # Chose upper_bound if lower_bound makes output frequency go beyond limitations
-                target_dividers[index].value = upper_bound
-            elif upper_bound_result < fpga_f_out_min:
-                # Chose lower_bound if upper_bound makes output frequency go beyond limitations
-                target_dividers[index].value = lower_bound
-            else:
-                # If both the lower and the upper bounds generated frequency is within limitations:
-                # chose the one that has a smaller relative error
-                if relative_error(f_out, upper_bound_result) > relative_error(f_out, lower_bound_result):
-                    target_dividers[index].value = lower_bound
-                else:
-                    target_dividers[index].value = upper_bound
-
+            target_dividers[index].value = self.get_approximated_o_divider(index, m, d, f_in_1, f_out, fpga_f_out_min,
+                                                                           fpga_f_out_max)[0]
             # Activate the target divider
             target_dividers[index].on = True
 
@@ -179,48 +180,93 @@ class ClockBlockConfiguration(ABC):
 
         return True
 
-    def set_delta_score(self, output_frequencies: dict, phase_shifts: dict, use_relative_error: bool = False) -> None:
+    def get_cascade_divider(self, index: int):
         """
-        Gives the configuration a score based on the sum of the relative errors
-        :param use_relative_error:
-        :param use_absolute_error:
-        :param output_frequencies: Target output frequencies that are about to be compared with the produced frequencies
-        :param phase_shifts: Target phase shifts that are about to be compared with the produced phase shifts
-        :return: None
+        :return: Value of the divider that is cascaded behind the output divider, 1 if there is none
         """
+        return 1
 
-        # Add relative error if demanded
-        if use_relative_error:
-            # Get the sum of all relative frequency errors of this configuration
-            frequency_sum = sum([relative_error(target_value, self.get_output_frequency(index))
-                                 for index, target_value in output_frequencies.items()])
-
-            # Get the sum of all relative phase shift error of this configuration
-            phase_shift_sum = sum([relative_error(target_value, self.get_phase_shift(index).value)
-                                   for index, target_value in phase_shifts.items()])
-
-            # Another sum for the duty cycles could be added here if they were implemented
-
-            # Calculate the score
-            # This score assumes that phase shifts are less important than output frequencies,
-            # by giving their errors a lower weight
-            self.delta_score = frequency_sum * 2 + phase_shift_sum
+    def get_approximated_o_divider(self, index: int, m, d, f_in_1: float, f_out: float, fpga_f_out_min: float,
+                                   fpga_f_out_max: float) -> tuple:
+        """
+        Chooses the value of an output divider that generates a frequency as close as possible to f_out.
+        The configuration itself is not changed.
+        :return: Tuple (divider value, generated output frequency)
+        """
+        # The output frequencies are computed from the input period like in "get_output_frequency"
+        f_in_from_period = period_to_frequency_mhz_precision(frequency_to_period_ns_precision(f_in_1))
 
-        else:
-            # Get the sum of all relative frequency errors of this configuration
-            frequency_sum = sum([absolute_error(target_value, self.get_output_frequency(index))
-                                 for index, target_value in output_frequencies.items()])
+        # Most of the time the divider value cannot be exactly achieved
+        # So instead we have to chose between two values, one of them is greater than our desired value
+        # and the other one is less.
+        # They are called upper and lower bound in this case
+        lower_bound, upper_bound = self.o_list[index].get_bounds_based_on_value((f_in_1 * m) / (d * f_out))
 
-            # Get the sum of all relative phase shift error of this configuration
-            phase_shift_sum = sum([absolute_error(target_value, self.get_phase_shift(index).value)
-                                   for index, target_value in phase_shifts.items()])
+        # Get the output frequencies that would be generated by using the lower/upper bound divider
+        cascade_divider = self.get_cascade_divider(index)
+        lower_bound_result = m * f_in_from_period / (d * lower_bound * cascade_divider)
+        upper_bound_result = m * f_in_from_period / (d * upper_bound * cascade_divider)
 
-            # Another sum for the duty cycles could be added here if they were implemented
+        # It is possible for the generated frequency to go beyond the technical limitations (fpga_f_out_min/max)
+        # But at least one of them will not make the output frequency go beyond those limitations
+        if lower_bound_result > fpga_f_out_max:
+            # Chose upper_bound if lower_bound makes output frequency go beyond limitations
+            return upper_bound, upper_bound_result
+        elif upper_bound_result < fpga_f_out_min:
+            # Chose lower_bound if upper_bound makes output frequency go beyond limitations
+            return lower_bound, lower_bound_result
+        # If both the lower and the upper bounds generated frequency is within limitations:
+        # chose the one that has a smaller relative error
+        if relative_error(f_out, upper_bound_result) > relative_error(f_out, lower_bound_result):
+            return lower_bound, lower_bound_result
+        return upper_bound, upper_bound_result
+
+    def get_nearest_o_dividers(self, index: int, m, d, f_in_1: float, f_out: float, count: int,
+                               fpga_f_out_min: float, fpga_f_out_max: float) -> list:
+        """
+        Lists the values of an output divider that generate the frequencies closest to f_out, taken from the divider
+        lattice (see "OutputDivider.get_possible_values"). Values that make the output frequency go beyond the
+        limitations are left out. The configuration itself is not changed.
+        :param count: Maximum number of listed values
+        :return: List of tuples (divider value, generated output frequency), sorted by their relative error
+        """
+        # The output frequencies are computed from the input period like in "get_output_frequency"
+        f_in_from_period = period_to_frequency_mhz_precision(frequency_to_period_ns_precision(f_in_1))
+        cascade_divider = self.get_cascade_divider(index)
+        lattice = self.o_list[index].get_possible_values()
+
+        # Smaller dividers (left) generate higher frequencies, bigger dividers (right) lower ones
+        right = bisect_left(lattice, (f_in_1 * m) / (d * f_out * cascade_divider))
+        left = right - 1
+        nearest = []
+        while len(nearest) < count and (left >= 0 or right < len(lattice)):
+            left_result = m * f_in_from_period / (d * lattice[left] * cascade_divider) if left >= 0 else None
+            right_result = m * f_in_from_period / (d * lattice[right] * cascade_divider) \
+                if right < len(lattice) else None
+            # All values beyond a value that exceeds the limitations exceed them as well
+            if left_result is not None and left_result > fpga_f_out_max:
+                left, left_result = -1, None
+            if right_result is not None and right_result < fpga_f_out_min:
+                right, right_result = len(lattice), None
+
+            if left_result is not None and (right_result is None or
+                                            relative_error(f_out, left_result) < relative_error(f_out, right_result)):
+                nearest.append((lattice[left], left_result))
+                left -= 1
+            elif right_result is not None:
+                nearest.append((lattice[right], right_result))
+                right += 1
+        return nearest
 
-            # Calculate the score
-            # This score assumes that phase shifts are less important than output frequencies,
-            # by giving their errors a lower weight
-            self.delta_score = frequency_sum * 2 + phase_shift_sum
+    def set_delta_score(self, output_frequencies: dict, phase_shifts: dict, use_relative_error: bool = False) -> None:
+        """
+        Gives the configuration a score based on the sum of the errors, see fpga_scoring.DeltaScore
+        :param use_relative_error:
+        :param output_frequencies: Target output frequencies that are about to be compared with the produced frequencies
+        :param phase_shifts: Target phase shifts that are about to be compared with the produced phase shifts
+        :return: None
+        """
+        self.delta_score = DeltaScore(use_relative_error).score(self, output_frequencies, phase_shifts)
 
     def get_result_presentation(self, clock_six_used: bool = True) -> str:
         """
@@ -247,6 +293,119 @@ class ClockBlockConfiguration(ABC):
     def get_new_instance(cls):
         pass
 
+    @classmethod
+    def get_clone(cls):
+        """
+        Cheap alternative to "get_new_instance" for configuration candidates.
+        The clone starts with the default values of the prototype of its class (see "get_prototype"). M, D and the
+        input period are copied right away, every other attribute is only copied from the prototype when it is accessed
+        for the first time. So candidates that only touch M, D and some output dividers do not allocate the other
+        attributes.
+        :return: New configuration with default values
+        """
+        prototype, references, _ = get_prototype(cls)
+        clone = object.__new__(cls)
+        clone.specification = prototype.specification
+        clone.output_clocks = prototype.output_clocks
+        clone.delta_score = None
+        clone.m = clone.__dict__[references["m"]] = prototype.m.copy()
+        clone.d = clone.__dict__[references["d"]] = prototype.d.copy()
+        clone.clkin1_period = prototype.clkin1_period.copy()
+        clone.o_list = ClonedOutputDividers(prototype.o_list)
+        return clone
+
+    def __getattr__(self, name: str):
+        """
+        Only called for attributes that are not set, which are the not yet copied attributes of clones.
+        The references of "initialize_multiplier_and_divider_references" are set on their first access as well.
+        """
+        prototype, references, divider_indices = get_prototype(type(self))
+        if name in divider_indices:
+            # Output dividers of clones are copied by their o_list
+            value = self.o_list[divider_indices[name]]
+        elif name in references:
+            field_names = references[name]
+            value = getattr(self, field_names) if isinstance(field_names, str) \
+                else [getattr(self, field_name) for field_name in field_names]
+        elif name in prototype.__dataclass_fields__:
+            value = getattr(prototype, name).copy()
+        else:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        setattr(self, name, value)
+        return value
+
+
+class ClonedOutputDividers(Sequence):
+    """
+    The o_list of a clone, an output divider is copied from the prototype when it is accessed for the first time.
+    """
+    __slots__ = ("prototype_dividers", "dividers")
+
+    def __init__(self, prototype_dividers: list):
+        self.prototype_dividers = prototype_dividers
+        self.dividers = [None] * len(prototype_dividers)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.dividers)))]
+        divider = self.dividers[index]
+        if divider is None:
+            divider = self.dividers[index] = self.prototype_dividers[index].copy()
+        return divider
+
+    def __len__(self) -> int:
+        return len(self.dividers)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+@lru_cache(maxsize=None)
+def get_prototype(configuration_class) -> tuple:
+    """
+    The prototype is shared by all clones of its class and must not be changed.
+    :param configuration_class: PllBlockConfiguration or MmcmBlockConfiguration
+    :return: Tuple (prototype, references, divider indices), the references map the names "m", "d" and "attributes"
+             to the names of the attributes they reference, the divider indices map the names of the output dividers
+             to their index in o_list
+    """
+    prototype = configuration_class.get_new_instance()
+    field_names = {id(getattr(prototype, attribute_field.name)): attribute_field.name
+                   for attribute_field in fields(prototype)}
+    references = {"m": field_names[id(prototype.m)], "d": field_names[id(prototype.d)],
+                  "attributes": [field_names[id(attribute)] for attribute in prototype.attributes]}
+    divider_indices = {field_names[id(divider)]: index for index, divider in enumerate(prototype.o_list)}
+    return prototype, references, divider_indices
+
+
+@lru_cache(maxsize=None)
+def get_ratio_table(m_values: tuple, d_values: tuple) -> tuple:
+    """
+    Groups all (M, D) combinations by their exact ratio M/D (see "exact_ratio"). The table does not depend on the
+    input frequency, so it is built once per process and shared by every solve with the same M and D values.
+    :param m_values: All possible values of M (see "get_m_generator")
+    :param d_values: All possible values of D (see "get_d_generator")
+    :return: Tuple (ratios, groups), ratios is the sorted tuple of the ratios as floats, groups[i] is the tuple
+             (d values, m values) of the combinations with ratios[i], sorted by D. The cached table is shared by all
+             callers, so it only consists of tuples.
+    """
+    groups = {}
+    d_ratios = [(d, d.as_integer_ratio()) for d in sorted(d_values)]
+    for m in sorted(m_values):
+        # Inlined version of "exact_ratio", M is only converted once
+        m_numerator, m_denominator = m.as_integer_ratio()
+        for d, (d_numerator, d_denominator) in d_ratios:
+            numerator, denominator = m_numerator * d_denominator, m_denominator * d_numerator
+            divisor = gcd(numerator, denominator)
+            group = groups.setdefault((numerator // divisor, denominator // divisor), ([], []))
+            group[0].append(d)
+            group[1].append(m)
+
+    # All combinations of a group have the same float ratio since the division is rounded correctly, the combinations
+    # of a group are sorted by D because M grows with D
+    table = sorted((m_group[0] / d_group[0], tuple(d_group), tuple(m_group)) for d_group, m_group in groups.values())
+    return tuple(ratio for ratio, _, _ in table), tuple((d_group, m_group) for _, d_group, m_group in table)
+
 
 @dataclass
 class PllBlockConfiguration(ClockBlockConfiguration):
@@ -261,42 +420,6 @@ class PllBlockConfiguration(ClockBlockConfiguration):
 
         return "\tPLLE2_BASE #(\n\t\t" + ",\n\t\t".join(attr_strings) + "\n\t)\n"
 
-    def generate_template(self) -> str:
-        return "`timescale 1ps/1ps" \
-               "\nmodule clk" \
-               "\n\t(" \
-               "\n\t\tinput\tclkin1," \
-               "\n\t\tinput\tpwrdwn," \
-               "\n\t\tinput\trst," \
-               "\n\t\tinput\tclkfbin," \
-               "\n\t\toutput\tclkout0," \
-               "\n\t\toutput\tclkout1," \
-               "\n\t\toutput\tclkout2," \
-               "\n\t\toutput\tclkout3," \
-               "\n\t\toutput\tclkout4," \
-               "\n\t\toutput\tclkout5," \
-               "\n\t\toutput\tclkfbout," \
-               "\n\t\toutput\tlocked" \
-               "\n\t);" \
-               "\n\n\t//Here could be your code for wires and input buffers" \
-               f"\n\n{self.__str__()}" \
-               "\tPLLE2_BASE_inst(" \
-               "\n\t\t.CLKOUT0(clkout0)," \
-               "\n\t\t.CLKOUT1(clkout1)," \
-               "\n\t\t.CLKOUT2(clkout2)," \
-               "\n\t\t.CLKOUT3(clkout3)," \
-               "\n\t\t.CLKOUT4(clkout4)," \
-               "\n\t\t.CLKOUT5(clkout5)," \
-               "\n\t\t.CLKFBOUT(clkfbout)," \
-               "\n\t\t.LOCKED(locked)," \
-               "\n\t\t.CLKIN1(clkin1)," \
-               "\n\t\t.PWRDWN(pwrdwn)," \
-               "\n\t\t.RST(rst)," \
-               "\n\t\t.CLKFBIN(clkfbin)" \
-               "\n\t);" \
-               "\n\n\t//Here could be your code for wires and output buffers" \
-               "\n\nendmodule"
-
     def initialize_multiplier_and_divider_references(self):
         self.specification = "pll"
         self.m = self.clkfbout_mult
@@ -334,54 +457,6 @@ class MmcmBlockConfiguration(ClockBlockConfiguration):
                         if attr.on and attr.value != attr.default_value]
         return "\tMMCME2_BASE #(\n\t\t" + ",\n\t\t".join(attr_strings) + "\n\t)\n"
 
-    def generate_template(self) -> str:
-        return "`timescale 1ps/1ps" \
-               "\nmodule clk" \
-               "\n\t(" \
-               "\n\t\tinput\tclkin1," \
-               "\n\t\tinput\tpwrdwn," \
-               "\n\t\tinput\trst," \
-               "\n\t\tinput\tclkfbin," \
-               "\n\t\toutput\tclkout0," \
-               "\n\t\toutput\tclkout0b," \
-               "\n\t\toutput\tclkout1," \
-               "\n\t\toutput\tclkout1b," \
-               "\n\t\toutput\tclkout2," \
-               "\n\t\toutput\tclkout2b," \
-               "\n\t\toutput\tclkout3," \
-               "\n\t\toutput\tclkout3b," \
-               "\n\t\toutput\tclkout4," \
-               "\n\t\toutput\tclkout5," \
-               "\n\t\toutput\tclkout6," \
-               "\n\t\toutput\tclkfbout," \
-               "\n\t\toutput\tclkboutb," \
-               "\n\t\toutput\tlocked" \
-               "\n\t);" \
-               "\n\n\t//Here could be your code for wires and input buffers" \
-               f"\n\n{self.__str__()}" \
-               "\tMMCME2_BASE_inst(" \
-               "\n\t\t.CLKOUT0(clkout0)," \
-               "\n\t\t.CLKOUT0B(clkout0b)," \
-               "\n\t\t.CLKOUT1(clkout1)," \
-               "\n\t\t.CLKOUT1B(clkout1b)," \
-               "\n\t\t.CLKOUT2(clkout2)," \
-               "\n\t\t.CLKOUT2B(clkout2b)," \
-               "\n\t\t.CLKOUT3(clkout3)," \
-               "\n\t\t.CLKOUT3B(clkout3b)," \
-               "\n\t\t.CLKOUT4(clkout4)," \
-               "\n\t\t.CLKOUT5(clkout5)," \
-               "\n\t\t.CLKOUT6(clkout6)," \
-               "\n\t\t.CLKFBOUT(clkfbout)," \
-               "\n\t\t.CLKFBOUTB(clkboutb)," \
-               "\n\t\t.LOCKED(locked)," \
-               "\n\t\t.CLKIN1(clkin1)," \
-               "\n\t\t.PWRDWN(pwrdwn)," \
-               "\n\t\t.RST(rst)," \
-               "\n\t\t.CLKFBIN(clkfbin)" \
-               "\n\t);" \
-               "\n\n\t//Here could be your code for wires and output buffers" \
-               "\n\nendmodule"
-
     def get_output_frequency(self, index: int, o_value=None) -> float:
         """
         :param index: index of the output frequency slot
@@ -398,6 +473,9 @@ class MmcmBlockConfiguration(ClockBlockConfiguration):
             return self.m.value * period_to_frequency_mhz_precision(self.clkin1_period.value) / \
                    (self.divclk_divide.value * temp_o)
 
+    def get_cascade_divider(self, index: int):
+        return self.o_list[6].value if index == 4 and self.clkout4_cascade.on else 1
+
     def initialize_multiplier_and_divider_references(self):
         self.specification = "mmcm"
         self.m = self.clkfbout_mult_f
@@ -466,3 +544,15 @@ class MmcmBlockConfiguration(ClockBlockConfiguration):
     @classmethod
     def get_new_instance(cls):
         return cls(**get_clock_attributes("MmcmBlockConfiguration"))
+
+
+def get_primitive_by_specification(specification: str) -> ClockBlockConfiguration:
+    """
+    :param specification: "pll" or "mmcm", the case is ignored
+    :return: New instance of the primitive
+    """
+    if specification.lower() == "pll":
+        return PllBlockConfiguration.get_new_instance()
+    if specification.lower() == "mmcm":
+        return MmcmBlockConfiguration.get_new_instance()
+    raise ValueError(f"Error, unknown primitive {specification}")
@@ -0,0 +1,203 @@
+"""
+This module contains the ratio constraints of jacc.
+A ratio constraint demands that two outputs are exact rational multiples of each other (e.g. a 1x/2x/4x clock family of
+a DDR interface). All outputs are derived from the same vco frequency, so f_out[first] / f_out[second] = ratio holds
+exactly if O[second] = ratio * O[first].
+
+Constrained outputs form groups, one output of a group (the root) determines the dividers of all other members. The root
+dividers whose derived member dividers are all legal values are computed once per request, which prunes the divider
+search before any (M, D) combination is evaluated. Every root divider allows an interval of vco frequencies (all members
+within their deltas and the output frequency limitations), so (M, D) combinations outside of all intervals are skipped
+without computing any divider. The tighter the family, the fewer root dividers and vco frequencies remain.
+"""
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from fractions import Fraction
+from functools import lru_cache
+from fpga_primitives import ClockBlockConfiguration
+from utility import relative_error
+
+
+@dataclass(frozen=True)
+class RatioConstraint:
+    """f_out[first] / f_out[second] = ratio, the ratio of the target frequencies is used if ratio is None"""
+    first: int
+    second: int
+    ratio: Fraction = None
+
+
+class RatioGroup:
+    def __init__(self, root: int, factors: dict, root_dividers: list, dividers: dict):
+        """
+        :param root: Index of the output that determines the dividers of the group
+        :param factors: O[index] = factor * O[root] for every member {index: Fraction}, the root has the factor 1
+        :param root_dividers: Sorted root divider values whose member dividers are all legal
+        :param dividers: Divider values of every member for every root divider {root divider: {index: divider}}
+        """
+        self.root = root
+        self.factors = factors
+        # The factors are exact, their float values are used for the frequencies of the vco candidates
+        self.float_factors = {index: float(factor) for index, factor in factors.items()}
+        self.root_dividers = root_dividers
+        self.dividers = dividers
+        self.intervals = []
+        self.interval_starts = []
+
+    def get_root_window(self, base: float, output_frequencies: dict, deltas: dict, f_out_min: float,
+                        f_out_max: float) -> tuple:
+        """
+        :param base: M * f_in / D of the vco candidate
+        :return: Tuple (lowest, highest) root divider that keeps all members within their deltas and the output
+                 frequency limitations
+        """
+        lowest, highest = 0, float("inf")
+        for index, factor in self.float_factors.items():
+            target, delta = output_frequencies[index], deltas[index]
+            lowest = max(lowest, base / (target * (1 + delta) * factor), base / (f_out_max * factor))
+            highest = min(highest, base / (f_out_min * factor))
+            if delta < 1:
+                highest = min(highest, base / (target * (1 - delta) * factor))
+        return lowest, highest
+
+    def set_vco_intervals(self, output_frequencies: dict, deltas: dict, f_out_min: float, f_out_max: float) -> None:
+        """
+        Computes the merged intervals of M * f_in / D for which any root divider keeps all members within their deltas
+        and the output frequency limitations.
+        :return: None
+        """
+        intervals = []
+        for divider in self.root_dividers:
+            # The window of the root divider is inverted, the bounds are widened a little bit for rounding errors
+            lowest, highest = 0, float("inf")
+            for index, factor in self.float_factors.items():
+                target, delta = output_frequencies[index], deltas[index]
+                member_divider = divider * factor
+                lowest = max(lowest, f_out_min * member_divider)
+                highest = min(highest, target * (1 + delta) * member_divider, f_out_max * member_divider)
+                if delta < 1:
+                    lowest = max(lowest, target * (1 - delta) * member_divider)
+            if lowest <= highest:
+                intervals.append([float(lowest) * (1 - 1e-12), float(highest) * (1 + 1e-12)])
+        intervals.sort()
+
+        self.intervals = []
+        for interval in intervals:
+            if self.intervals and interval[0] <= self.intervals[-1][1]:
+                self.intervals[-1][1] = max(self.intervals[-1][1], interval[1])
+            else:
+                self.intervals.append(interval)
+        self.interval_starts = [interval[0] for interval in self.intervals]
+
+    def is_vco_possible(self, base: float) -> bool:
+        """
+        :param base: M * f_in / D of the vco candidate
+        :return: False if no root divider can fulfill the group (see "set_vco_intervals")
+        """
+        position = bisect_right(self.interval_starts, base) - 1
+        return position >= 0 and base <= self.intervals[position][1]
+
+    def get_dividers(self, base: float, output_frequencies: dict, deltas: dict, f_out_min: float,
+                     f_out_max: float) -> dict:
+        """
+        Chooses the root divider within the window with the smallest sum of relative errors of the members.
+        If no root divider is within the window, the ones next to it are considered, they violate a delta.
+        :param base: M * f_in / D of the vco candidate
+        :return: Dividers of the members {index: divider value}
+        """
+        lowest, highest = self.get_root_window(base, output_frequencies, deltas, f_out_min, f_out_max)
+        first = bisect_left(self.root_dividers, lowest * (1 - 1e-12))
+        end = bisect_right(self.root_dividers, highest * (1 + 1e-12))
+        ideals = [base / (output_frequencies[index] * factor) for index, factor in self.float_factors.items()]
+        if first >= end:
+            position = bisect_left(self.root_dividers, ideals[0])
+            first, end = max(position - 1, 0), min(position + 1, len(self.root_dividers))
+
+        # Every relative error grows with the distance of the root divider to its ideal value, so the best root
+        # divider of the window is next to or between the ideal values of the members
+        ideal_first = bisect_left(self.root_dividers, min(ideals)) - 1
+        ideal_end = bisect_right(self.root_dividers, max(ideals)) + 1
+        first, end = max(first, min(ideal_first, end - 1)), min(end, max(ideal_end, first + 1))
+
+        best_dividers, best_error = None, None
+        for divider in self.root_dividers[first:end]:
+            dividers = self.dividers[divider]
+            error = sum(relative_error(output_frequencies[index], base / dividers[index]) for index in dividers)
+            if best_error is None or error < best_error:
+                best_dividers, best_error = dividers, error
+        return best_dividers
+
+
+@lru_cache(maxsize=None)
+def get_exact_lattice(lattice: tuple) -> dict:
+    """
+    :param lattice: Sorted divider values (see "get_possible_values")
+    :return: The divider values by their exact values {Fraction: divider value}
+    """
+    return {Fraction(value): value for value in lattice}
+
+
+def get_ratio_groups(primitive: ClockBlockConfiguration, constraints: list, output_frequencies: dict) -> list:
+    """
+    :param primitive: Used primitive
+    :param constraints: List of RatioConstraints
+    :param output_frequencies: Target output frequencies {index: frequency}
+    :return: List of RatioGroups, the outputs of every group are connected by constraints
+    """
+    # O[index] = factor * O[root], the factors are propagated through the constraints
+    factors = {}
+    roots = {}
+    adjacency = {}
+    for constraint in constraints:
+        for index in [constraint.first, constraint.second]:
+            if index not in output_frequencies:
+                raise ValueError(f"Error, the ratio constraint {constraint.first}:{constraint.second} needs the "
+                                 f"output frequency {index}")
+        if constraint.first == constraint.second:
+            raise ValueError(f"Error, the ratio constraint {constraint.first}:{constraint.second} needs two outputs")
+        ratio = constraint.ratio
+        if ratio is None:
+            ratio = Fraction(str(output_frequencies[constraint.first])) / \
+                Fraction(str(output_frequencies[constraint.second]))
+        if ratio <= 0:
+            raise ValueError(f"Error, the ratio of {constraint.first}:{constraint.second} has to be positive")
+        adjacency.setdefault(constraint.first, []).append((constraint.second, ratio))
+        adjacency.setdefault(constraint.second, []).append((constraint.first, 1 / ratio))
+
+    for start in sorted(adjacency):
+        if start in factors:
+            continue
+        factors[start], roots[start] = Fraction(1), start
+        stack = [start]
+        while stack:
+            index = stack.pop()
+            for other, ratio in adjacency[index]:
+                # f[index] / f[other] = ratio  <=>  O[other] = ratio * O[index]
+                factor = factors[index] * ratio
+                if other not in factors:
+                    factors[other], roots[other] = factor, start
+                    stack.append(other)
+                elif factors[other] != factor:
+                    raise ValueError("Error, the ratio constraints contradict each other")
+
+    groups = []
+    for root in sorted(set(roots.values())):
+        group_factors = {index: factor for index, factor in sorted(factors.items()) if roots[index] == root}
+        lattices = {index: primitive.o_list[index].get_possible_values() for index in group_factors}
+        exact_lattices = {index: get_exact_lattice(lattice) for index, lattice in lattices.items()}
+        # Root dividers whose member dividers are beyond the ranges of the member lattices are skipped right away
+        lowest = max(lattice[0] / float(group_factors[index]) for index, lattice in lattices.items())
+        highest = min(lattice[-1] / float(group_factors[index]) for index, lattice in lattices.items())
+        root_dividers, dividers = [], {}
+        for value in lattices[root]:
+            if not lowest * (1 - 1e-12) <= value <= highest * (1 + 1e-12):
+                continue
+            member_dividers = {}
+            for index, factor in group_factors.items():
+                member_dividers[index] = exact_lattices[index].get(Fraction(value) * factor)
+                if member_dividers[index] is None:
+                    break
+            else:
+                root_dividers.append(value)
+                dividers[value] = member_dividers
+        groups.append(RatioGroup(root, group_factors, root_dividers, dividers))
+    return groups
@@ -0,0 +1,119 @@
+"""
+This module contains the machine-readable result of jacc (the JSON output of "jacc.py --format json").
+
+The result is a dictionary with a versioned schema. Fields are only added within a schema version, a field is never
+renamed or removed without increasing RESULT_SCHEMA_VERSION.
+
+Schema version 1:
+    schema_version: 1
+    found: True if a configuration was found
+    fpga_model: Identifier of the fpga model, e.g. ["artix-7", "3", "1.0V"]
+    primitive: "pll" or "mmcm"
+    request: {"frequency_args": {...}, "phase_shift_args": {...}, "other_args": {...}}
+    configuration: None or
+        properties: Attributes of the configuration, see "get_properties_dict"
+        expected_values: {"<output index>": {"frequency": ..., "phase_shift": ..., "duty_cycle": ...}}
+        relative_errors: {"<output index>": relative error of the output frequency}
+        delta_score: Score of the configuration
+        verilog: Verilog code of the configuration (instance or module)
+    feasibility_issues: [{"reason": ..., "message": ..., "index": ...}]
+    stats: {"vco_candidates": ..., "configuration_candidates": ..., "collapsed_equivalents": ...,
+            "solve_time": <seconds>}, the counts belong to the solve of the result (see "get_solve_stats"), searches
+           over input frequencies, fpga models or primitives take them from the solve of the selected result
+    auto_delta: Only if the delta values were searched (see "configure_primitive_with_minimal_delta")
+        {"mode": "uniform" or "scaled", "delta_scale": smallest delta value or factor, None if nothing was found}
+    pareto_front: Only if the Pareto front was collected (see fpga_pareto), sorted by frequency error
+        [{"frequency_error": ..., "phase_error": ..., "vco_headroom": ..., "d": ..., "properties": {...}}]
+    certificate: Only if the optimality certificate was requested (see fpga_certificate)
+        {"optimal": ..., "selected_score": ..., "optimal_score": ..., "runner_up_score": ..., "vco_candidates": ...,
+         "search_space": ..., "pruned_vco_candidates": ..., "evaluated_dividers": ..., "pruned_dividers": ...,
+         "optimal_properties": None or {...}}
+"""
+import json
+from dataclasses import asdict
+from fpga_configurator import ClockingConfigurator
+from fpga_certificate import OptimalityCertificate
+from utility import relative_error
+
+RESULT_SCHEMA_VERSION = 1
+
+
+def get_result_dict(configurator: ClockingConfigurator, fpga_identifier: tuple, frequency_args: dict,
+                    phase_shift_args: dict = None, other_args: dict = None, verilog: str = None,
+                    solve_time: float = None, certificate: OptimalityCertificate = None, stats: dict = None,
+                    auto_delta: str = None) -> dict:
+    """
+    Collects the result of a ClockingConfigurator in the schema of RESULT_SCHEMA_VERSION.
+    :param configurator: ClockingConfigurator after the solve, its selected candidate is the result
+    :param fpga_identifier: Identifier of the used fpga model
+    :param frequency_args: Arguments for "configure_frequency_parameters" of the request
+    :param phase_shift_args: Arguments for "configure_phase_shift_parameters" of the request
+    :param other_args: Arguments for "configure_other_parameters" of the request
+    :param verilog: Verilog code of the configuration, defaults to the instance of the configuration
+    :param solve_time: Duration of the solve in seconds
+    :param certificate: Optimality certificate of the selected candidate
+    :param stats: Counts of the solve that found the result if the configurator did not solve it itself (e.g. a
+                  search in worker processes), defaults to "configurator.get_solve_stats"
+    :param auto_delta: Mode of the delta value search ("uniform" or "scaled") if the delta values were searched
+    :return: Dictionary that can be serialized by json
+    """
+    configuration = configurator.selected_candidate
+    configuration_dict = None
+    if configuration is not None:
+        output_frequencies = {int(key[-1]): value for key, value in frequency_args.items()
+                              if "f_out_" in key and "cascade" not in key and value is not None}
+        configuration_dict = {
+            "properties": configuration.get_properties_dict(),
+            "expected_values": {str(index): values
+                                for index, values in configuration.get_expected_values_dict().items()},
+            "relative_errors": {str(index): relative_error(target, configuration.get_output_frequency(index))
+                                for index, target in output_frequencies.items()},
+            "delta_score": configuration.delta_score,
+            "verilog": str(configuration) if verilog is None else verilog
+        }
+
+    result = {
+        "schema_version": RESULT_SCHEMA_VERSION,
+        "found": configuration is not None,
+        "fpga_model": list(fpga_identifier),
+        "primitive": (configuration or configurator.primitive).specification,
+        "request": {"frequency_args": dict(frequency_args),
+                    "phase_shift_args": {} if phase_shift_args is None else dict(phase_shift_args),
+                    "other_args": {} if other_args is None else dict(other_args)},
+        "configuration": configuration_dict,
+        "feasibility_issues": [asdict(issue) for issue in configurator.feasibility_issues],
+        "stats": {**(configurator.get_solve_stats() if stats is None else stats), "solve_time": solve_time}
+    }
+    if auto_delta is not None:
+        result["auto_delta"] = {"mode": auto_delta, "delta_scale": configurator.delta_scale}
+    if configurator.pareto_front is not None:
+        result["pareto_front"] = [{"frequency_error": point.frequency_error, "phase_error": point.phase_error,
+                                   "vco_headroom": point.vco_headroom, "d": point.d,
+                                   "properties": point.configuration.get_properties_dict()}
+                                  for point in configurator.pareto_front.get_points()]
+    if certificate is not None:
+        result["certificate"] = {
+            "optimal": certificate.is_optimal(),
+            "selected_score": certificate.selected_score,
+            "optimal_score": certificate.optimal_score,
+            "runner_up_score": certificate.runner_up_score,
+            "vco_candidates": certificate.vco_candidates,
+            "search_space": certificate.search_space,
+            "pruned_vco_candidates": certificate.pruned_vco_candidates,
+            "evaluated_dividers": certificate.evaluated_dividers,
+            "pruned_dividers": certificate.pruned_dividers,
+            "optimal_properties": None if certificate.optimal_configuration is None
+            else certificate.optimal_configuration.get_properties_dict()
+        }
+    return result
+
+
+def get_result_json(configurator: ClockingConfigurator, fpga_identifier: tuple, frequency_args: dict,
+                    phase_shift_args: dict = None, other_args: dict = None, verilog: str = None,
+                    solve_time: float = None, certificate: OptimalityCertificate = None, stats: dict = None,
+                    auto_delta: str = None) -> str:
+    """
+    :return: "get_result_dict" serialized as JSON
+    """
+    return json.dumps(get_result_dict(configurator, fpga_identifier, frequency_args, phase_shift_args, other_args,
+                                      verilog, solve_time, certificate, stats, auto_delta), indent=4)
@@ -0,0 +1,216 @@
+"""
+This module contains the scoring functions of jacc, they rate the configuration candidates of a request.
+The candidate with the lowest score is selected (see "ClockingConfigurator.select_candidate").
+
+A scoring function is a subclass of ScoringFunction. "score" rates one configuration, "score_candidates" rates all
+candidates of a request at once. The default "score_candidates" calls "score" per candidate. The built-in functions
+compute it column by column instead (one column of errors per output), so targets, weights and error functions are
+looked up once per output and not once per candidate.
+
+Scores that are sums of one cost per output plus one cost of the vco (SeparableScoringFunction) can be minimized output
+by output, which the optimality certificate (see fpga_certificate) relies on.
+
+Scoring functions are passed to the configurator (see "ClockingConfigurator.scoring_function") and to the searches of
+fpga_search. They are pickled for the worker processes of the searches, so they should not hold lambdas.
+"""
+from abc import ABC, abstractmethod
+from utility import relative_error, absolute_error
+
+ABSOLUTE = "absolute"
+RELATIVE = "relative"
+PPM = "ppm"
+ERROR_UNITS = [ABSOLUTE, RELATIVE, PPM]
+
+# Weight of the frequency errors of the delta score, the phase shift errors have the weight 1
+FREQUENCY_WEIGHT = 2
+
+
+def ppm_error(target_value, actual_value):
+    return relative_error(target_value, actual_value) * 1e6
+
+
+ERROR_FUNCTIONS = {ABSOLUTE: absolute_error, RELATIVE: relative_error, PPM: ppm_error}
+
+
+class ScoringFunction(ABC):
+    """Rates configuration candidates, lower scores are better"""
+
+    @abstractmethod
+    def score(self, configuration, output_frequencies: dict, phase_shifts: dict, vco_max: float) -> float:
+        """
+        :param configuration: Configuration whose output dividers and phase shifts are set
+        :param output_frequencies: Target output frequencies {index: frequency}
+        :param phase_shifts: Target phase shifts {index: phase shift}
+        :param vco_max: Maximum vco frequency of the fpga model and the primitive
+        :return: Score of the configuration
+        """
+
+    def score_candidates(self, configurations: list, output_frequencies: dict, phase_shifts: dict,
+                         vco_max: float) -> list:
+        """
+        Rates all candidates of a request, see "score".
+        :return: List of the scores in the order of configurations
+        """
+        return [self.score(configuration, output_frequencies, phase_shifts, vco_max)
+                for configuration in configurations]
+
+
+class SeparableScoringFunction(ScoringFunction):
+    """
+    Scoring function whose score is the sum of "get_vco_cost" and the costs of the outputs.
+    All costs must not be negative.
+    """
+
+    @abstractmethod
+    def get_frequency_cost(self, index: int, target_frequency: float, frequency: float) -> float:
+        """
+        :return: Cost of the frequency of the output, it must not decrease with the distance to the target
+        """
+
+    @abstractmethod
+    def get_phase_shift_cost(self, index: int, target_phase_shift: float, phase_shift: float) -> float:
+        """
+        :return: Cost of the phase shift of the output
+        """
+
+    def get_vco_cost(self, f_vco: float, d: int, vco_max: float) -> float:
+        """
+        :return: Cost of the vco frequency and D, which do not depend on the outputs
+        """
+        return 0
+
+    def score(self, configuration, output_frequencies: dict, phase_shifts: dict, vco_max: float) -> float:
+        return sum(self.get_frequency_cost(index, target, configuration.get_output_frequency(index))
+                   for index, target in output_frequencies.items()) + \
+            sum(self.get_phase_shift_cost(index, target, configuration.get_phase_shift(index).value)
+                for index, target in phase_shifts.items()) + \
+            self.get_vco_cost(configuration.get_vco_frequency(), configuration.d.value, vco_max)
+
+
+def get_error_sums(configurations: list, targets: dict, get_value, error_function, weights: dict = None) -> list:
+    """
+    Sums up the (weighted) errors of all configurations, one output after the other.
+    The errors are added in the order of targets, so the sums equal the ones of "sum" per configuration.
+    :param targets: Target values {index: value}
+    :param get_value: Function (configuration, index) -> actual value
+    :param error_function: Function (target value, actual value) -> error
+    :param weights: Weight per index, the errors are not weighted if None
+    :return: List of the sums in the order of configurations
+    """
+    sums = [0] * len(configurations)
+    for index, target in targets.items():
+        if weights is None:
+            sums = [error_sum + error_function(target, get_value(configuration, index))
+                    for error_sum, configuration in zip(sums, configurations)]
+        else:
+            weight = weights[index]
+            sums = [error_sum + weight * error_function(target, get_value(configuration, index))
+                    for error_sum, configuration in zip(sums, configurations)]
+    return sums
+
+
+def get_output_frequency(configuration, index: int) -> float:
+    return configuration.get_output_frequency(index)
+
+
+def get_phase_shift(configuration, index: int) -> float:
+    return configuration.get_phase_shift(index).value
+
+
+class DeltaScore(SeparableScoringFunction):
+    """
+    Default score of jacc: Sum of the frequency errors times FREQUENCY_WEIGHT plus the sum of the phase shift errors.
+    This score assumes that phase shifts are less important than output frequencies.
+    """
+
+    def __init__(self, use_relative_error: bool = False):
+        self.use_relative_error = use_relative_error
+
+    def get_frequency_cost(self, index: int, target_frequency: float, frequency: float) -> float:
+        error_function = relative_error if self.use_relative_error else absolute_error
+        return error_function(target_frequency, frequency) * FREQUENCY_WEIGHT
+
+    def get_phase_shift_cost(self, index: int, target_phase_shift: float, phase_shift: float) -> float:
+        error_function = relative_error if self.use_relative_error else absolute_error
+        return error_function(target_phase_shift, phase_shift)
+
+    def score(self, configuration, output_frequencies: dict, phase_shifts: dict, vco_max: float = None) -> float:
+        error_function = relative_error if self.use_relative_error else absolute_error
+        frequency_sum = sum([error_function(target_value, configuration.get_output_frequency(index))
+                             for index, target_value in output_frequencies.items()])
+        phase_shift_sum = sum([error_function(target_value, configuration.get_phase_shift(index).value)
+                               for index, target_value in phase_shifts.items()])
+        return frequency_sum * FREQUENCY_WEIGHT + phase_shift_sum
+
+    def score_candidates(self, configurations: list, output_frequencies: dict, phase_shifts: dict,
+                         vco_max: float = None) -> list:
+        error_function = relative_error if self.use_relative_error else absolute_error
+        frequency_sums = get_error_sums(configurations, output_frequencies, get_output_frequency, error_function)
+        phase_shift_sums = get_error_sums(configurations, phase_shifts, get_phase_shift, error_function)
+        return [frequency_sum * FREQUENCY_WEIGHT + phase_shift_sum
+                for frequency_sum, phase_shift_sum in zip(frequency_sums, phase_shift_sums)]
+
+
+class WeightedScore(SeparableScoringFunction):
+    """
+    Score with user-defined weights and penalties:
+        sum of the frequency errors times their weights (default FREQUENCY_WEIGHT)
+        + sum of the phase shift errors times phase_weight
+        + vco_penalty * (vco_max - f_vco) / vco_max, prefers high vco frequencies (less jitter)
+        + d_penalty * (D - 1), prefers small D (high PFD frequency)
+    """
+
+    def __init__(self, frequency_weights: dict = None, phase_weight: float = 1, error_unit: str = ABSOLUTE,
+                 vco_penalty: float = 0, d_penalty: float = 0):
+        """
+        :param frequency_weights: Weight per output index {index: weight}, missing outputs use FREQUENCY_WEIGHT
+        :param phase_weight: Weight of the phase shift errors
+        :param error_unit: ABSOLUTE (MHz and degrees), RELATIVE or PPM (parts per million) errors
+        :param vco_penalty: Penalty for a vco frequency of 0, it decreases linearly to 0 at the maximum vco frequency
+        :param d_penalty: Penalty per step of D above 1
+        """
+        if error_unit not in ERROR_UNITS:
+            raise ValueError(f"Error, unknown error unit {error_unit}, supported units are {ERROR_UNITS}")
+        frequency_weights = {} if frequency_weights is None else frequency_weights
+        if any(weight < 0 for weight in [*frequency_weights.values(), phase_weight, vco_penalty, d_penalty]):
+            raise ValueError("Error, weights and penalties must not be negative")
+
+        self.frequency_weights = dict(frequency_weights)
+        self.phase_weight = phase_weight
+        self.error_unit = error_unit
+        self.vco_penalty = vco_penalty
+        self.d_penalty = d_penalty
+
+    def get_frequency_cost(self, index: int, target_frequency: float, frequency: float) -> float:
+        return self.frequency_weights.get(index, FREQUENCY_WEIGHT) * \
+            ERROR_FUNCTIONS[self.error_unit](target_frequency, frequency)
+
+    def get_phase_shift_cost(self, index: int, target_phase_shift: float, phase_shift: float) -> float:
+        return self.phase_weight * ERROR_FUNCTIONS[self.error_unit](target_phase_shift, phase_shift)
+
+    def get_vco_cost(self, f_vco: float, d: int, vco_max: float) -> float:
+        penalty = 0
+        if self.vco_penalty:
+            penalty += self.vco_penalty * (vco_max - f_vco) / vco_max
+        if self.d_penalty:
+            penalty += self.d_penalty * (d - 1)
+        return penalty
+
+    def score(self, configuration, output_frequencies: dict, phase_shifts: dict, vco_max: float) -> float:
+        return self.score_candidates([configuration], output_frequencies, phase_shifts, vco_max)[0]
+
+    def score_candidates(self, configurations: list, output_frequencies: dict, phase_shifts: dict,
+                         vco_max: float) -> list:
+        error_function = ERROR_FUNCTIONS[self.error_unit]
+        frequency_sums = get_error_sums(
+            configurations, output_frequencies, get_output_frequency, error_function,
+            {index: self.frequency_weights.get(index, FREQUENCY_WEIGHT) for index in output_frequencies})
+        phase_shift_sums = get_error_sums(configurations, phase_shifts, get_phase_shift, error_function)
+
+        if not self.vco_penalty and not self.d_penalty:
+            return [frequency_sum + self.phase_weight * phase_shift_sum
+                    for frequency_sum, phase_shift_sum in zip(frequency_sums, phase_shift_sums)]
+        return [frequency_sum + self.phase_weight * phase_shift_sum +
+                self.get_vco_cost(configuration.get_vco_frequency(), configuration.d.value, vco_max)
+                for frequency_sum, phase_shift_sum, configuration
+                in zip(frequency_sums, phase_shift_sums, configurations)]
@@ -0,0 +1,313 @@
+"""
+This module contains searches that solve one request several times with different parameters, like different input
+frequencies, fpga models or primitives.
+The single solutions are independent of each other and are computed in parallel processes.
+Parameters that can not lead to a configuration are sorted out by the feasibility pre-check before any process is
+started.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Process, Queue
+from dataclasses import dataclass, field
+from math import inf
+import re
+from fpga_configurator import ClockingConfigurator
+from fpga_model import FPGAModel
+from fpga_primitives import ClockBlockConfiguration, PllBlockConfiguration, MmcmBlockConfiguration, \
+    get_ratio_table
+from fpga_scoring import ScoringFunction, DeltaScore
+
+# Policies of "race_primitives"
+WAIT_FOR_ALL = "wait"
+CANCEL_ON_EXACT = "exact"
+
+# 7-series families from the cheapest to the most expensive one, the names are prefixes of the model names
+MODEL_FAMILY_COST_ORDER = ["artix", "kintex", "virtex"]
+
+
+@dataclass
+class InputFrequencyResult:
+    """Best configuration (or None) that was found for one input frequency candidate"""
+    f_in_1: float
+    configuration: ClockBlockConfiguration = None
+    feasibility_issues: list = field(default_factory=lambda: [])
+    # Counts of the solve (see "ClockingConfigurator.get_solve_stats"), None if it was not solved
+    stats: dict = None
+
+    def get_delta_score(self) -> float:
+        return self.configuration.delta_score if self.configuration is not None else inf
+
+
+@dataclass
+class ModelResult:
+    """Best configuration (or None) that was found for one fpga model"""
+    identifier: tuple
+    fpga: FPGAModel
+    configuration: ClockBlockConfiguration = None
+    feasibility_issues: list = field(default_factory=lambda: [])
+    stats: dict = None
+
+
+@dataclass
+class PrimitiveResult:
+    """Best configuration (or None) that was found for one primitive"""
+    primitive: ClockBlockConfiguration
+    configuration: ClockBlockConfiguration = None
+    feasibility_issues: list = field(default_factory=lambda: [])
+    stats: dict = None
+    cancelled: bool = False
+
+    def get_delta_score(self) -> float:
+        return self.configuration.delta_score if self.configuration is not None else inf
+
+
+def solve_request(fpga: FPGAModel, primitive: ClockBlockConfiguration, frequency_args: dict, phase_shift_args: dict,
+                  other_args: dict, use_relative_error: bool = False, scoring_function: ScoringFunction = None,
+                  use_ratio_table: bool = False) -> tuple:
+    """
+    Configures a new instance of the primitive. Used as the task of a worker process.
+    :param scoring_function: Scoring function of the candidates, None uses the delta score
+    :param use_ratio_table: See "ClockingConfigurator.use_ratio_table"
+    :return: Tuple (the most fitting configuration candidate or None, "ClockingConfigurator.get_solve_stats")
+    """
+    configurator = ClockingConfigurator(fpga, primitive.get_new_instance())
+    configurator.scoring_function = scoring_function
+    configurator.use_ratio_table = use_ratio_table
+    configuration = configurator.configure_primitive(frequency_args, phase_shift_args, other_args,
+                                                     use_relative_error=use_relative_error)
+    return configuration, configurator.get_solve_stats()
+
+
+def solve_request_into_queue(queue: Queue, index: int, arguments: tuple) -> None:
+    """
+    Task of a process of "race_primitives", puts (index, result tuple of "solve_request", None) into the queue.
+    Errors are put into the queue as (index, None, error), so the waiting process never blocks on a dead worker.
+    """
+    try:
+        queue.put((index, solve_request(*arguments), None))
+    except Exception as error:
+        queue.put((index, None, error))
+
+
+def map_requests(arguments: list, processes: int = None) -> list:
+    """
+    Solves some requests with "solve_request", in parallel if more than one process is allowed.
+    :param arguments: List of argument tuples for "solve_request"
+    :param processes: Maximum number of worker processes, None uses the number of processors
+    :return: List of the result tuples of "solve_request" in the order of arguments
+    """
+    if processes == 1 or len(arguments) <= 1:
+        return [solve_request(*args) for args in arguments]
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(solve_request, *zip(*arguments)))
+
+
+def get_input_frequency_candidates(start: float, stop: float, step: float) -> list:
+    """
+    :return: All frequencies from start to stop (inclusive) in steps of step
+    """
+    # Multiplication is used here because it is safer than Addition when it comes to floating point precision
+    return [round(start + factor * step, 9) for factor in range(int(round((stop - start) / step, 9)) + 1)]
+
+
+def rank_input_frequencies(fpga: FPGAModel, primitive: ClockBlockConfiguration, input_frequencies: list,
+                           frequency_args: dict, phase_shift_args: dict, other_args: dict = None,
+                           use_relative_error: bool = False, processes: int = None,
+                           scoring_function: ScoringFunction = None) -> list:
+    """
+    Solves a request for several input frequencies and ranks the input frequencies by the delta score of their best
+    configuration.
+    :param fpga: Used fpga model
+    :param primitive: Used primitive
+    :param input_frequencies: Input frequency candidates
+    :param frequency_args: Arguments for "configure_frequency_parameters" as a kwargs dict, "f_in_1" is ignored
+    :param phase_shift_args: Arguments for "configure_phase_shift_parameters" as a kwargs dict
+    :param other_args: Arguments for "configure_other_parameters" as a kwargs dict
+    :param use_relative_error:
+    :param processes: Maximum number of worker processes, None uses the number of processors
+    :param scoring_function: Scoring function of the candidates, None uses the delta score
+    :return: List of InputFrequencyResults, best first. Input frequencies without configuration are at the end.
+    """
+    other_args = {} if other_args is None else other_args
+    configurator = ClockingConfigurator(fpga, primitive)
+
+    results = []
+    arguments = []
+    for f_in_1 in input_frequencies:
+        candidate_args = {**frequency_args, "f_in_1": f_in_1}
+        result = InputFrequencyResult(f_in_1, feasibility_issues=configurator.check_feasibility(candidate_args,
+                                                                                                 phase_shift_args))
+        if not result.feasibility_issues:
+            arguments.append((fpga, primitive, candidate_args, phase_shift_args, other_args, use_relative_error,
+                              scoring_function))
+        results.append(result)
+
+    # The (M, D) ratio table does not depend on the input frequency, it is built once before the worker processes are
+    # started, so forked workers share it instead of building it for every candidate. A single candidate is solved
+    # faster without it.
+    use_ratio_table = len(arguments) > 1
+    if use_ratio_table:
+        get_ratio_table(tuple(primitive.get_m_generator()), tuple(primitive.get_d_generator()))
+    arguments = [args + (use_ratio_table,) for args in arguments]
+
+    feasible_results = [result for result in results if not result.feasibility_issues]
+    for result, (configuration, stats) in zip(feasible_results, map_requests(arguments, processes)):
+        result.configuration, result.stats = configuration, stats
+
+    return sorted(results, key=lambda result: (result.get_delta_score(), result.f_in_1))
+
+
+def get_model_cost_key(identifier: tuple) -> tuple:
+    """
+    Sort key that orders model identifiers from the cheapest to the most expensive variant.
+    The family decides first (see MODEL_FAMILY_COST_ORDER), within a family slower speed grades (lower grade number)
+    are cheaper, then lower voltages.
+    Unknown families and models without voltage specification are ordered after the others.
+    :param identifier: Model identifier (<7-series model>, <speed grade>[, <voltage>])
+    :return: Sort key
+    """
+    family = next((rank for rank, family in enumerate(MODEL_FAMILY_COST_ORDER) if identifier[0].startswith(family)),
+                  len(MODEL_FAMILY_COST_ORDER))
+    speed_grade_number = re.match(r"\d*", identifier[1]).group()
+    voltage = float(identifier[2].rstrip("V")) if len(identifier) == 3 else inf
+    return family, int(speed_grade_number) if speed_grade_number else inf, voltage, identifier
+
+
+def rank_models(fpga_models: dict, primitive: ClockBlockConfiguration, frequency_args: dict, phase_shift_args: dict,
+                other_args: dict = None, use_relative_error: bool = False, model_names: list = None,
+                processes: int = None, scoring_function: ScoringFunction = None) -> list:
+    """
+    Solves a request for several fpga models.
+    Many models share the same limitations for a primitive, so the request is solved only once per distinct
+    limitation fingerprint (see "FPGAModel.get_limit_fingerprint").
+    :param fpga_models: Dictionary {identifier: FPGAModel} of the models that are considered
+    :param primitive: Used primitive
+    :param frequency_args: Arguments for "configure_frequency_parameters" as a kwargs dict
+    :param phase_shift_args: Arguments for "configure_phase_shift_parameters" as a kwargs dict
+    :param other_args: Arguments for "configure_other_parameters" as a kwargs dict
+    :param use_relative_error:
+    :param model_names: Only models with one of these names (e.g. "artix-7") are considered if given
+    :param processes: Maximum number of worker processes, None uses the number of processors
+    :param scoring_function: Scoring function of the candidates, None uses the delta score
+    :return: List of ModelResults sorted from the cheapest to the most expensive model
+    """
+    other_args = {} if other_args is None else other_args
+    results = [ModelResult(identifier, fpga)
+               for identifier, fpga in fpga_models.items()
+               if model_names is None or identifier[0] in model_names]
+
+    # One representative fpga model per fingerprint
+    representatives = {}
+    for result in results:
+        representatives.setdefault(result.fpga.get_limit_fingerprint(primitive.specification), result.fpga)
+
+    feasibility_issues = {}
+    arguments = []
+    for fingerprint, fpga in representatives.items():
+        feasibility_issues[fingerprint] = ClockingConfigurator(fpga, primitive).check_feasibility(frequency_args)
+        if not feasibility_issues[fingerprint]:
+            arguments.append((fpga, primitive, frequency_args, phase_shift_args, other_args, use_relative_error,
+                              scoring_function))
+
+    solutions = dict(zip([args[0].get_limit_fingerprint(primitive.specification) for args in arguments],
+                         map_requests(arguments, processes)))
+
+    for result in results:
+        fingerprint = result.fpga.get_limit_fingerprint(primitive.specification)
+        result.configuration, result.stats = solutions.get(fingerprint, (None, None))
+        result.feasibility_issues = feasibility_issues[fingerprint]
+
+    return sorted(results, key=lambda result: get_model_cost_key(result.identifier))
+
+
+def get_cheapest_model(model_results: list) -> ModelResult:
+    """
+    :param model_results: ModelResults sorted by "rank_models"
+    :return: The cheapest ModelResult that has a configuration or None
+    """
+    return next((result for result in model_results if result.configuration is not None), None)
+
+
+def race_primitives(fpga: FPGAModel, frequency_args: dict, phase_shift_args: dict, other_args: dict = None,
+                    use_relative_error: bool = False, policy: str = WAIT_FOR_ALL, processes: int = None,
+                    scoring_function: ScoringFunction = None) -> list:
+    """
+    Solves a request with the pll and the mmcm concurrently and ranks the primitives by the delta score of their best
+    configuration. The pll is preferred on ties, because it leaves the mmcm free for other uses.
+    :param fpga: Used fpga model
+    :param frequency_args: Arguments for "configure_frequency_parameters" as a kwargs dict
+    :param phase_shift_args: Arguments for "configure_phase_shift_parameters" as a kwargs dict
+    :param other_args: Arguments for "configure_other_parameters" as a kwargs dict
+    :param use_relative_error:
+    :param policy: WAIT_FOR_ALL waits for both searches,
+                   CANCEL_ON_EXACT cancels the mmcm search as soon as the pll search found an exact configuration, an
+                   exact mmcm configuration still waits for the pll
+    :param processes: 1 solves the primitives one after the other (pll first), otherwise both run in parallel
+    :param scoring_function: Scoring function of the candidates, None uses the delta score
+    :return: List of PrimitiveResults, best first
+    """
+    if policy not in [WAIT_FOR_ALL, CANCEL_ON_EXACT]:
+        raise ValueError(f"Error, unknown policy {policy}")
+    other_args = {} if other_args is None else other_args
+
+    results = []
+    arguments = {}
+    for primitive in [PllBlockConfiguration.get_new_instance(), MmcmBlockConfiguration.get_new_instance()]:
+        primitive_args = dict(frequency_args)
+        # The cascade is a feature of the mmcm only
+        if primitive.specification != "mmcm":
+            primitive_args.pop("f_out_4_cascade", None)
+
+        result = PrimitiveResult(primitive,
+                                 feasibility_issues=ClockingConfigurator(fpga, primitive).check_feasibility(
+                                     primitive_args, phase_shift_args))
+        if not result.feasibility_issues:
+            arguments[len(results)] = (fpga, primitive, primitive_args, phase_shift_args, other_args,
+                                       use_relative_error, scoring_function)
+        results.append(result)
+
+    # The score of a scoring function can be above 0 for an exact configuration (e.g. the penalties of WeightedScore),
+    # so the frequency and phase errors are tested instead, which are 0 exactly if the delta score is 0
+    output_frequencies = {int(key[-1]): value for key, value in frequency_args.items()
+                          if "f_out_" in key and "cascade" not in key}
+    phase_shifts = {int(key[-1]): value for key, value in phase_shift_args.items() if "phase_shift_" in key}
+
+    def is_exact(configuration: ClockBlockConfiguration) -> bool:
+        return policy == CANCEL_ON_EXACT and configuration is not None and \
+            DeltaScore().score(configuration, output_frequencies, phase_shifts) == 0
+
+    finished = set()
+    if processes == 1 or len(arguments) <= 1:
+        for index, args in arguments.items():
+            results[index].configuration, results[index].stats = solve_request(*args)
+            finished.add(index)
+            if is_exact(results[index].configuration):
+                break
+    else:
+        queue = Queue()
+        running = {index: Process(target=solve_request_into_queue, args=(queue, index, args))
+                   for index, args in arguments.items()}
+        for process in running.values():
+            process.start()
+
+        # The results are taken from the queue before joining, a process can not end while its result is queued
+        while running:
+            index, solution, error = queue.get()
+            running.pop(index).join()
+            # An exact result only cancels the search of a primitive that comes after it, so the pll stays preferred
+            # on ties no matter which process reports first
+            if error is not None or (is_exact(solution[0]) and all(other > index for other in running)):
+                for process in running.values():
+                    process.terminate()
+                    process.join()
+                running.clear()
+            if error is not None:
+                raise error
+            results[index].configuration, results[index].stats = solution
+            finished.add(index)
+
+    for index in arguments:
+        results[index].cancelled = index not in finished
+
+    # Stable sort, so the pll stays in front of the mmcm on ties
+    return sorted(results, key=lambda result: result.get_delta_score())
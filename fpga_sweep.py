@@ -0,0 +1,233 @@
+"""
+This module contains the frequency sweep of jacc.
+It solves a request for a whole range of target frequencies of one output (e.g. 100 MHz to 200 MHz in 0.5 MHz steps).
+
+The (M, D) combinations and the dividers of all other outputs do not depend on the swept target, so they are computed
+only once. Combinations that violate the delta of another output are dropped right away.
+The remaining combinations are sorted by their vco frequency. For a divider O the combinations closest to a target are
+then found by binary search for target * O, so walking outwards from there lists them in the order of the smallest error
+they could reach with O. A heap merges these walks of all dividers, so the combinations are visited in the order of a
+lower bound of their score. Only combinations whose lower bound can compete with the best score so far are solved, which
+are usually a handful instead of all of them.
+The selected configuration is the same as the one of a separate "ClockingConfigurator.configure_primitive" call.
+The sweep always uses the delta score (see "fpga_scoring.DeltaScore"), its lower bounds weight the frequency errors with
+the same FREQUENCY_WEIGHT, other scoring functions are not supported.
+"""
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from heapq import heapify, heappop, heappush
+from fpga_configurator import ClockingConfigurator
+from fpga_model import FPGAModel
+from fpga_primitives import ClockBlockConfiguration
+from fpga_scoring import FREQUENCY_WEIGHT
+from utility import relative_error, absolute_error, period_to_frequency_mhz_precision, \
+    frequency_to_period_ns_precision
+
+# Tolerance of the lower bounds, they are computed in another order than the scores and may differ in the last bits
+SCORE_TOLERANCE = 1e-9
+
+
+@dataclass
+class SweepResult:
+    """Best configuration (or None) that was found for one target frequency of the swept output"""
+    f_out: float
+    configuration: ClockBlockConfiguration = None
+    feasibility_issues: list = field(default_factory=lambda: [])
+
+
+class FrequencySweep:
+    def __init__(self, fpga: FPGAModel, primitive: ClockBlockConfiguration, frequency_args: dict, index: int,
+                 phase_shift_args: dict = None, other_args: dict = None, use_relative_error: bool = False):
+        """
+        :param fpga: Used fpga model
+        :param primitive: Used primitive
+        :param frequency_args: Arguments for "configure_frequency_parameters" as a kwargs dict, the target frequency
+                               of the swept output is replaced by every target
+        :param index: Index of the swept output
+        :param phase_shift_args: Arguments for "configure_phase_shift_parameters" as a kwargs dict
+        :param other_args: Arguments for "configure_other_parameters" as a kwargs dict
+        :param use_relative_error:
+        """
+        if not 0 <= index < primitive.output_clocks:
+            raise ValueError(f"Error, {primitive.specification} does not have an output {index}")
+        # Like the ClockingConfigurator the sweep needs the output 0
+        if index != 0 and frequency_args.get("f_out_0") is None:
+            raise ValueError("Error, the output frequency 0 has to be specified")
+
+        self.fpga = fpga
+        self.primitive = primitive
+        self.frequency_args = frequency_args
+        self.index = index
+        self.phase_shift_args = {} if phase_shift_args is None else phase_shift_args
+        self.other_args = {} if other_args is None else other_args
+        self.use_relative_error = use_relative_error
+        self.configurator = ClockingConfigurator(fpga, primitive.get_new_instance())
+
+        # Phase shifts filter the configurations and the cascade couples the outputs 4 and 6, both need the
+        # configurations of all combinations, which are updated by the ClockingConfigurator instead
+        self.use_configurator_update = bool(self.phase_shift_args) or frequency_args.get("f_out_4_cascade", False)
+        if self.use_configurator_update:
+            return
+
+        f_in_1 = frequency_args["f_in_1"]
+        self.f_in_from_period = period_to_frequency_mhz_precision(frequency_to_period_ns_precision(f_in_1))
+        self.delta = frequency_args.get(f"delta_{index}", 0.5)
+        self.configurator.f_in_1 = f_in_1
+        self.configurator.d_min = self.configurator.get_d_m_min_max(f_in_1)[0]
+        self.m_ideal = self.configurator.get_m_ideal()
+
+        other_frequencies = {int(key[-1]): value for key, value in frequency_args.items()
+                             if "f_out_" in key and "cascade" not in key and value is not None
+                             and int(key[-1]) != index}
+        other_deltas = {output: frequency_args.get(f"delta_{output}", 0.5) for output in other_frequencies}
+
+        # States of the (M, D) combinations that fulfill the deltas of all other outputs, sorted by vco frequency
+        # Input frequencies beyond the limitations are rejected by the feasibility pre-check of every target anyway
+        vco_candidates = self.configurator.get_vco_candidates(f_in_1) \
+            if fpga.get_f_in_min(primitive.specification) <= f_in_1 <= fpga.get_f_in_max(primitive.specification) \
+            else []
+        self.vco_states = []
+        for position, (m, d, _) in enumerate(vco_candidates):
+            vco_state = self.configurator.get_vco_state(f_in_1, m, d, other_frequencies)
+            if self.configurator.is_vco_state_valid(vco_state, other_deltas):
+                # The position in the vco candidates decides between completely equal candidates
+                self.vco_states.append((m * self.f_in_from_period / d, position, vco_state))
+        self.vco_states.sort(key=lambda state: state[0])
+        self.vco_frequencies = [f_vco for f_vco, _, _ in self.vco_states]
+
+        # Scores of the other outputs, a lower bound for the scores of the combinations
+        error_function = relative_error if use_relative_error else absolute_error
+        self.other_errors = [{output: error_function(target_f_out, self.get_output_frequency(vco_state, output))
+                              for output, target_f_out in other_frequencies.items()}
+                             for _, _, vco_state in self.vco_states]
+        self.min_other_score = min([sum(errors.values()) for errors in self.other_errors], default=0) * FREQUENCY_WEIGHT
+
+    def get_output_frequency(self, vco_state: list, output: int) -> float:
+        """
+        :return: Output frequency of the state like "get_output_frequency" of the configuration computes it
+        """
+        m, d, dividers, _ = vco_state
+        return m * self.f_in_from_period / (d * dividers[output])
+
+    def get_frequency_args(self, f_out: float) -> dict:
+        return {**self.frequency_args, f"f_out_{self.index}": f_out}
+
+    def solve(self, f_out: float) -> SweepResult:
+        """
+        Solves the request for one target frequency of the swept output.
+        :return: SweepResult
+        """
+        frequency_args = self.get_frequency_args(f_out)
+        result = SweepResult(f_out, feasibility_issues=self.configurator.check_feasibility(frequency_args))
+        if result.feasibility_issues:
+            self.configurator.reject_request()
+            return result
+
+        if self.use_configurator_update:
+            if self.configurator.last_request is None:
+                result.configuration = self.configurator.configure_primitive(
+                    frequency_args, self.phase_shift_args, self.other_args, use_relative_error=self.use_relative_error)
+            else:
+                result.configuration = self.configurator.update(**{f"f_out_{self.index}": f_out})
+            return result
+
+        best_state = self.get_best_vco_state(frequency_args, f_out)
+        if best_state is None:
+            self.configurator.reject_request()
+            return result
+
+        self.configurator.configuration_candidates = [
+            self.configurator.get_configuration_from_vco_state(frequency_args["f_in_1"], best_state)]
+        result.configuration = self.configurator.score_and_select_candidate(frequency_args, {}, self.other_args,
+                                                                           self.use_relative_error)
+        return result
+
+    def get_best_vco_state(self, frequency_args: dict, f_out: float) -> list:
+        """
+        Visits the combinations in the order of the lower bound of their score until no combination can compete with
+        the best one anymore.
+        The order of the candidates is the same as in "ClockingConfigurator.select_candidate".
+        :return: The state of the best combination including the swept output or None
+        """
+        lattice = self.primitive.get_output_divider(self.index).get_possible_values()
+        if not self.vco_frequencies or f_out <= 0:
+            return None
+
+        # Dividers that can generate f_out within its delta with any of the vco frequencies
+        first_divider = bisect_left(lattice, self.vco_frequencies[0] / (f_out * (1 + self.delta))
+                                    * (1 - SCORE_TOLERANCE))
+        last_divider = len(lattice) if self.delta >= 1 else \
+            bisect_right(lattice, self.vco_frequencies[-1] / (f_out * (1 - self.delta)) * (1 + SCORE_TOLERANCE))
+
+        # Every divider walks downwards (-1) and upwards (+1) from the vco frequency closest to f_out * O
+        walks = []
+        for divider in lattice[first_divider:last_divider]:
+            position = bisect_left(self.vco_frequencies, f_out * divider)
+            for step, start in [(-1, position - 1), (1, position)]:
+                if 0 <= start < len(self.vco_frequencies):
+                    walks.append((abs(self.vco_frequencies[start] / divider - f_out), divider, step, start))
+        heapify(walks)
+
+        output_frequencies = {int(key[-1]): value for key, value in frequency_args.items()
+                              if "f_out_" in key and "cascade" not in key and value is not None}
+        error_function = relative_error if self.use_relative_error else absolute_error
+        visited = set()
+        best_key, best_state = None, None
+        while walks:
+            distance, divider, step, position = heappop(walks)
+            lower_bound = distance / f_out if self.use_relative_error else distance
+            if distance / f_out > self.delta * (1 + SCORE_TOLERANCE) or \
+                    (best_key is not None and
+                     self.min_other_score + lower_bound * FREQUENCY_WEIGHT > best_key[0] + SCORE_TOLERANCE):
+                break
+            if 0 <= position + step < len(self.vco_frequencies):
+                heappush(walks, (abs(self.vco_frequencies[position + step] / divider - f_out), divider, step,
+                                 position + step))
+
+            if position in visited:
+                continue
+            visited.add(position)
+            if best_key is not None and \
+                    (sum(self.other_errors[position].values()) + lower_bound) * FREQUENCY_WEIGHT > \
+                    best_key[0] + SCORE_TOLERANCE:
+                continue
+
+            _, candidate_position, (m, d, dividers, errors) = self.vco_states[position]
+            divider_value, f_out_actual = self.primitive.get_approximated_o_divider(
+                self.index, m, d, frequency_args["f_in_1"], f_out, self.configurator.f_out_min,
+                self.configurator.f_out_max)
+            if relative_error(f_out, f_out_actual) > self.delta:
+                continue
+
+            vco_state = [m, d, {**dividers, self.index: divider_value},
+                         {**errors, self.index: relative_error(f_out, f_out_actual)}]
+            # The score is summed up in the order of the outputs like in "set_delta_score"
+            score = sum([self.other_errors[position][output] if output != self.index
+                         else error_function(f_out, self.get_output_frequency(vco_state, output))
+                         for output in output_frequencies]) * FREQUENCY_WEIGHT
+            key = (score, relative_error(self.m_ideal, m), d, m, candidate_position)
+            if best_key is None or key < best_key:
+                best_key, best_state = key, vco_state
+
+        return best_state
+
+
+def sweep_output_frequency(fpga: FPGAModel, primitive: ClockBlockConfiguration, frequency_args: dict, index: int,
+                           f_outs: list, phase_shift_args: dict = None, other_args: dict = None,
+                           use_relative_error: bool = False):
+    """
+    Solves a request for several target frequencies of one output with the delta score, see "FrequencySweep".
+    The results are yielded one by one, so they can be written while the sweep goes on.
+    :param fpga: Used fpga model
+    :param primitive: Used primitive
+    :param frequency_args: Arguments for "configure_frequency_parameters" as a kwargs dict
+    :param index: Index of the swept output
+    :param f_outs: Target frequencies of the swept output
+    :param phase_shift_args: Arguments for "configure_phase_shift_parameters" as a kwargs dict
+    :param other_args: Arguments for "configure_other_parameters" as a kwargs dict
+    :param use_relative_error:
+    :return: Generator of SweepResults in the order of f_outs
+    """
+    sweep = FrequencySweep(fpga, primitive, frequency_args, index, phase_shift_args, other_args, use_relative_error)
+    for f_out in f_outs:
+        yield sweep.solve(f_out)
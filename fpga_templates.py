@@ -0,0 +1,173 @@
+"""
+This module contains the template engine of jacc, which turns configurations into Verilog or VHDL modules.
+
+The frame of a module (ports, instance and port map) only depends on the primitive, the language and the port names.
+It is compiled once into a tuple of text pieces, so a module is generated by joining these pieces with its module name
+and its parameters. Several modules can be written into one file with a single write (see "write_modules").
+"""
+from collections import Counter
+from functools import lru_cache
+import re
+
+VERILOG = "verilog"
+VHDL = "vhdl"
+LANGUAGES = [VERILOG, VHDL]
+
+PRIMITIVE_NAMES = {"pll": "PLLE2_BASE", "mmcm": "MMCME2_BASE"}
+
+# Ports of the modules as tuples (direction, port of the primitive, default port name of the module)
+PORTS = {
+    "pll": [("in", "CLKIN1", "clkin1"), ("in", "PWRDWN", "pwrdwn"), ("in", "RST", "rst"), ("in", "CLKFBIN", "clkfbin"),
+            ("out", "CLKOUT0", "clkout0"), ("out", "CLKOUT1", "clkout1"), ("out", "CLKOUT2", "clkout2"),
+            ("out", "CLKOUT3", "clkout3"), ("out", "CLKOUT4", "clkout4"), ("out", "CLKOUT5", "clkout5"),
+            ("out", "CLKFBOUT", "clkfbout"), ("out", "LOCKED", "locked")],
+    "mmcm": [("in", "CLKIN1", "clkin1"), ("in", "PWRDWN", "pwrdwn"), ("in", "RST", "rst"),
+             ("in", "CLKFBIN", "clkfbin"), ("out", "CLKOUT0", "clkout0"), ("out", "CLKOUT0B", "clkout0b"),
+             ("out", "CLKOUT1", "clkout1"), ("out", "CLKOUT1B", "clkout1b"), ("out", "CLKOUT2", "clkout2"),
+             ("out", "CLKOUT2B", "clkout2b"), ("out", "CLKOUT3", "clkout3"), ("out", "CLKOUT3B", "clkout3b"),
+             ("out", "CLKOUT4", "clkout4"), ("out", "CLKOUT5", "clkout5"), ("out", "CLKOUT6", "clkout6"),
+             ("out", "CLKFBOUT", "clkfbout"), ("out", "CLKFBOUTB", "clkboutb"), ("out", "LOCKED", "locked")],
+}
+
+# Generics of the unisim library that are integers, all other numeric generics are reals
+VHDL_INTEGER_GENERICS = {"DIVCLK_DIVIDE", "CLKFBOUT_MULT", "CLKOUT0_DIVIDE", "CLKOUT1_DIVIDE", "CLKOUT2_DIVIDE",
+                         "CLKOUT3_DIVIDE", "CLKOUT4_DIVIDE", "CLKOUT5_DIVIDE", "CLKOUT6_DIVIDE"}
+VHDL_BOOLEAN_GENERICS = {"STARTUP_WAIT", "CLKOUT4_CASCADE"}
+
+IDENTIFIER_PATTERN = re.compile(r"[A-Za-z][A-Za-z0-9_]*")
+
+
+def check_identifier(name: str) -> None:
+    """
+    Raises a ValueError if the name can not be used as identifier in Verilog and VHDL.
+    """
+    if not IDENTIFIER_PATTERN.fullmatch(name) or "__" in name or name.endswith("_"):
+        raise ValueError(f"Error, \"{name}\" is not a valid module or port name")
+
+
+def get_port_names(specification: str, port_names: dict = None) -> tuple:
+    """
+    :param specification: Specification of the primitive ("pll" or "mmcm")
+    :param port_names: Dictionary {default port name: port name} of renamed ports
+    :return: Tuple of the port names of the module in the order of PORTS
+    """
+    port_names = {} if port_names is None else port_names
+    default_names = [default_name for _, _, default_name in PORTS[specification]]
+    unknown_ports = set(port_names) - set(default_names)
+    if unknown_ports:
+        raise ValueError(f"Error, the {specification} does not have the ports {sorted(unknown_ports)}")
+
+    names = tuple(port_names.get(default_name, default_name) for default_name in default_names)
+    for name in names:
+        check_identifier(name)
+    if len({name.lower() for name in names}) != len(names):
+        raise ValueError(f"Error, the port names {list(names)} are not unique")
+    return names
+
+
+@lru_cache(maxsize=None)
+def compile_module_frame(specification: str, language: str, port_names: tuple) -> tuple:
+    """
+    Compiles the frame of a module.
+    :param specification: Specification of the primitive ("pll" or "mmcm")
+    :param language: VERILOG or VHDL
+    :param port_names: Port names of the module in the order of PORTS
+    :return: Tuple of text pieces, the module is "".join(pieces with the module name and the parameters in between),
+             see "generate_module"
+    """
+    primitive_name = PRIMITIVE_NAMES[specification]
+    ports = [(direction, primitive_port, name) for (direction, primitive_port, _), name
+             in zip(PORTS[specification], port_names)]
+    # The instance connects the outputs first
+    connections = [port for port in ports if port[0] == "out"] + [port for port in ports if port[0] == "in"]
+
+    if language == VERILOG:
+        return ("`timescale 1ps/1ps\nmodule ",
+                "\n\t(\n" +
+                ",\n".join(f"\t\t{direction}put\t{name}" for direction, _, name in ports) +
+                "\n\t);\n\n\t//Here could be your code for wires and input buffers\n\n",
+                f"\t{primitive_name}_inst(\n" +
+                ",\n".join(f"\t\t.{primitive_port}({name})" for _, primitive_port, name in connections) +
+                "\n\t);\n\n\t//Here could be your code for wires and output buffers\n\nendmodule")
+
+    if language == VHDL:
+        return ("library ieee;\nuse ieee.std_logic_1164.all;\n\nlibrary unisim;\nuse unisim.vcomponents.all;\n\n"
+                "entity ",
+                " is\n\tport (\n" +
+                ";\n".join(f"\t\t{name} : {direction} std_logic" for direction, _, name in ports) +
+                "\n\t);\nend entity;\n\narchitecture rtl of ",
+                " is\n\n\t-- Here could be your code for signals\n\n"
+                "begin\n\n\t-- Here could be your code for input buffers\n\n"
+                f"\t{primitive_name}_inst : {primitive_name}\n",
+                "\t\tport map (\n" +
+                ",\n".join(f"\t\t\t{primitive_port} => {name}" for _, primitive_port, name in connections) +
+                "\n\t\t);\n\n\t-- Here could be your code for output buffers\n\nend architecture;")
+
+    raise ValueError(f"Error, unknown language {language}, supported languages are {LANGUAGES}")
+
+
+def get_vhdl_value(attribute) -> str:
+    """
+    :return: Value of the attribute as VHDL literal of the type of its generic
+    """
+    if attribute.name in VHDL_BOOLEAN_GENERICS:
+        return "TRUE" if attribute.value else "FALSE"
+    if isinstance(attribute.value, str):
+        return f"\"{attribute.value}\""
+    value = attribute.get_truncated_value()
+    if attribute.name in VHDL_INTEGER_GENERICS:
+        return str(int(value))
+    return str(float(value))
+
+
+def get_vhdl_generic_map(configuration) -> str:
+    generics = [f"\t\t\t{attribute.name} => {get_vhdl_value(attribute)}" for attribute in configuration.attributes
+                if attribute.on and attribute.value != attribute.default_value]
+    if not generics:
+        return ""
+    return "\t\tgeneric map (\n" + ",\n".join(generics) + "\n\t\t)\n"
+
+
+def generate_module(configuration, module_name: str = "clk", language: str = VERILOG,
+                    port_names: dict = None) -> str:
+    """
+    :param configuration: PllBlockConfiguration or MmcmBlockConfiguration
+    :param module_name: Name of the module (or entity)
+    :param language: VERILOG or VHDL
+    :param port_names: Dictionary {default port name: port name} of renamed ports
+    :return: The module as string
+    """
+    check_identifier(module_name)
+    frame = compile_module_frame(configuration.specification, language,
+                                 get_port_names(configuration.specification, port_names))
+    if language == VERILOG:
+        return "".join((frame[0], module_name, frame[1], str(configuration), frame[2]))
+    return "".join((frame[0], module_name, frame[1], module_name, frame[2], get_vhdl_generic_map(configuration),
+                    frame[3]))
+
+
+def generate_modules(modules: list, language: str = VERILOG, port_names: dict = None) -> str:
+    """
+    Generates several modules for one file.
+    :param modules: List of tuples (module name, configuration)
+    :param language: VERILOG or VHDL
+    :param port_names: Dictionary {default port name: port name} of renamed ports, used for all modules
+    :return: The modules separated by empty lines
+    """
+    # VHDL is case insensitive
+    names = Counter(module_name.lower() if language == VHDL else module_name for module_name, _ in modules)
+    duplicates = sorted(name for name, count in names.items() if count > 1)
+    if duplicates:
+        raise ValueError(f"Error, the module names {duplicates} are used more than once")
+
+    return "\n\n".join(generate_module(configuration, module_name, language, port_names)
+                       for module_name, configuration in modules) + "\n"
+
+
+def write_modules(path: str, modules: list, language: str = VERILOG, port_names: dict = None) -> None:
+    """
+    Writes several modules into one file with a single write, see "generate_modules".
+    """
+    content = generate_modules(modules, language, port_names)
+    with open(path, "w") as file:
+        file.write(content)
@@ -4,27 +4,49 @@ This module contains the 'main.py' of jacc.
 It is quite messy and could need an upgrade.
 """
 
-from fpga_argparse import get_base_arg_parser, get_configuration_arg_parser
-from fpga_globals import FPGA_MODELS
-from fpga_primitives import PllBlockConfiguration, MmcmBlockConfiguration
+from fpga_argparse import get_base_arg_parser, get_configuration_arg_parser, get_table_arg_parser, \
+    get_query_arg_parser, get_plan_arg_parser, get_chain_arg_parser, get_sweep_arg_parser, get_analyze_arg_parser, \
+    BASE_MODE_ONLY_FLAGS
+from fpga_globals import FPGA_MODELS, COMMON_INPUT_FREQUENCIES
+from fpga_primitives import get_primitive_by_specification
 from fpga_configurator import ClockingConfigurator
+from fpga_frequency_table import write_frequency_table, query_nearest_frequencies, FrequencyTable
+from fpga_search import rank_input_frequencies, get_input_frequency_candidates, rank_models, get_cheapest_model, \
+    race_primitives
+from fpga_planner import ClockRequest, plan_clocks
+from fpga_chain import search_chain
+from fpga_sweep import sweep_output_frequency, SweepResult
+from fpga_drift import analyze_input_drift, DriftAnalysis, DriftDistribution
+from fpga_drp import generate_drp_rom, load_lookup_tables
+from fpga_result import get_result_json
+from fpga_pareto import ParetoFront
+from fpga_certificate import certify_optimality, OptimalityCertificate
+from fpga_ratio import RatioConstraint
+from fpga_scoring import ScoringFunction, WeightedScore, ABSOLUTE, RELATIVE, PPM
+from fpga_templates import write_modules, VHDL
+from utility import relative_error
+from dataclasses import asdict
+import csv
+import json
 import sys
+import time
 
 
 def main():
+    # Modes are selected by the first argument, e.g. "jacc.py table ..."
+    if len(sys.argv) > 1 and sys.argv[1] in MODES:
+        MODES[sys.argv[1]](sys.argv[2:])
+        return
+
     base_parser = get_base_arg_parser(FPGA_MODELS, "name")
     base_args, rest = base_parser.parse_known_args()
 
     if base_args.show_models:
         print_model_specifications()
 
-    if base_args.cmt_block.upper() == "PLL":
-        used_primitive = PllBlockConfiguration.get_new_instance()
-    elif base_args.cmt_block.upper() == "MMCM":
-        used_primitive = MmcmBlockConfiguration.get_new_instance()
-    else:
-        # Should never happen unless theres a error in the code
-        used_primitive = None
+    # "-cmtb auto" accepts the arguments of the mmcm, because they are a superset of the arguments of the pll
+    race_primitive_blocks = base_args.cmt_block.upper() == "AUTO"
+    used_primitive = get_primitive_by_specification("MMCM" if race_primitive_blocks else base_args.cmt_block)
 
     configuration_parser = get_configuration_arg_parser(base_parser, FPGA_MODELS[base_args.fpga_model_specification],
                                                         used_primitive.get_new_instance())
@@ -37,28 +59,188 @@ def main():
         = order_configuration_args_into_dict(configuration_args_dict)
 
     configurator = ClockingConfigurator(FPGA_MODELS[base_args.fpga_model_specification], used_primitive)
+    scoring_function = get_scoring_function(base_args)
+    configurator.scoring_function = scoring_function
 
-    configurator.configure_primitive(
-            frequency_args={**frequency_args_without_delta, **frequency_deltas},
-            phase_shift_args={**phase_shifts, **phase_shift_deltas},
-            other_args=other_args,
-            use_relative_error=base_args.use_relative_error_only_for_scoring
-    )
+    input_frequency_candidates = get_input_frequency_candidates_from_args(base_args)
 
-    if configurator.selected_candidate is not None:
+    # The JSON output contains the result only, the rankings of the searches are not printed
+    json_output = base_args.output_format == "json"
+    fpga_identifier = base_args.fpga_model_specification
+    # The searches solve in worker processes, the counts of the selected solve are reported instead of the ones of
+    # the configurator
+    search_stats = None
+    solve_start = time.perf_counter()
+
+    # The searches configure the request in worker processes with default configurators, the arguments of a single
+    # search only apply to the base mode
+    used_searches = get_used_searches(base_args)
+    used_base_mode_only_flags = get_used_base_mode_only_flags(base_args)
+    if used_searches and used_base_mode_only_flags:
+        print(f"The argument{'s' if len(used_base_mode_only_flags) > 1 else ''} "
+              f"{', '.join(used_base_mode_only_flags)} can not be combined with {' or '.join(used_searches)}.")
+        sys.exit(1)
+
+    if base_args.pareto_front:
+        configurator.collect_pareto_front = True
+
+    if base_args.divider_alternatives > 1:
+        configurator.divider_alternatives = base_args.divider_alternatives
+
+    if base_args.margin_ppm is not None:
+        configurator.margin_ppm = base_args.margin_ppm
+
+    windows = {"-vcow": base_args.vco_window, "-mw": base_args.m_window, "-dw": base_args.d_window}
+    if any(window is not None for window in windows.values()):
+        for flag, window in windows.items():
+            if window is not None and window[0] > window[1]:
+                print(f"The minimum of \"{flag}\" is greater than its maximum.")
+                sys.exit(1)
+        configurator.vco_window, configurator.m_window, configurator.d_window = windows.values()
+
+    if base_args.ratio:
+        if base_args.optimality_certificate:
+            print("The argument \"-ratio\" can not be combined with \"-oc\".")
+            sys.exit(1)
+        configurator.ratio_constraints = [RatioConstraint(*constraint) for constraint in base_args.ratio]
+
+    if base_args.optimality_certificate and base_args.auto_delta is not None:
+        print("The argument \"-oc\" can not be combined with \"-ad\".")
+        sys.exit(1)
+
+    if race_primitive_blocks:
+        if base_args.auto_delta is not None or input_frequency_candidates or base_args.cheapest_model is not None:
+            print("The argument \"-cmtb auto\" can not be combined with \"-ad\", \"-cm\", \"-finc\" or \"-finr\".")
+            sys.exit(1)
+        try:
+            primitive_ranking = race_primitives(
+                    FPGA_MODELS[base_args.fpga_model_specification],
+                    frequency_args={**frequency_args_without_delta, **frequency_deltas},
+                    phase_shift_args={**phase_shifts, **phase_shift_deltas},
+                    other_args=other_args,
+                    use_relative_error=base_args.use_relative_error_only_for_scoring,
+                    policy=base_args.race_policy,
+                    processes=base_args.jobs,
+                    scoring_function=scoring_function
+            )
+        except ValueError as error:
+            print(error)
+            sys.exit(1)
+        if not json_output:
+            print(get_primitive_ranking_presentation(primitive_ranking))
+        configurator = ClockingConfigurator(FPGA_MODELS[base_args.fpga_model_specification],
+                                            primitive_ranking[0].primitive)
+        configurator.feasibility_issues = primitive_ranking[0].feasibility_issues
+        configurator.selected_candidate = primitive_ranking[0].configuration
+        search_stats = primitive_ranking[0].stats
+    elif base_args.cheapest_model is not None:
+        if base_args.auto_delta is not None or input_frequency_candidates:
+            print("The argument \"-cm\" can not be combined with \"-ad\", \"-finc\" or \"-finr\".")
+            sys.exit(1)
+        model_ranking = rank_models(
+                {key: fpga for key, fpga in FPGA_MODELS.items() if key != ("dummy", "dummy")}, used_primitive,
+                frequency_args={**frequency_args_without_delta, **frequency_deltas},
+                phase_shift_args={**phase_shifts, **phase_shift_deltas},
+                other_args=other_args,
+                use_relative_error=base_args.use_relative_error_only_for_scoring,
+                model_names=base_args.cheapest_model or None,
+                processes=base_args.jobs,
+                scoring_function=scoring_function
+        )
+        if not json_output:
+            print(get_model_ranking_presentation(model_ranking))
+        cheapest_model = get_cheapest_model(model_ranking)
+        if cheapest_model is not None:
+            configurator = ClockingConfigurator(cheapest_model.fpga, used_primitive)
+            fpga_identifier = cheapest_model.identifier
+            configurator.selected_candidate = cheapest_model.configuration
+            search_stats = cheapest_model.stats
+    elif input_frequency_candidates:
+        if base_args.auto_delta is not None:
+            print("The arguments \"-ad\" and \"-finc\"/\"-finr\" can not be combined.")
+            sys.exit(1)
+        ranking = rank_input_frequencies(
+                FPGA_MODELS[base_args.fpga_model_specification], used_primitive, input_frequency_candidates,
+                frequency_args={**frequency_args_without_delta, **frequency_deltas},
+                phase_shift_args={**phase_shifts, **phase_shift_deltas},
+                other_args=other_args,
+                use_relative_error=base_args.use_relative_error_only_for_scoring,
+                processes=base_args.jobs,
+                scoring_function=scoring_function
+        )
+        if not json_output:
+            print(get_input_frequency_ranking_presentation(ranking))
+        # The configurator above has not solved anything, the result belongs to the best input frequency
+        configurator = ClockingConfigurator(FPGA_MODELS[base_args.fpga_model_specification], used_primitive)
+        configurator.f_in_1 = ranking[0].f_in_1
+        configurator.feasibility_issues = ranking[0].feasibility_issues
+        configurator.selected_candidate = ranking[0].configuration
+        search_stats = ranking[0].stats
+        frequency_args_without_delta["f_in_1"] = ranking[0].f_in_1
+    else:
+        # Invalid ratio constraints are only detected by the configurator
+        try:
+            if base_args.auto_delta is None:
+                configurator.configure_primitive(
+                        frequency_args={**frequency_args_without_delta, **frequency_deltas},
+                        phase_shift_args={**phase_shifts, **phase_shift_deltas},
+                        other_args=other_args,
+                        use_relative_error=base_args.use_relative_error_only_for_scoring
+                )
+            else:
+                configurator.configure_primitive_with_minimal_delta(
+                        frequency_args={**frequency_args_without_delta, **frequency_deltas},
+                        phase_shift_args={**phase_shifts, **phase_shift_deltas},
+                        other_args=other_args,
+                        use_relative_error=base_args.use_relative_error_only_for_scoring,
+                        scale_user_deltas=base_args.auto_delta == "scaled"
+                )
+        except ValueError as error:
+            print(error)
+            sys.exit(1)
+
+    solve_time = time.perf_counter() - solve_start
 
-        if base_args.module:
-            string_representation = configurator.generate_template()
+    certificate = None
+    if base_args.optimality_certificate:
+        try:
+            certificate = certify_optimality(configurator, {**frequency_args_without_delta, **frequency_deltas},
+                                             {**phase_shifts, **phase_shift_deltas},
+                                             base_args.use_relative_error_only_for_scoring)
+        except ValueError as error:
+            print(error)
+            sys.exit(1)
+
+    string_representation = None
+    if configurator.selected_candidate is not None:
+        # VHDL has no counterpart of the verilog instance, so the whole entity is generated
+        if base_args.module or base_args.hdl == VHDL:
+            try:
+                string_representation = configurator.generate_template(base_args.module_name, base_args.hdl,
+                                                                       dict(base_args.port_names))
+            except ValueError as error:
+                print(error)
+                sys.exit(1)
         else:
             string_representation = str(configurator.selected_candidate)
 
         if configuration_args_dict["file"]:
             write_file(configuration_args_dict["file"], string_representation)
 
+    if json_output:
+        print(get_result_json(configurator, fpga_identifier, {**frequency_args_without_delta, **frequency_deltas},
+                              {**phase_shifts, **phase_shift_deltas}, other_args, string_representation, solve_time,
+                              certificate, search_stats, base_args.auto_delta))
+    elif configurator.selected_candidate is not None:
+
         str_1 = "A configuration with the values below was found:\n\n"
-        str_2 = "Verilog code of the generated configuration is below the dotted line:\n" + \
+        str_2 = ("VHDL" if base_args.hdl == VHDL else "Verilog") + \
+                    " code of the generated configuration is below the dotted line:\n" + \
                     "......................................................................\n"
 
+        if base_args.auto_delta is not None:
+            str_1 += get_auto_delta_presentation(configurator, base_args.auto_delta)
+
         print(
             str_1 +
              configurator.selected_candidate.get_result_presentation(
@@ -67,11 +249,429 @@ def main():
             str_2 +
             string_representation
         )
+        if configurator.pareto_front is not None:
+            print(get_pareto_front_presentation(configurator.pareto_front))
+        if certificate is not None:
+            print(get_certificate_presentation(certificate))
+        if configurator.margin_ppm is not None:
+            selected = configurator.selected_candidate
+            print(f"Worst-case input drift margin of the vco and pfd frequencies: "
+                  f"{configurator.vco_margins.get((selected.m.value, selected.d.value))} ppm")
+    elif configurator.feasibility_issues:
+        print(
+            "No configuration that matches your requirements can exist:\n" +
+            "".join([f"\t{issue.message}\n" for issue in configurator.feasibility_issues])
+        )
     else:
         print(
             "No configuration that matches your requirements could be found.\n" + \
-            "A close configuration may be found by specifying less strict delta values.\n"
+            "A close configuration may be found by specifying less strict delta values.\n" + \
+            ("" if base_args.auto_delta is not None else
+             "Use the argument \"-ad\" to search for the smallest delta values automatically.\n")
         )
+        if certificate is not None:
+            print(get_certificate_presentation(certificate))
+
+
+def get_used_searches(base_args) -> list:
+    """
+    :param base_args: Arguments of the base parser
+    :return: Flags of the searches over several requests that are used
+    """
+    searches = {"\"-cmtb auto\"": base_args.cmt_block.upper() == "AUTO",
+                "\"-cm\"": base_args.cheapest_model is not None,
+                "\"-finc\"": base_args.input_frequency_candidates is not None,
+                "\"-finr\"": base_args.input_frequency_range is not None}
+    return [flag for flag, used in searches.items() if used]
+
+
+def get_used_base_mode_only_flags(base_args) -> list:
+    """
+    :param base_args: Arguments of the base parser
+    :return: Flags of BASE_MODE_ONLY_FLAGS that are used
+    """
+    used = {"-pf": base_args.pareto_front, "-da": base_args.divider_alternatives > 1,
+            "-mppm": base_args.margin_ppm is not None, "-vcow": base_args.vco_window is not None,
+            "-mw": base_args.m_window is not None, "-dw": base_args.d_window is not None,
+            "-ratio": bool(base_args.ratio), "-oc": base_args.optimality_certificate}
+    return [f"\"{flag}\"" for flag in BASE_MODE_ONLY_FLAGS if used[flag]]
+
+
+def get_input_frequency_candidates_from_args(base_args) -> list:
+    if base_args.input_frequency_candidates is not None:
+        return base_args.input_frequency_candidates
+    if base_args.input_frequency_range is not None:
+        start, stop, step = base_args.input_frequency_range
+        if step <= 0 or stop < start:
+            print("Invalid input frequency range, <start> <stop> <step> with start <= stop and step > 0 expected.")
+            sys.exit(1)
+        return get_input_frequency_candidates(start, stop, step)
+    return []
+
+
+def get_input_frequency_ranking_presentation(ranking: list) -> str:
+    ranking_str = "Input frequencies ranked by the delta score of their best configuration:\n"
+    for place, result in enumerate(ranking, 1):
+        if result.configuration is not None:
+            ranking_str += f"\t{place}. {result.f_in_1}: delta score {result.get_delta_score()}\n"
+        elif result.feasibility_issues:
+            ranking_str += f"\t{place}. {result.f_in_1}: impossible, {result.feasibility_issues[0].message}\n"
+        else:
+            ranking_str += f"\t{place}. {result.f_in_1}: no configuration found\n"
+    return ranking_str
+
+
+def get_model_ranking_presentation(model_ranking: list) -> str:
+    ranking_str = "FPGA models from the cheapest to the most expensive one:\n"
+    for result in model_ranking:
+        if result.configuration is not None:
+            ranking_str += f"\t{result.identifier}: delta score {result.configuration.delta_score}\n"
+        elif result.feasibility_issues:
+            ranking_str += f"\t{result.identifier}: impossible, {result.feasibility_issues[0].message}\n"
+        else:
+            ranking_str += f"\t{result.identifier}: no configuration found\n"
+
+    cheapest_model = get_cheapest_model(model_ranking)
+    if cheapest_model is not None:
+        ranking_str += f"Cheapest fpga model that meets the requirements: {cheapest_model.identifier}\n"
+    return ranking_str
+
+
+def get_primitive_ranking_presentation(primitive_ranking: list) -> str:
+    ranking_str = "CMT blocks ranked by the delta score of their best configuration:\n"
+    for place, result in enumerate(primitive_ranking, 1):
+        name = result.primitive.specification.upper()
+        if result.configuration is not None:
+            ranking_str += f"\t{place}. {name}: delta score {result.get_delta_score()}\n"
+        elif result.feasibility_issues:
+            ranking_str += f"\t{place}. {name}: impossible, {result.feasibility_issues[0].message}\n"
+        elif result.cancelled:
+            ranking_str += f"\t{place}. {name}: cancelled\n"
+        else:
+            ranking_str += f"\t{place}. {name}: no configuration found\n"
+    return ranking_str
+
+
+def get_scoring_function(base_args) -> ScoringFunction:
+    """
+    :return: WeightedScore if one of the scoring arguments is used, otherwise None (the delta score is used)
+    """
+    if not base_args.ppm_error and not base_args.output_weights and base_args.phase_shift_weight == 1 and \
+            not base_args.vco_penalty and not base_args.d_penalty:
+        return None
+    if base_args.ppm_error:
+        error_unit = PPM
+    else:
+        error_unit = RELATIVE if base_args.use_relative_error_only_for_scoring else ABSOLUTE
+    return WeightedScore(dict(base_args.output_weights), base_args.phase_shift_weight, error_unit,
+                         base_args.vco_penalty, base_args.d_penalty)
+
+
+def get_certificate_presentation(certificate: OptimalityCertificate) -> str:
+    certificate_str = "Optimality certificate:\n" \
+                      f"\tThe configuration is {'' if certificate.is_optimal() else 'not '}optimal " \
+                      "among all output dividers within the deltas.\n" \
+                      f"\tselected score: {certificate.selected_score}\n" \
+                      f"\toptimal score: {certificate.optimal_score}\n" \
+                      f"\trunner-up score: {certificate.runner_up_score}\n" \
+                      f"\tsearch space: {certificate.search_space} divider combinations of " \
+                      f"{certificate.vco_candidates} vco candidates\n" \
+                      f"\tpruned: {certificate.pruned_vco_candidates} vco candidates, " \
+                      f"{certificate.pruned_dividers} divider values ({certificate.evaluated_dividers} evaluated)\n"
+    if not certificate.is_optimal() and certificate.optimal_configuration is not None:
+        certificate_str += "\tOptimal configuration:\n" + \
+                           "".join(f"\t\t{name}: {value}\n"
+                                   for name, value in certificate.optimal_configuration.get_properties_dict().items())
+    return certificate_str
+
+
+def get_pareto_front_presentation(pareto_front: ParetoFront) -> str:
+    front_str = f"Pareto front of the candidates ({len(pareto_front)} configurations):\n" \
+                "\tfrequency error | phase error | vco frequency | M | D | output dividers\n"
+    for point in pareto_front.get_points():
+        configuration = point.configuration
+        dividers = ", ".join(f"o{index}={divider.value}" for index, divider in enumerate(configuration.o_list)
+                             if divider.on)
+        front_str += f"\t{point.frequency_error} | {point.phase_error} | {configuration.get_vco_frequency()} | " \
+                     f"{configuration.m.value} | {configuration.d.value} | {dividers}\n"
+    return front_str
+
+
+def get_auto_delta_presentation(configurator: ClockingConfigurator, auto_delta: str) -> str:
+    if auto_delta == "scaled":
+        scale_str = f"Smallest factor for the delta values: {configurator.delta_scale}\n"
+    else:
+        scale_str = f"Smallest delta value for all output clocks: {configurator.delta_scale}\n"
+
+    return scale_str + "".join([f"clkout{index} relative error: {error}\n"
+                                for index, error in configurator.get_achieved_errors().items()]) + "\n"
+
+
+def precompute_frequency_table(args: list) -> None:
+    table_parser = get_table_arg_parser(FPGA_MODELS, COMMON_INPUT_FREQUENCIES)
+    table_args = table_parser.parse_args(args)
+
+    fpga = FPGA_MODELS[table_args.fpga_model_specification]
+    primitive = get_primitive_by_specification(table_args.cmt_block)
+
+    if table_args.input_frequencies is None:
+        input_frequencies = [f_in for f_in in COMMON_INPUT_FREQUENCIES
+                             if fpga.get_f_in_min(primitive.specification) <= f_in
+                             <= fpga.get_f_in_max(primitive.specification)]
+    else:
+        input_frequencies = table_args.input_frequencies
+
+    try:
+        write_frequency_table(table_args.file, fpga, primitive, input_frequencies)
+    except ValueError as error:
+        print(error)
+        sys.exit(1)
+
+    print(f"Frequency table for the input frequencies {input_frequencies} was written to \"{table_args.file}\"")
+
+
+def query_frequencies(args: list) -> None:
+    query_parser = get_query_arg_parser(FPGA_MODELS)
+    query_args = query_parser.parse_args(args)
+
+    fpga = FPGA_MODELS[query_args.fpga_model_specification]
+    primitive = get_primitive_by_specification(query_args.cmt_block)
+    output_frequencies = {index: getattr(query_args, f"f_out_{index}") for index in range(7)
+                          if getattr(query_args, f"f_out_{index}") is not None}
+
+    if not output_frequencies:
+        print("At least one target output frequency has to be specified, e.g. \"-fout0 133.7\"")
+        sys.exit(1)
+
+    try:
+        table = FrequencyTable(query_args.table) if query_args.table else None
+    except (OSError, ValueError) as error:
+        print(error)
+        sys.exit(1)
+
+    try:
+        nearest_frequencies = query_nearest_frequencies(fpga, primitive, query_args.f_in_1, output_frequencies,
+                                                        query_args.count, table)
+    except ValueError as error:
+        print(error)
+        sys.exit(1)
+    finally:
+        if table is not None:
+            table.close()
+
+    for index, records in nearest_frequencies.items():
+        print(f"clkout{index} target frequency: {output_frequencies[index]}")
+        for record in records:
+            print(f"\t{record.f_out} (relative error: {relative_error(output_frequencies[index], record.f_out):.6f})"
+                  f"\tM: {record.m}\tD: {record.d}\tO: {record.o}\tVCO: {record.get_vco_frequency()}")
+
+
+def plan_design_clocks(args: list) -> None:
+    plan_parser = get_plan_arg_parser(FPGA_MODELS)
+    plan_args = plan_parser.parse_args(args)
+
+    try:
+        with open(plan_args.clocks) as file:
+            clocks = [ClockRequest(**clock) for clock in json.load(file)]
+        tiles = plan_clocks(FPGA_MODELS[plan_args.fpga_model_specification], clocks,
+                            tuple(dict.fromkeys(plan_args.cmt_blocks)), plan_args.module_prefix)
+    except (OSError, TypeError, ValueError) as error:
+        print(error)
+        sys.exit(1)
+
+    print(f"{len(clocks)} clocks were distributed onto {len(tiles)} CMT blocks:")
+    for tile in tiles:
+        print(f"{tile.name} ({tile.get_specification().upper()}, input frequency {tile.f_in_1}):")
+        for index, clock in enumerate(tile.clocks):
+            print(f"\tclkout{index}: {clock.name}, {tile.configuration.get_output_frequency(index)} "
+                  f"(target {clock.f_out})")
+
+    if plan_args.file:
+        try:
+            write_modules(plan_args.file, [(tile.name, tile.configuration) for tile in tiles], plan_args.hdl,
+                          dict(plan_args.port_names))
+        except ValueError as error:
+            print(error)
+            sys.exit(1)
+        print(f"The {plan_args.hdl} modules were written to \"{plan_args.file}\"")
+
+
+def search_cascaded_chain(args: list) -> None:
+    chain_parser = get_chain_arg_parser(FPGA_MODELS)
+    chain_args = chain_parser.parse_args(args)
+
+    output_frequencies = {index: getattr(chain_args, f"f_out_{index}") for index in range(7)
+                          if getattr(chain_args, f"f_out_{index}") is not None}
+    deltas = {index: getattr(chain_args, f"delta_{index}") for index in range(7)
+              if getattr(chain_args, f"delta_{index}") is not None}
+
+    try:
+        chain = search_chain(FPGA_MODELS[chain_args.fpga_model_specification],
+                             get_primitive_by_specification(chain_args.first_cmt_block),
+                             get_primitive_by_specification(chain_args.second_cmt_block),
+                             chain_args.f_in_1, output_frequencies, deltas)
+    except ValueError as error:
+        print(error)
+        sys.exit(1)
+
+    if chain is None:
+        print("No chain that matches your requirements could be found.")
+        return
+
+    print(f"A chain with the intermediate frequency {chain.f_mid} was found.\n\n"
+          f"Compounded relative errors of both CMT blocks:\n" +
+          "".join(f"clkout{index} relative error: {error}\n" for index, error in chain.errors.items()) +
+          "\nFirst CMT block (clkout0 drives the input clock of the second block):\n" +
+          chain.first_configuration.get_result_presentation(clock_six_used=False) +
+          "\nSecond CMT block:\n" +
+          chain.second_configuration.get_result_presentation(clock_six_used=6 in output_frequencies))
+
+    if chain_args.module:
+        print(chain.first_configuration.generate_template("clk_chain_first") + "\n\n" +
+              chain.second_configuration.generate_template("clk_chain_second"))
+    else:
+        print(str(chain.first_configuration) + "\n" + str(chain.second_configuration))
+
+
+def get_sweep_row(result: SweepResult, output_frequencies: dict, index: int) -> dict:
+    """
+    :param result: Result of one target frequency of the sweep
+    :param output_frequencies: Target frequencies of all outputs {output index: target frequency}
+    :param index: Index of the swept output
+    :return: Row of the sweep output, values of outputs without configuration are None
+    """
+    configuration = result.configuration
+    targets = {**output_frequencies, index: result.f_out}
+    row = {"target": result.f_out, "found": configuration is not None,
+           "m": configuration.m.value if configuration is not None else None,
+           "d": configuration.d.value if configuration is not None else None}
+    for output in sorted(targets):
+        f_out = configuration.get_output_frequency(output) if configuration is not None else None
+        row[f"o_{output}"] = configuration.o_list[output].value if configuration is not None else None
+        row[f"f_out_{output}"] = f_out
+        row[f"error_{output}"] = relative_error(targets[output], f_out) if configuration is not None else None
+    row["delta_score"] = configuration.delta_score if configuration is not None else None
+    return row
+
+
+def sweep_output_frequencies(args: list) -> None:
+    sweep_parser = get_sweep_arg_parser(FPGA_MODELS)
+    sweep_args = sweep_parser.parse_args(args)
+
+    index = sweep_args.sweep_output
+    start, stop, step = sweep_args.frequency_range
+    f_outs = get_input_frequency_candidates(start, stop, step)
+    output_frequencies = {output: getattr(sweep_args, f"f_out_{output}") for output in range(7)
+                          if getattr(sweep_args, f"f_out_{output}") is not None and output != index}
+    frequency_args = {"f_in_1": sweep_args.f_in_1,
+                      **{f"f_out_{output}": f_outs[0] if output == index else output_frequencies[output]
+                         for output in sorted({*output_frequencies, index})},
+                      **{f"delta_{output}": getattr(sweep_args, f"delta_{output}") for output in range(7)
+                         if getattr(sweep_args, f"delta_{output}") is not None}}
+
+    try:
+        lookup_tables = load_lookup_tables(sweep_args.lookup_tables) if sweep_args.lookup_tables else None
+    except (OSError, ValueError) as error:
+        print(error)
+        sys.exit(1)
+
+    file = open(sweep_args.file, "w", newline="") if sweep_args.file else sys.stdout
+    configurations = []
+    try:
+        writer = None
+        for result in sweep_output_frequency(FPGA_MODELS[sweep_args.fpga_model_specification],
+                                             get_primitive_by_specification(sweep_args.cmt_block), frequency_args,
+                                             index, f_outs,
+                                             use_relative_error=sweep_args.use_relative_error_only_for_scoring):
+            row = get_sweep_row(result, output_frequencies, index)
+            # Rows without a configuration keep their ROM entries, so entry i always belongs to row i
+            configurations.append(result.configuration)
+            if sweep_args.output_format == "jsonl":
+                file.write(json.dumps(row) + "\n")
+            else:
+                if writer is None:
+                    writer = csv.DictWriter(file, fieldnames=list(row))
+                    writer.writeheader()
+                writer.writerow(row)
+            # Every row is written as soon as it is computed
+            file.flush()
+    except ValueError as error:
+        print(error)
+        sys.exit(1)
+    finally:
+        if file is not sys.stdout:
+            file.close()
+
+    if sweep_args.file:
+        print(f"The sweep over {len(f_outs)} target frequencies was written to \"{sweep_args.file}\"")
+
+    if sweep_args.drp_rom:
+        try:
+            write_file(sweep_args.drp_rom, generate_drp_rom(configurations, lookup_tables))
+        except ValueError as error:
+            print(error)
+            sys.exit(1)
+        print(f"The DRP registers of {len(configurations)} rows were written to \"{sweep_args.drp_rom}\"")
+
+
+def get_drift_analysis_presentation(analysis: DriftAnalysis) -> str:
+    distribution = analysis.distribution
+    low, high = distribution.get_bounds()
+    analysis_str = f"Input drift analysis ({distribution.kind} drift, {distribution.ppm} ppm, " \
+                   f"offset {distribution.offset_ppm} ppm):\n" \
+                   f"\tworst cases: {low * 1e6} ppm to {high * 1e6} ppm of f_in = {analysis.f_in}\n" \
+                   "\tname | nominal | minimum | maximum | standard deviation | allowed range | margin (ppm) | " \
+                   "violation probability\n"
+    for drift_range in analysis.get_ranges():
+        analysis_str += f"\t{drift_range.name} | {drift_range.nominal} | {drift_range.minimum} | " \
+                        f"{drift_range.maximum} | {drift_range.standard_deviation} | " \
+                        f"{drift_range.limit_min} - {drift_range.limit_max} | {drift_range.margin_ppm} | " \
+                        f"{drift_range.violation_probability}\n"
+    analysis_str += "".join(f"\tclkout{output.index} worst relative error: {output.worst_error} "
+                            f"(delta {output.delta})\n" for output in analysis.outputs)
+    analysis_str += f"\tProbability of any violation: {analysis.violation_probability}\n" \
+                    f"\tSmallest margin: {analysis.margin_ppm} ppm\n"
+    violations = analysis.get_violations()
+    if violations:
+        analysis_str += "\tThe worst cases violate: " + ", ".join(drift_range.name for drift_range in violations) + "\n"
+    return analysis_str
+
+
+def analyze_drift(args: list) -> None:
+    analyze_parser = get_analyze_arg_parser(FPGA_MODELS)
+    analyze_args = analyze_parser.parse_args(args)
+
+    output_frequencies = {index: getattr(analyze_args, f"f_out_{index}") for index in range(7)
+                          if getattr(analyze_args, f"f_out_{index}") is not None}
+    deltas = {index: getattr(analyze_args, f"delta_{index}") for index in range(7)
+              if getattr(analyze_args, f"delta_{index}") is not None}
+    frequency_args = {"f_in_1": analyze_args.f_in_1,
+                      **{f"f_out_{index}": value for index, value in output_frequencies.items()},
+                      **{f"delta_{index}": value for index, value in deltas.items()}}
+
+    fpga = FPGA_MODELS[analyze_args.fpga_model_specification]
+    configurator = ClockingConfigurator(fpga, get_primitive_by_specification(analyze_args.cmt_block))
+    try:
+        distribution = DriftDistribution(analyze_args.drift_distribution, analyze_args.drift_ppm,
+                                         analyze_args.drift_offset_ppm, analyze_args.drift_sigmas)
+        configuration = configurator.configure_primitive(
+            frequency_args, {}, {}, use_relative_error=analyze_args.use_relative_error_only_for_scoring)
+    except ValueError as error:
+        print(error)
+        sys.exit(1)
+
+    if configuration is None:
+        print("No configuration that matches your requirements could be found.")
+        return
+
+    analysis = analyze_input_drift(fpga, configuration, output_frequencies, deltas, distribution)
+    if analyze_args.output_format == "json":
+        print(json.dumps({"configuration": configuration.get_properties_dict(), "analysis": asdict(analysis)},
+                         indent=4))
+    else:
+        print(configuration.get_result_presentation(clock_six_used=6 in output_frequencies) + "\n" +
+              get_drift_analysis_presentation(analysis))
+
 
 def print_model_specifications() -> None:
     print("FPGA models with the following specifications are supported:")
@@ -117,5 +717,15 @@ def order_configuration_args_into_dict(configuration_args: dict) -> (dict, dict,
     return frequency_args_without_delta, frequency_deltas, phase_shifts, phase_shift_deltas, other_args
 
 
+MODES = {
+    "table": precompute_frequency_table,
+    "query": query_frequencies,
+    "plan": plan_design_clocks,
+    "chain": search_cascaded_chain,
+    "sweep": sweep_output_frequencies,
+    "analyze": analyze_drift,
+}
+
+
 if __name__ == "__main__":
     main()
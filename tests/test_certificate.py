@@ -0,0 +1,82 @@
+"""
+Tests for the optimality certificate of the selected configuration
+"""
+import itertools
+import unittest
+from fpga_globals import FPGA_MODELS
+from fpga_primitives import PllBlockConfiguration, MmcmBlockConfiguration
+from fpga_configurator import ClockingConfigurator
+from fpga_scoring import WeightedScore, DeltaScore
+from fpga_certificate import *
+from utility import relative_error
+
+
+class CertificateTest(unittest.TestCase):
+    fpga = FPGA_MODELS[("artix-7", "3", "1.0V")]
+
+    def solve(self, primitive, frequency_args: dict, phase_shift_args: dict, scoring_function=None):
+        configurator = ClockingConfigurator(self.fpga, primitive.get_new_instance())
+        configurator.scoring_function = scoring_function
+        configurator.configure_primitive(frequency_args, phase_shift_args, {})
+        return configurator, certify_optimality(configurator, frequency_args, phase_shift_args)
+
+    @staticmethod
+    def get_brute_force_scores(check: OptimalityCheck) -> list:
+        scores = []
+        for m, d, _ in check.configurator.get_vco_candidates(check.f_in_1):
+            base = m * check.f_in_from_period / d
+            output_costs = []
+            for index, target in check.output_frequencies.items():
+                costs = []
+                for divider in check.lattices[index]:
+                    f_out = base / divider
+                    if relative_error(target, f_out) > check.deltas[index] or \
+                            not check.configurator.f_out_min <= f_out <= check.configurator.f_out_max:
+                        continue
+                    phase_shift_cost = check.get_phase_shift_cost(index, divider)
+                    if phase_shift_cost is not None:
+                        costs.append(check.scoring_function.get_frequency_cost(index, target, f_out) +
+                                     phase_shift_cost)
+                output_costs.append(costs)
+            vco_cost = check.scoring_function.get_vco_cost(base, d, check.vco_max)
+            scores += [vco_cost + sum(combination) for combination in itertools.product(*output_costs)]
+        return sorted(scores)
+
+    def test_brute_force(self):
+        requests = [
+            (PllBlockConfiguration, {"f_in_1": 100, "f_out_0": 133.7, "delta_0": 0.01, "f_out_1": 50, "delta_1": 0.01},
+             {"phase_shift_1": 30, "delta_1": 0.1}, None),
+            (MmcmBlockConfiguration, {"f_in_1": 125, "f_out_0": 77.7, "delta_0": 0.001, "f_out_3": 12.288,
+                                      "delta_3": 0.01}, {}, WeightedScore(vco_penalty=5, d_penalty=0.1)),
+            (MmcmBlockConfiguration, {"f_in_1": 27, "f_out_2": 300, "delta_2": 0.02, "f_out_0": 61, "delta_0": 0.02},
+             {"phase_shift_0": 45, "delta_0": 0.05}, DeltaScore(True)),
+        ]
+        for primitive, frequency_args, phase_shift_args, scoring_function in requests:
+            configurator, certificate = self.solve(primitive, frequency_args, phase_shift_args, scoring_function)
+            scores = self.get_brute_force_scores(
+                OptimalityCheck(configurator, frequency_args, phase_shift_args, scoring_function or DeltaScore()))
+
+            self.assertGreater(len(scores), 1)
+            self.assertAlmostEqual(certificate.optimal_score, scores[0])
+            self.assertAlmostEqual(certificate.runner_up_score, scores[1])
+            self.assertGreaterEqual(certificate.search_space, len(scores))
+            self.assertTrue(certificate.is_optimal())
+            self.assertAlmostEqual(certificate.selected_score, configurator.selected_candidate.delta_score)
+
+    def test_greedy_divider(self):
+        # The divider closest to 205.4 MHz violates the phase shift delta for every vco candidate
+        frequency_args = {"f_in_1": 100, "f_out_0": 205.4, "delta_0": 0.05}
+        phase_shift_args = {"phase_shift_0": 5, "delta_0": 0.15}
+        configurator, certificate = self.solve(MmcmBlockConfiguration, frequency_args, phase_shift_args)
+
+        self.assertIsNone(configurator.selected_candidate)
+        self.assertFalse(certificate.is_optimal())
+        optimal_configuration = certificate.optimal_configuration
+        self.assertLessEqual(relative_error(205.4, optimal_configuration.get_output_frequency(0)), 0.05)
+        self.assertLessEqual(relative_error(5, optimal_configuration.get_phase_shift(0).value), 0.15)
+        self.assertGreater(certificate.pruned_vco_candidates, 0)
+
+    def test_unsupported(self):
+        configurator = ClockingConfigurator(self.fpga, MmcmBlockConfiguration.get_new_instance())
+        with self.assertRaises(ValueError):
+            certify_optimality(configurator, {"f_in_1": 100, "f_out_0": 133.7, "f_out_4": 4.7, "f_out_4_cascade": True})
@@ -0,0 +1,53 @@
+"""
+Tests for the search of cascaded CMT chains
+"""
+import unittest
+from fpga_globals import FPGA_MODELS
+from fpga_primitives import MmcmBlockConfiguration, PllBlockConfiguration
+from fpga_configurator import ClockingConfigurator
+from fpga_chain import *
+
+
+class ChainTest(unittest.TestCase):
+    fpga = FPGA_MODELS[("artix-7", "3", "1.0V")]
+
+    def test_intervals(self):
+        self.assertEqual(merge_intervals([(5, 6), (1, 3), (2, 4)]), [(1, 4), (5, 6)])
+        self.assertEqual(intersect_intervals([(1, 4), (5, 9)], [(3, 6), (8, 10)]), [(3, 4), (5, 6), (8, 9)])
+        self.assertEqual(intersect_intervals([(1, 2)], [(3, 4)]), [])
+
+    def test_search_chain(self):
+        output_frequencies, deltas = {0: 7.3728, 2: 11.2896}, {0: 0.001, 2: 0.001}
+        chain = search_chain(self.fpga, PllBlockConfiguration.get_new_instance(),
+                             MmcmBlockConfiguration.get_new_instance(), 100, output_frequencies, deltas)
+
+        # The intermediate frequency is generated by the first block and is within the input limitations of the second
+        self.assertEqual(chain.first_configuration.get_output_frequency(0), chain.f_mid)
+        self.assertLessEqual(self.fpga.get_f_in_min("mmcm"), chain.f_mid)
+        self.assertLessEqual(chain.f_mid, self.fpga.get_f_in_max("mmcm"))
+
+        for index, target_f_out in output_frequencies.items():
+            self.assertEqual(chain.errors[index],
+                             relative_error(target_f_out, chain.second_configuration.get_output_frequency(index)))
+            self.assertLessEqual(chain.errors[index], deltas[index])
+
+        # The chain is more precise than a single block
+        configurator = ClockingConfigurator(self.fpga, MmcmBlockConfiguration.get_new_instance())
+        configurator.configure_primitive_with_minimal_delta({"f_in_1": 100, "f_out_0": 7.3728, "f_out_2": 11.2896},
+                                                            {}, {})
+        self.assertLess(chain.get_max_error(), configurator.delta_scale)
+
+    def test_exact_chain(self):
+        # 11.2896 MHz = 100 MHz * 441 / 3906.25
+        chain = search_chain(self.fpga, PllBlockConfiguration.get_new_instance(),
+                             PllBlockConfiguration.get_new_instance(), 100, {0: 11.2896}, {0: 0.0001})
+        self.assertAlmostEqual(chain.get_max_error(), 0, places=12)
+
+    def test_impossible_chains(self):
+        pll, mmcm = PllBlockConfiguration.get_new_instance(), MmcmBlockConfiguration.get_new_instance()
+        self.assertIsNone(search_chain(self.fpga, pll, mmcm, 100, {0: 1000}, {0: 0.01}))
+        self.assertIsNone(search_chain(self.fpga, pll, mmcm, 1, {0: 100}))
+        with self.assertRaises(ValueError):
+            search_chain(self.fpga, pll, pll, 100, {1: 100})
+        with self.assertRaises(ValueError):
+            search_chain(self.fpga, pll, pll, 100, {0: 100, 6: 100})
@@ -5,6 +5,7 @@ import unittest
 from fpga_primitives import *
 from fpga_globals import FPGA_MODELS
 from fpga_configurator import *
+from utility import exact_ratio
 
 
 class FrequencyConfigurationTest(unittest.TestCase):
@@ -439,3 +440,219 @@ class FrequencyConfigurationTest(unittest.TestCase):
                                        d["duty_cycle_args"][key],
                                        delta=0.14 * d["duty_cycle_args"][key])
             '''
+
+    def test_configure_primitive_with_minimal_delta(self):
+        """
+        Tests the method "configure_primitive_with_minimal_delta".
+        The found delta scale has to be the smallest one that still leads to a configuration
+        :return: None
+        """
+        self.frequency_setup()
+        frequency_dict = {"f_in_1": 237.5, "f_out_0": 133.7, "f_out_1": 69, "f_out_2": 500}
+        user_deltas = {"delta_0": 0.001, "delta_1": 0.1, "delta_2": 0.5}
+
+        for primitive in [self.mmcme_2_base, self.plle_2_base]:
+            for scale_user_deltas in [False, True]:
+                frequency_args = {**frequency_dict, **user_deltas} if scale_user_deltas else frequency_dict
+                configurator = ClockingConfigurator(self.fpga, primitive)
+                config = configurator.configure_primitive_with_minimal_delta(frequency_args, {}, {},
+                                                                             scale_user_deltas=scale_user_deltas)
+                self.assertIsNotNone(config)
+                self.assertGreater(configurator.delta_scale, 0)
+
+                for index, error in configurator.get_achieved_errors().items():
+                    delta = user_deltas[f"delta_{index}"] if scale_user_deltas else 1
+                    self.assertLessEqual(error, configurator.delta_scale * delta)
+
+                # The scaled deltas lead to a configuration, slightly smaller ones do not
+                for factor, found in [(1, True), (0.999, False)]:
+                    deltas = {f"delta_{index}": configurator.delta_scale * factor
+                                                * (user_deltas[f"delta_{index}"] if scale_user_deltas else 1)
+                              for index in range(3)}
+                    other_configurator = ClockingConfigurator(self.fpga, primitive)
+                    other_configurator.configure_primitive({**frequency_dict, **deltas}, {}, {})
+                    self.assertEqual(other_configurator.selected_candidate is not None, found)
+
+    def test_update(self):
+        """
+        Tests the method "update".
+        Incremental updates have to lead to the same configuration as a new solve of the changed request
+        :return: None
+        """
+        self.frequency_setup()
+        frequency_args = {"f_in_1": 100, "f_out_0": 133.7, "f_out_1": 200, "f_out_2": 50, "delta_0": 0.01,
+                          "delta_1": 0.01, "delta_2": 0.01}
+        changes_list = [{"f_out_1": 245.76}, {"delta_0": 0.001}, {"f_out_3": 12.288, "delta_3": 0.05},
+                        {"f_out_2": None}, {"f_out_3": 1000}, {"f_out_3": 33.3}, {"f_in_1": 125}]
+
+        for primitive in [self.mmcme_2_base, self.plle_2_base]:
+            configurator = ClockingConfigurator(self.fpga, primitive)
+            with self.assertRaises(ValueError):
+                configurator.update(f_out_0=100)
+
+            configurator.configure_primitive(frequency_args, {"phase_shift_1": 45}, {})
+            current_args = dict(frequency_args)
+            for changes in changes_list:
+                current_args = {key: value for key, value in {**current_args, **changes}.items() if value is not None}
+                config = configurator.update(**changes)
+
+                other_configurator = ClockingConfigurator(self.fpga, primitive)
+                other_config = other_configurator.configure_primitive(current_args, {"phase_shift_1": 45}, {})
+
+                self.assertEqual(str(config), str(other_config))
+                self.assertEqual(len(configurator.configuration_candidates),
+                                 len(other_configurator.configuration_candidates))
+                if config is not None:
+                    self.assertEqual(config.delta_score, other_config.delta_score)
+
+    def test_collapsed_equivalents(self):
+        """
+        Tests that equivalent (M, D) combinations and configurations are only considered once
+        :return: None
+        """
+        self.frequency_setup()
+        self.assertEqual(exact_ratio(2, 5), exact_ratio(4.0, 10))
+        self.assertEqual(exact_ratio(7.125, 3), (19, 8))
+
+        configurator = ClockingConfigurator(self.fpga, self.mmcme_2_base)
+        vco_candidates = configurator.get_vco_candidates(100)
+        combinations = [(m, d) for m, d, _ in vco_candidates]
+        ratios = [exact_ratio(m, d) for m, d in combinations]
+        self.assertEqual(len(ratios), len(set(ratios)))
+        # The kept combination of a ratio has the smallest D
+        self.assertIn((8, 1), combinations)
+        self.assertNotIn((16, 2), combinations)
+        collapsed_combinations = configurator.collapsed_equivalents
+        self.assertGreater(collapsed_combinations, 0)
+
+        # Without a target for output 6 below the one of output 4 the cascade is never used, so every (M, D)
+        # combination leads to the same configuration twice
+        configurator.configure_primitive({"f_in_1": 100, "f_out_0": 133.7, "f_out_4": 10, "f_out_6": 5,
+                                          "f_out_4_cascade": True}, {}, {})
+        signatures = [config.get_output_signature() for config in configurator.configuration_candidates]
+        self.assertEqual(len(signatures), len(set(signatures)))
+        self.assertEqual(configurator.collapsed_equivalents,
+                         collapsed_combinations + len(configurator.configuration_candidates))
+
+    def test_ratio_table(self):
+        """
+        Tests that the vco candidates of the ratio table are the ones of the search through M and D
+        :return: None
+        """
+        self.frequency_setup()
+        for primitive in [self.mmcme_2_base, self.plle_2_base]:
+            for f_in_1 in [10, 19.44, 24.576, 100, 156.25, 450, 800]:
+                for margin_ppm, vco_window, m_window in [(None, None, None), (100, (900, 1300), (10.3, 40.6))]:
+                    candidates = []
+                    for use_ratio_table in [False, True]:
+                        configurator = ClockingConfigurator(self.fpga, primitive)
+                        configurator.use_ratio_table = use_ratio_table
+                        configurator.margin_ppm, configurator.vco_window = margin_ppm, vco_window
+                        configurator.m_window = m_window
+                        candidates.append((configurator.get_vco_candidates(f_in_1),
+                                           configurator.collapsed_equivalents, configurator.vco_margins))
+                    self.assertEqual(candidates[0], candidates[1])
+
+            # The cached table is shared, so it must not be mutable
+            ratios, groups = get_ratio_table(tuple(primitive.get_m_generator()), tuple(primitive.get_d_generator()))
+            self.assertIsInstance(ratios, tuple)
+            self.assertIsInstance(groups, tuple)
+            for d_group, m_group in groups:
+                self.assertIsInstance(d_group, tuple)
+                self.assertIsInstance(m_group, tuple)
+
+    def test_divider_alternatives(self):
+        """
+        Tests that considering more than the nearest output divider never leads to a worse score and finds
+        configurations whose nearest dividers do not allow the phase shift
+        :return: None
+        """
+        self.frequency_setup()
+        self.assertEqual(self.mmcme_2_base.get_nearest_o_dividers(0, 45.625, 7, 100, 133.7, 3, 4.69, 800),
+                         [(4.875, 45.625 * 100 / (7 * 4.875)), (5.0, 45.625 * 100 / (7 * 5.0)),
+                          (4.75, 45.625 * 100 / (7 * 4.75))])
+        # Divider 1 generates 1000 MHz, which is beyond the limitations
+        self.assertEqual([divider for divider, _ in self.plle_2_base.get_nearest_o_dividers(0, 10, 1, 100, 700, 2,
+                                                                                          4.69, 800)], [2, 3])
+
+        frequency_args = {"f_in_1": 100, "f_out_0": 205.4, "delta_0": 0.05}
+        phase_shift_args = {"phase_shift_0": 5, "delta_0": 0.15}
+        configurator = ClockingConfigurator(self.fpga, self.mmcme_2_base)
+        self.assertIsNone(configurator.configure_primitive(frequency_args, phase_shift_args, {}))
+        configurator.divider_alternatives = 4
+        configuration = configurator.configure_primitive(frequency_args, phase_shift_args, {})
+        self.assertLessEqual(relative_error(205.4, configuration.get_output_frequency(0)), 0.05)
+        self.assertLessEqual(relative_error(5, configuration.get_phase_shift(0).value), 0.15)
+
+        frequency_args = {"f_in_1": 100, "f_out_0": 206.85, "f_out_1": 11.93, "delta_0": 0.02, "delta_1": 0.02}
+        phase_shift_args = {"phase_shift_0": 7, "phase_shift_1": 3, "delta_0": 0.2, "delta_1": 0.2}
+        scores = []
+        for divider_alternatives in [1, 3, 1000]:
+            configurator = ClockingConfigurator(self.fpga, self.mmcme_2_base)
+            configurator.divider_alternatives = divider_alternatives
+            scores.append(configurator.configure_primitive(frequency_args, phase_shift_args, {}).delta_score)
+        self.assertLess(scores[1], scores[0])
+        self.assertLessEqual(scores[2], scores[1])
+
+    def test_margin_ppm(self):
+        """
+        Tests that a drift margin keeps exactly the vco candidates whose vco and pfd frequencies stay within their
+        limitations under the drift and prefers larger margins at equal scores
+        :return: None
+        """
+        self.frequency_setup()
+        frequency_args = {"f_in_1": 100, "f_out_0": 200}
+        configurator = ClockingConfigurator(self.fpga, self.mmcme_2_base)
+        all_candidates = configurator.get_vco_candidates(100)
+        # The default selection is at the maximum vco frequency
+        self.assertEqual(configurator.configure_primitive(frequency_args, {}, {}).get_vco_frequency(), 1600)
+
+        configurator.margin_ppm = 100
+        candidates = configurator.get_vco_candidates(100)
+        drift = 100e-6
+        vco_min, vco_max = self.fpga.get_vco_min("mmcm"), self.fpga.get_vco_max("mmcm")
+        pfd_min, pfd_max = self.fpga.get_pfd_min("mmcm"), self.fpga.get_pfd_max("mmcm")
+        self.assertEqual(candidates, [(m, d, f_vco) for m, d, f_vco in all_candidates
+                                      if vco_min <= f_vco * (1 - drift) and f_vco * (1 + drift) <= vco_max
+                                      and pfd_min <= 100 / d * (1 - drift) and 100 / d * (1 + drift) <= pfd_max])
+        self.assertTrue(all(margin >= 100 for margin in configurator.vco_margins.values()))
+
+        configuration = configurator.configure_primitive(frequency_args, {}, {})
+        self.assertEqual(configuration.delta_score, 0)
+        # 1100 MHz is the vco frequency of the exact candidates with the largest distance to 600 MHz and 1600 MHz
+        self.assertEqual(configuration.get_vco_frequency(), 1100)
+        self.assertAlmostEqual(configurator.vco_margins[(configuration.m.value, configuration.d.value)], 5e6 / 11)
+
+        # The vco range of the fpga model can not be kept for such a drift
+        configurator.margin_ppm = 500000
+        self.assertIsNone(configurator.configure_primitive(frequency_args, {}, {}))
+
+    def test_search_windows(self):
+        """
+        Tests that the vco, M and D windows lead to the vco frequencies of all M, D combinations within them
+        :return: None
+        """
+        self.frequency_setup()
+        configurator = ClockingConfigurator(self.fpga, self.mmcme_2_base)
+        vco_limits = (self.fpga.get_vco_min("mmcm"), self.fpga.get_vco_max("mmcm"))
+        pfd_limits = (self.fpga.get_pfd_min("mmcm"), self.fpga.get_pfd_max("mmcm"))
+
+        for vco_window, m_window, d_window in [((1400, 1600), None, None), (None, (20.3, 24.7), None),
+                                               (None, None, (1, 1)), ((700, 900), (8, 40), (2, 5)),
+                                               ((1000, 900), None, None)]:
+            configurator.vco_window, configurator.m_window, configurator.d_window = vco_window, m_window, d_window
+            windows = [window if window is not None else (0, inf) for window in [vco_window, m_window, d_window]]
+            candidates = configurator.get_vco_candidates(100)
+            self.assertTrue(all(windows[0][0] <= f_vco <= windows[0][1] and windows[1][0] <= m <= windows[1][1] and
+                                windows[2][0] <= d <= windows[2][1] for m, d, f_vco in candidates))
+            ratios = {exact_ratio(m, d) for m in self.mmcme_2_base.get_m_generator()
+                      for d in self.mmcme_2_base.get_d_generator()
+                      if max(vco_limits[0], windows[0][0]) <= 100 * m / d <= min(vco_limits[1], windows[0][1]) and
+                      pfd_limits[0] <= 100 / d <= pfd_limits[1] and
+                      windows[1][0] <= m <= windows[1][1] and windows[2][0] <= d <= windows[2][1]}
+            self.assertEqual(sorted(exact_ratio(m, d) for m, d, _ in candidates), sorted(ratios))
+
+        configurator.vco_window, configurator.m_window, configurator.d_window = (1200, 1600), None, (1, 1)
+        configuration = configurator.configure_primitive({"f_in_1": 100, "f_out_0": 133.7, "f_out_1": 50}, {}, {})
+        self.assertEqual(configuration.d.value, 1)
+        self.assertTrue(1200 <= configuration.get_vco_frequency() <= 1600)
@@ -0,0 +1,74 @@
+"""
+Tests for the input drift analysis
+"""
+import unittest
+from random import Random
+from fpga_globals import FPGA_MODELS
+from fpga_primitives import MmcmBlockConfiguration
+from fpga_configurator import ClockingConfigurator
+from fpga_drift import *
+
+
+class InputDriftTest(unittest.TestCase):
+    fpga = FPGA_MODELS[("artix-7", "3", "1.0V")]
+
+    def get_configuration(self, frequency_args: dict) -> ClockBlockConfiguration:
+        configurator = ClockingConfigurator(self.fpga, MmcmBlockConfiguration.get_new_instance())
+        return configurator.configure_primitive(frequency_args, {}, {})
+
+    def test_worst_cases(self):
+        configuration = self.get_configuration({"f_in_1": 100, "f_out_0": 200, "f_out_1": 33})
+        analysis = analyze_input_drift(self.fpga, configuration, {0: 200, 1: 33}, {}, DriftDistribution())
+
+        self.assertEqual([output.index for output in analysis.outputs], [0, 1])
+        self.assertEqual([limit.name for limit in analysis.limits], ["f_in", "f_vco", "f_pfd"])
+        for drift_range in analysis.get_ranges():
+            self.assertAlmostEqual(drift_range.minimum, drift_range.nominal * (1 - 50e-6))
+            self.assertAlmostEqual(drift_range.maximum, drift_range.nominal * (1 + 50e-6))
+            self.assertEqual(drift_range.violation_probability, 0)
+        self.assertAlmostEqual(analysis.outputs[0].worst_error, 50e-6)
+        self.assertEqual(analysis.violation_probability, 0)
+        self.assertEqual(analysis.get_violations(), [])
+
+    def test_violations(self):
+        # The vco frequency of this configuration is at its maximum, every positive drift violates it
+        configuration = self.get_configuration({"f_in_1": 100, "f_out_0": 200})
+        self.assertEqual(configuration.get_vco_frequency(), self.fpga.get_vco_max("mmcm"))
+        analysis = analyze_input_drift(self.fpga, configuration, {0: 200}, {}, DriftDistribution(NORMAL, 10))
+        self.assertEqual([drift_range.name for drift_range in analysis.get_violations()], ["f_vco"])
+        self.assertAlmostEqual(analysis.margin_ppm, -30)
+        self.assertAlmostEqual(analysis.violation_probability, 0.5)
+
+        # A delta of 0.5 ppm can not be kept with a drift of 50 ppm either
+        analysis = analyze_input_drift(self.fpga, configuration, {0: 200}, {0: 0.5e-6}, DriftDistribution())
+        self.assertEqual([drift_range.name for drift_range in analysis.get_violations()], ["clkout0", "f_vco"])
+        self.assertAlmostEqual(analysis.outputs[0].margin_ppm, -49.5)
+        self.assertAlmostEqual(analysis.violation_probability, 0.995)
+
+    def test_against_samples(self):
+        configuration = self.get_configuration({"f_in_1": 100, "f_out_0": 100.00003, "f_out_1": 33})
+        samples = 20000
+        for distribution in [DriftDistribution(UNIFORM, 50, 10), DriftDistribution(NORMAL, 20, -5)]:
+            analysis = analyze_input_drift(self.fpga, configuration, {0: 100.00003, 1: 33}, {0: 0.5e-6},
+                                           distribution)
+            random = Random(0)
+            violations = 0
+            for _ in range(samples):
+                if distribution.kind == UNIFORM:
+                    drift = random.uniform(*distribution.get_bounds())
+                else:
+                    drift = random.gauss(distribution.offset_ppm * PPM, distribution.ppm * PPM)
+                violations += any(not drift_range.limit_min <= drift_range.nominal * (1 + drift)
+                                  <= drift_range.limit_max for drift_range in analysis.get_ranges())
+            self.assertAlmostEqual(violations / samples, analysis.violation_probability, delta=0.01)
+
+    def test_distribution(self):
+        self.assertRaises(ValueError, DriftDistribution, "triangular")
+        self.assertRaises(ValueError, DriftDistribution, UNIFORM, -1)
+        distribution = DriftDistribution(NORMAL, 10, 5, 2)
+        low, high = distribution.get_bounds()
+        self.assertAlmostEqual(low, -15e-6)
+        self.assertAlmostEqual(high, 25e-6)
+        self.assertAlmostEqual(distribution.get_probability_outside(-5e-6, 15e-6), 0.3173, places=4)
+        self.assertEqual(DriftDistribution(UNIFORM, 0).get_probability_outside(-1e-6, 1e-6), 0)
+        self.assertEqual(DriftDistribution(UNIFORM, 0, 2).get_probability_outside(-1e-6, 1e-6), 1)
@@ -0,0 +1,116 @@
+"""
+Tests for the generation of DRP register values
+"""
+import json
+import os
+import tempfile
+import unittest
+from fpga_globals import FPGA_MODELS
+from fpga_primitives import PllBlockConfiguration, MmcmBlockConfiguration
+from fpga_configurator import ClockingConfigurator
+from fpga_drp import *
+
+
+class DrpRegisterTest(unittest.TestCase):
+    fpga = FPGA_MODELS[("artix-7", "3", "1.0V")]
+
+    def test_divider_fields(self):
+        self.assertEqual(get_divider_fields(1), (0, 1, 1, 1))
+        self.assertEqual(get_divider_fields(4), (0, 0, 2, 2))
+        # Odd dividers use the edge bit for the half cycle
+        self.assertEqual(get_divider_fields(5), (1, 0, 2, 3))
+        self.assertEqual(get_divider_fields(10, 0.25), (1, 0, 2, 8))
+        # The high time is at least 1 and at most divide - 1
+        self.assertEqual(get_divider_fields(10, 0.01), (0, 0, 1, 9))
+        self.assertEqual(get_divider_fields(10, 0.99), (1, 0, 9, 1))
+
+    def test_phase_fields(self):
+        self.assertEqual(get_phase_fields(8, 0), (0, 0, 0))
+        # 90 degree of 8 vco cycles are 2 cycles
+        self.assertEqual(get_phase_fields(8, 90), (0, 0, 2))
+        # 45 degree of 5 vco cycles are 5 / 8 cycles
+        self.assertEqual(get_phase_fields(5, 45), (0, 5, 0))
+        self.assertEqual(get_phase_fields(8, -90), get_phase_fields(8, 270))
+
+    def test_counter_registers(self):
+        self.assertEqual(get_counter_registers(5), ((2 << 6) | 3, 1 << 7))
+        self.assertEqual(get_counter_registers(1), ((1 << 6) | 1, 1 << 6))
+        # High and low times of 64 are encoded as 0
+        self.assertEqual(get_counter_registers(128)[0], 0)
+
+    def test_drp_registers(self):
+        configurator = ClockingConfigurator(self.fpga, PllBlockConfiguration.get_new_instance())
+        configuration = configurator.configure_primitive({"f_in_1": 100, "f_out_0": 100, "f_out_1": 25}, {}, {})
+        registers = get_drp_registers(configuration)
+
+        addresses = [address for address, _, _ in registers]
+        self.assertEqual(len(addresses), len(set(addresses)))
+        self.assertEqual(registers[0], (POWER_ADDRESS, 0x0000, 0xFFFF))
+        self.assertIn((OUTPUT_ADDRESSES[1][0], 0x1000, get_counter_registers(configuration.o_list[1].value)[0]),
+                      registers)
+        edge, no_count, high_time, low_time = get_divider_fields(configuration.d.value)
+        self.assertIn((DIVCLK_ADDRESS, 0xC000, edge << 13 | no_count << 12 | high_time << 6 | low_time), registers)
+        # The data never touches the bits that are kept by the mask
+        self.assertTrue(all(data & mask == 0 for _, mask, data in registers))
+
+        # Fractional dividers are not supported
+        mmcm = MmcmBlockConfiguration.get_new_instance()
+        mmcm.clkout0_divide_f.value = 12.5
+        with self.assertRaises(ValueError):
+            get_drp_registers(mmcm)
+
+    def test_lookup_tables_and_rom(self):
+        configurator = ClockingConfigurator(self.fpga, MmcmBlockConfiguration.get_new_instance())
+        configuration = configurator.configure_primitive({"f_in_1": 100, "f_out_0": 100}, {}, {})
+
+        # Only M of the configuration is read from the tables, every other entry is 0
+        m = int(configuration.m.value)
+        content = {"lock": ["0"] * 64, "filter_low": [0] * 64, "filter_high": [0] * 64, "filter_optimized": [0] * 64}
+        content["lock"][m - 1] = hex((0b10101 << 35) | (0b01010 << 30) | (0x3FF << 20) | (0x155 << 10) | 0x2AA)
+        content["filter_optimized"][m - 1] = 0x3FF
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tables.json")
+            with open(path, "w") as file:
+                json.dump(content, file)
+            lookup_tables = load_lookup_tables(path)
+
+            del content["filter_high"]
+            with open(path, "w") as file:
+                json.dump(content, file)
+            with self.assertRaises(ValueError):
+                load_lookup_tables(path)
+
+        registers = dict((address, data) for address, _, data in get_drp_registers(configuration, lookup_tables))
+        self.assertEqual(registers[LOCK_ADDRESSES[0]], 0x3FF)
+        self.assertEqual(registers[LOCK_ADDRESSES[1]], (0b01010 << 10) | 0x2AA)
+        self.assertEqual(registers[LOCK_ADDRESSES[2]], (0b10101 << 10) | 0x155)
+        self.assertEqual(registers[FILTER_ADDRESSES[0]], 0x9900)
+        self.assertEqual(registers[FILTER_ADDRESSES[1]], 0x9990)
+
+        rom = generate_drp_rom([configuration, configuration], lookup_tables).splitlines()
+        entries = [line for line in rom if not line.startswith("//")]
+        self.assertEqual(len(entries), 2 * len(registers))
+        self.assertTrue(all(len(entry) == 10 for entry in entries))
+        self.assertEqual(entries[0], "280000FFFF")
+
+        with self.assertRaises(ValueError):
+            generate_drp_rom([configuration, PllBlockConfiguration.get_new_instance()])
+
+    def test_rom_with_missing_configuration(self):
+        configurator = ClockingConfigurator(self.fpga, PllBlockConfiguration.get_new_instance())
+        configuration = configurator.configure_primitive({"f_in_1": 100, "f_out_0": 100}, {}, {})
+        registers = get_drp_registers(configuration)
+
+        # The missing configuration keeps its place, its entries leave the registers unchanged
+        rom = generate_drp_rom([None, configuration, None]).splitlines()
+        self.assertEqual(len(rom), 3 * (len(registers) + 1))
+        entries = [line for line in rom if not line.startswith("//")]
+        self.assertEqual(entries[len(registers):2 * len(registers)],
+                         [f"{address:02X}{mask:04X}{data:04X}" for address, mask, data in registers])
+        self.assertEqual(entries[:len(registers)], entries[2 * len(registers):])
+        self.assertEqual(entries[:len(registers)],
+                         [f"{address:02X}FFFF0000" for address, _, _ in registers])
+
+        with self.assertRaises(ValueError):
+            generate_drp_rom([None, None])
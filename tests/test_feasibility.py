@@ -0,0 +1,57 @@
+"""
+Tests for the feasibility pre-check
+"""
+import unittest
+from fpga_globals import FPGA_MODELS
+from fpga_primitives import MmcmBlockConfiguration, PllBlockConfiguration
+from fpga_configurator import ClockingConfigurator
+from fpga_feasibility import *
+
+
+class FeasibilityTest(unittest.TestCase):
+    fpga = FPGA_MODELS[("artix-7", "3", "1.0V")]
+
+    def setUp(self) -> None:
+        self.mmcm = MmcmBlockConfiguration.get_new_instance()
+        self.pll = PllBlockConfiguration.get_new_instance()
+
+    def test_feasible_requests(self):
+        self.assertEqual(check_feasibility(self.fpga, self.mmcm, 100, {0: 133.7, 6: 4.69}), [])
+        self.assertEqual(check_feasibility(self.fpga, self.pll, 19, {0: 6.25, 5: 800}, {0: 0.04, 5: 0}), [])
+
+    def test_input_frequency(self):
+        issues = check_feasibility(self.fpga, self.pll, 15, {0: 100})
+        self.assertEqual([issue.reason for issue in issues], [INPUT_FREQUENCY_OUT_OF_RANGE])
+        self.assertIsNone(issues[0].index)
+
+    def test_outputs(self):
+        # Output 6 on a pll, an output beyond the limitations and an output that is too slow for an input of 10 MHz
+        issues = check_feasibility(self.fpga, self.pll, 400, {0: 100, 1: 1000, 6: 100}, {1: 0.1})
+        self.assertEqual({issue.index: issue.reason for issue in issues},
+                         {1: OUTPUT_FREQUENCY_OUT_OF_RANGE, 6: OUTPUT_NOT_AVAILABLE})
+
+        issues = check_feasibility(self.fpga, self.mmcm, 10, {0: 700, 1: 300}, {0: 0.01, 1: 0.01})
+        self.assertEqual({issue.index: issue.reason for issue in issues}, {0: OUTPUT_FREQUENCY_UNREACHABLE})
+
+        # The cascade makes very low output frequencies on output 4 reachable
+        issues = check_feasibility(self.fpga, self.mmcm, 800, {4: 0.1}, {4: 0.1})
+        self.assertEqual([issue.reason for issue in issues], [OUTPUT_FREQUENCY_OUT_OF_RANGE])
+        issues = check_feasibility(self.fpga, self.mmcm, 800, {4: 4.69}, {4: 0.01}, f_out_4_cascade=True)
+        self.assertEqual(issues, [])
+
+        # Phase shifts need an existing output as well
+        issues = check_feasibility(self.fpga, self.pll, 100, {0: 100}, phase_shifts={6: 45})
+        self.assertEqual([(issue.index, issue.reason) for issue in issues], [(6, OUTPUT_NOT_AVAILABLE)])
+        self.assertEqual(check_feasibility(self.fpga, self.mmcm, 100, {0: 100}, phase_shifts={6: 45}), [])
+
+    def test_configurator_rejects_infeasible_requests(self):
+        configurator = ClockingConfigurator(self.fpga, self.pll)
+        result = configurator.configure_primitive({"f_in_1": 400, "f_out_0": 100, "f_out_6": 100}, {}, {})
+        self.assertIsNone(result)
+        self.assertEqual([issue.reason for issue in configurator.feasibility_issues], [OUTPUT_NOT_AVAILABLE])
+
+        # Every request the pre-check rejects really has no configuration
+        for f_in_1, f_out_0, delta_0 in [(10, 700, 0.01), (10, 4.69, 0.001), (800, 800, 0), (19, 6.25, 0.5)]:
+            configurator = ClockingConfigurator(self.fpga, self.mmcm)
+            if configurator.check_feasibility({"f_in_1": f_in_1, "f_out_0": f_out_0, "delta_0": delta_0}):
+                self.assertEqual(configurator.configure_frequency_parameters(f_in_1, f_out_0, delta_0=delta_0), [])
@@ -0,0 +1,89 @@
+"""
+Tests for the precomputed frequency tables
+"""
+import unittest
+import tempfile
+from pathlib import Path
+from fpga_globals import FPGA_MODELS
+from fpga_primitives import PllBlockConfiguration
+from fpga_configurator import ClockingConfigurator
+from fpga_frequency_table import FrequencyTable, write_frequency_table, query_nearest_frequencies
+
+
+class FrequencyTableTest(unittest.TestCase):
+    fpga = FPGA_MODELS[("artix-7", "3", "1.0V")]
+    input_frequencies = [25.0, 100.0]
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.directory.name).joinpath("table.jft"))
+        self.pll = PllBlockConfiguration.get_new_instance()
+        write_frequency_table(self.path, self.fpga, self.pll, self.input_frequencies)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_header(self):
+        with FrequencyTable(self.path) as table:
+            self.assertTrue(table.is_compatible(self.fpga, "pll"))
+            self.assertFalse(table.is_compatible(self.fpga, "mmcm"))
+            self.assertEqual(table.get_input_frequencies(), self.input_frequencies)
+            for index in range(self.pll.output_clocks):
+                self.assertTrue(table.has_section(100.0, index))
+
+    def test_nearest_against_full_sweep(self):
+        configurator = ClockingConfigurator(self.fpga, self.pll)
+        vco_frequencies = [f_vco for _, _, f_vco in configurator.get_vco_candidates(100.0)]
+
+        with FrequencyTable(self.path) as table:
+            for target in [6.25, 133.7, 245.76, 800]:
+                nearest = table.get_nearest(100.0, 2, target, count=3)
+                self.assertEqual(len(nearest), 3)
+
+                # The best record has to be as close as the best frequency of a full sweep
+                best_error = min(abs(target - f_vco / o)
+                                 for f_vco in vco_frequencies
+                                 for o in range(1, 129)
+                                 if configurator.f_out_min <= f_vco / o <= configurator.f_out_max)
+                self.assertAlmostEqual(abs(target - nearest[0].f_out), best_error, places=9)
+
+                # Records are sorted by distance and their provenance reproduces the frequency
+                self.assertEqual(nearest, sorted(nearest, key=lambda record: abs(target - record.f_out)))
+                for record in nearest:
+                    self.assertAlmostEqual(record.f_out, 100.0 * record.m / (record.d * record.o), places=9)
+
+    def test_range(self):
+        with FrequencyTable(self.path) as table:
+            records = table.get_range(25.0, 0, 100, 200)
+            self.assertGreater(len(records), 0)
+            self.assertEqual(records, sorted(records, key=lambda record: record.f_out))
+            for record in records:
+                self.assertTrue(100 <= record.f_out <= 200)
+
+    def test_corrupt_table(self):
+        with open(self.path, "rb") as file:
+            content = file.read()
+        for corrupt_content in [b"", b"no table", content[:len(content) // 1000], content[:len(content) // 2]]:
+            with open(self.path, "wb") as file:
+                file.write(corrupt_content)
+            with self.assertRaises(ValueError):
+                FrequencyTable(self.path)
+
+    def test_invalid_input_frequency(self):
+        with self.assertRaises(ValueError):
+            write_frequency_table(self.path, self.fpga, self.pll, [5.0])
+
+    def test_query_with_and_without_table(self):
+        targets = {0: 133.7, 3: 245.76, 5: 6.25}
+        enumerated = query_nearest_frequencies(self.fpga, self.pll, 100.0, targets, count=4)
+        with FrequencyTable(self.path) as table:
+            looked_up = query_nearest_frequencies(self.fpga, self.pll, 100.0, targets, count=4, table=table)
+
+        for index, target in targets.items():
+            self.assertEqual(len(enumerated[index]), 4)
+            for enumerated_record, looked_up_record in zip(enumerated[index], looked_up[index]):
+                self.assertAlmostEqual(enumerated_record.f_out, looked_up_record.f_out, places=9)
+
+        # Output 6 does not exist on the pll
+        with self.assertRaises(ValueError):
+            query_nearest_frequencies(self.fpga, self.pll, 100.0, {6: 100.0})
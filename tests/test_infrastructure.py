@@ -58,6 +58,9 @@ class ClockAttributeTest(unittest.TestCase):
 
         # Test get_range_as_generator
         self.assertEqual(list(attribute.get_range_as_generator()), [factor * (1 / 7) for factor in range(7)] + [0.99])
+        # Alternative bounds are aligned to the possible values, empty ranges produce no value
+        self.assertEqual(list(attribute.get_range_as_generator(start=0.3, end=0.6)), [3 / 7, 4 / 7])
+        self.assertEqual(list(attribute.get_range_as_generator(start=0.5, end=0.55)), [])
 
     def test_output_divider_value(self):
         # Setup
@@ -133,6 +136,46 @@ class ClockPrimitiveTest(unittest.TestCase):
         self.assertEqual(self.mmcm.get_output_frequency_dict(), {0: 750, 1: 375, 4: 5.859375, 6: 11.71875})
 
 
+# Test Cases for the clones of the configuration prototypes
+class ClonePrimitiveTest(unittest.TestCase):
+    def test_clone_references(self):
+        for configuration_class in [PllBlockConfiguration, MmcmBlockConfiguration]:
+            clone = configuration_class.get_clone()
+            instance = configuration_class.get_new_instance()
+            self.assertEqual(clone, instance)
+
+            self.assertIs(clone.m, clone.clkfbout_mult_f if clone.specification == "mmcm" else clone.clkfbout_mult)
+            self.assertIs(clone.d, clone.divclk_divide)
+            self.assertEqual(len(clone.o_list), instance.output_clocks)
+            for index, divider in enumerate(clone.o_list):
+                self.assertIs(divider, clone.get_output_divider(index))
+                self.assertIs(divider, getattr(clone, instance.o_list[index].name.lower()))
+            self.assertEqual([attribute.name for attribute in clone.attributes],
+                             [attribute.name for attribute in instance.attributes])
+            self.assertIs(clone.attributes[0], clone.bandwidth)
+
+    def test_clone_independence(self):
+        clone = MmcmBlockConfiguration.get_clone()
+        other_clone = MmcmBlockConfiguration.get_clone()
+        instance = MmcmBlockConfiguration.get_new_instance()
+        for configuration in [clone, instance]:
+            configuration.set_in_period_based_on_frequency(100)
+            configuration.m.value = 12
+            configuration.m.on = True
+            configuration.o_list[1].value = 6
+            configuration.o_list[1].on = True
+            configuration.clkout1_phase.increment = 45 / 6
+            configuration.clkout1_phase.set_and_correct_value(90)
+            configuration.clkout1_phase.on = True
+            configuration.bandwidth.set_value("HIGH")
+
+        self.assertEqual(clone, instance)
+        self.assertEqual(str(clone), str(instance))
+        self.assertEqual(clone.get_output_frequency(1), 200)
+        self.assertEqual(other_clone, MmcmBlockConfiguration.get_new_instance())
+        self.assertEqual(MmcmBlockConfiguration.get_clone().clkout1_phase.increment, None)
+
+
 # Test Cases for the get_clock_attributes function
 class AttributeListTest(unittest.TestCase):
     def setUp(self) -> None:
@@ -174,6 +217,25 @@ class AttributeListTest(unittest.TestCase):
         self.temp_dict_pll = get_clock_attributes("PllBlockConfiguration")
         self.assertEqual(self.temp_dict_pll["bandwidth"].value, "OPTIMIZED")
 
+    # Test if the constant properties are shared and only changed for the attribute that changes them
+    def test_shared_descriptors(self):
+        other_dict_pll = get_clock_attributes("PllBlockConfiguration")
+        self.assertIs(self.temp_dict_pll["clkout1_phase"].descriptor, other_dict_pll["clkout1_phase"].descriptor)
+        self.assertFalse(hasattr(self.temp_dict_pll["clkout1_phase"], "__dict__"))
+
+        self.temp_dict_pll["clkout1_phase"].increment = 45 / 8
+        self.temp_dict_pll["clkout1_phase"].end = 300.0
+        self.assertEqual(self.temp_dict_pll["clkout1_phase"].increment, 45 / 8)
+        self.assertEqual(self.temp_dict_pll["clkout1_phase"].end, 300.0)
+        self.assertEqual(self.temp_dict_pll["clkout1_phase"].start, -360.0)
+        self.assertIsNone(other_dict_pll["clkout1_phase"].increment)
+        self.assertEqual(other_dict_pll["clkout1_phase"].end, 360.0)
+
+        # Equal properties lead to the same descriptor
+        other_dict_pll["clkout1_phase"].increment = 45 / 8
+        other_dict_pll["clkout1_phase"].end = 300.0
+        self.assertIs(self.temp_dict_pll["clkout1_phase"].descriptor, other_dict_pll["clkout1_phase"].descriptor)
+
 
 # Test Case for the FPGAModel class
 class FPGAModelTest(unittest.TestCase):
@@ -0,0 +1,59 @@
+"""
+Tests for the Pareto front of the configuration candidates
+"""
+import random
+import unittest
+from fpga_globals import FPGA_MODELS
+from fpga_primitives import MmcmBlockConfiguration
+from fpga_configurator import ClockingConfigurator
+from fpga_pareto import *
+
+
+class ParetoTest(unittest.TestCase):
+    fpga = FPGA_MODELS[("artix-7", "3", "1.0V")]
+
+    @staticmethod
+    def get_brute_force_front(points: list) -> set:
+        front = set()
+        for point in points:
+            objectives = point.get_objectives()
+            if not any(dominates(other.get_objectives(), objectives) and other.get_objectives() != objectives
+                       for other in points):
+                front.add(objectives)
+        return front
+
+    def test_front(self):
+        generator = random.Random(42)
+        for _ in range(50):
+            points = [ParetoPoint(generator.randint(0, 9), generator.randint(0, 9), generator.randint(0, 9),
+                                  generator.randint(1, 5), None) for _ in range(generator.randint(1, 60))]
+            front = ParetoFront()
+            for point in points:
+                front.add(point)
+
+            objectives = [point.get_objectives() for point in front.get_points()]
+            self.assertEqual(objectives, sorted(objectives))
+            self.assertEqual(len(objectives), len(set(objectives)))
+            self.assertEqual(set(objectives), self.get_brute_force_front(points))
+
+    def test_configurator(self):
+        configurator = ClockingConfigurator(self.fpga, MmcmBlockConfiguration.get_new_instance())
+        configurator.configure_primitive({"f_in_1": 100, "f_out_0": 133.7, "f_out_1": 50}, {"phase_shift_1": 30}, {})
+        self.assertIsNone(configurator.pareto_front)
+
+        configurator.collect_pareto_front = True
+        selected = configurator.configure_primitive({"f_in_1": 100, "f_out_0": 133.7, "f_out_1": 50},
+                                                    {"phase_shift_1": 30}, {})
+        points = configurator.pareto_front.get_points()
+        self.assertTrue(points)
+
+        vco_max = self.fpga.get_vco_max("mmcm")
+        candidate_points = [get_pareto_point(config, vco_max, {0: 133.7, 1: 50}, {1: 30})
+                            for config in configurator.configuration_candidates]
+        self.assertEqual({point.get_objectives() for point in points}, self.get_brute_force_front(candidate_points))
+        selected_objectives = get_pareto_point(selected, vco_max, {0: 133.7, 1: 50}, {1: 30}).get_objectives()
+        self.assertTrue(any(dominates(point.get_objectives(), selected_objectives) for point in points))
+
+        # Rejected requests have an empty front
+        self.assertIsNone(configurator.configure_primitive({"f_in_1": 100, "f_out_0": 1e6}, {}, {}))
+        self.assertEqual(len(configurator.pareto_front), 0)
@@ -0,0 +1,67 @@
+"""
+Tests for the clock planner
+"""
+import unittest
+from fpga_globals import FPGA_MODELS
+from fpga_planner import *
+from fpga_primitives import PllBlockConfiguration, MmcmBlockConfiguration, get_primitive_by_specification
+from utility import relative_error
+
+
+class ClockPlannerTest(unittest.TestCase):
+    fpga = FPGA_MODELS[("artix-7", "3", "1.0V")]
+
+    def assert_valid_plan(self, clocks: list, tiles: list):
+        self.assertEqual(sorted(clock.name for tile in tiles for clock in tile.clocks),
+                         sorted(clock.name for clock in clocks))
+        for tile in tiles:
+            self.assertLessEqual(len(tile.clocks), tile.configuration.output_clocks)
+            for index, clock in enumerate(tile.clocks):
+                self.assertEqual(clock.f_in_1, tile.f_in_1)
+                self.assertLessEqual(relative_error(clock.f_out, tile.configuration.get_output_frequency(index)),
+                                     clock.delta)
+
+    def test_plan_clocks(self):
+        clocks = [ClockRequest("ddr", 100, 400, 0), ClockRequest("eth", 100, 125, 0),
+                  ClockRequest("audio", 100, 12.288, 0.001), ClockRequest("pixel", 100, 148.5, 0.001),
+                  ClockRequest("sys", 100, 50), ClockRequest("sfp", 156.25, 312.5, 0)]
+        tiles = plan_clocks(self.fpga, clocks)
+        self.assert_valid_plan(clocks, tiles)
+
+        # The sfp clock has another input frequency and needs its own tile
+        self.assertLessEqual(len(tiles), 3)
+        self.assertEqual([tile.clocks for tile in tiles if tile.f_in_1 == 156.25], [[clocks[-1]]])
+
+        # One verilog module per tile
+        for tile in tiles:
+            self.assertIn(f"module {tile.name}\n", tile.generate_template())
+
+    def test_output_capacity(self):
+        # Multiples of 100 MHz fit onto one vco frequency, but a pll only has 6 outputs
+        clocks = [ClockRequest(f"clock_{index}", 100, 100 / index, 0) for index in range(1, 9)]
+        tiles = plan_clocks(self.fpga, clocks, specifications=("pll",))
+        self.assert_valid_plan(clocks, tiles)
+        self.assertEqual(sorted(len(tile.clocks) for tile in tiles), [2, 6])
+
+        tiles = plan_clocks(self.fpga, clocks, specifications=("mmcm",))
+        self.assert_valid_plan(clocks, tiles)
+        self.assertEqual(sorted(len(tile.clocks) for tile in tiles), [1, 7])
+
+    def test_fractional_output(self):
+        # 1200 / 6.125 is only reachable with the fractional divider of output 0
+        planner = ClockPlanner(self.fpga, ("mmcm",))
+        clocks = [ClockRequest("integer", 100, 200, 0), ClockRequest("fractional", 100, 1200 / 6.125, 0)]
+        self.assertEqual(planner.assign_outputs("mmcm", clocks), clocks[::-1])
+        self.assertEqual(len(planner.plan(clocks)), 1)
+
+    def test_invalid_clocks(self):
+        with self.assertRaises(ValueError):
+            plan_clocks(self.fpga, [ClockRequest("fast", 100, 2000, 0.01)])
+        with self.assertRaises(ValueError):
+            plan_clocks(self.fpga, [ClockRequest("a", 100, 100), ClockRequest("a", 100, 50)])
+
+    def test_primitive_by_specification(self):
+        self.assertIsInstance(get_primitive_by_specification("PLL"), PllBlockConfiguration)
+        self.assertIsInstance(get_primitive_by_specification("mmcm"), MmcmBlockConfiguration)
+        with self.assertRaises(ValueError):
+            get_primitive_by_specification("dcm")
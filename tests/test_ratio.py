@@ -0,0 +1,103 @@
+"""
+Tests for the ratio constraints
+"""
+import unittest
+from fractions import Fraction
+from random import Random
+from fpga_globals import FPGA_MODELS
+from fpga_primitives import PllBlockConfiguration, MmcmBlockConfiguration
+from fpga_configurator import ClockingConfigurator
+from fpga_ratio import *
+from utility import relative_error
+
+
+class RatioConstraintTest(unittest.TestCase):
+    fpga = FPGA_MODELS[("artix-7", "3", "1.0V")]
+
+    def get_configurator(self, primitive: ClockBlockConfiguration, constraints: list) -> ClockingConfigurator:
+        configurator = ClockingConfigurator(self.fpga, primitive.get_new_instance())
+        configurator.ratio_constraints = constraints
+        return configurator
+
+    def test_exact_ratios(self):
+        frequency_args = {"f_in_1": 24.576, "f_out_0": 333.3, "f_out_1": 166.65, "f_out_2": 83.325,
+                          "delta_0": 0.01, "delta_1": 0.01, "delta_2": 0.01}
+        for primitive in [PllBlockConfiguration, MmcmBlockConfiguration]:
+            configurator = self.get_configurator(primitive, [RatioConstraint(0, 1), RatioConstraint(1, 2)])
+            configuration = configurator.configure_primitive(frequency_args, {}, {})
+            dividers = [Fraction(configuration.o_list[index].value) for index in range(3)]
+            self.assertEqual(dividers[1], 2 * dividers[0])
+            self.assertEqual(dividers[2], 4 * dividers[0])
+            self.assertEqual(configurator.ratio_outputs, {0, 1, 2})
+
+            # This family is fulfilled exactly without the constraints as well
+            unconstrained = self.get_configurator(primitive, []).configure_primitive(frequency_args, {}, {})
+            self.assertEqual(configuration.delta_score, unconstrained.delta_score)
+
+        # Given ratios are enforced even if the targets have another ratio
+        configurator = self.get_configurator(MmcmBlockConfiguration, [RatioConstraint(0, 1, Fraction(3))])
+        configuration = configurator.configure_primitive({"f_in_1": 100, "f_out_0": 400, "f_out_1": 150,
+                                                          "delta_1": 0.01}, {}, {})
+        self.assertEqual(Fraction(configuration.o_list[1].value), 3 * Fraction(configuration.o_list[0].value))
+        self.assertLessEqual(relative_error(150, configuration.get_output_frequency(1)), 0.01)
+
+    def test_pruning(self):
+        """
+        Tests the dividers of the groups and the skipped vco frequencies against all root dividers
+        """
+        primitive = MmcmBlockConfiguration.get_new_instance()
+        output_frequencies = {0: 125, 1: 250, 2: 62.5, 3: 31.25}
+        deltas = {0: 0.002, 1: 0.002, 2: 0.01, 3: 0.5}
+        f_out_min, f_out_max = self.fpga.get_f_out_min("mmcm"), self.fpga.get_f_out_max("mmcm")
+        groups = get_ratio_groups(primitive, [RatioConstraint(1, 0), RatioConstraint(0, 2, Fraction(3)),
+                                              RatioConstraint(2, 3)], output_frequencies)
+        self.assertEqual(len(groups), 1)
+        group = groups[0]
+        self.assertEqual(group.root, 0)
+        self.assertEqual(group.factors, {0: 1, 1: Fraction(1, 2), 2: 3, 3: 6})
+        group.set_vco_intervals(output_frequencies, deltas, f_out_min, f_out_max)
+
+        random = Random(0)
+        for _ in range(300):
+            base = random.uniform(600, 1600)
+            valid = []
+            for divider in group.root_dividers:
+                dividers = group.dividers[divider]
+                frequencies = {index: base / dividers[index] for index in dividers}
+                if all(relative_error(output_frequencies[index], f_out) <= deltas[index] and
+                       f_out_min <= f_out <= f_out_max for index, f_out in frequencies.items()):
+                    valid.append(sum(relative_error(output_frequencies[index], f_out)
+                                     for index, f_out in frequencies.items()))
+            self.assertEqual(group.is_vco_possible(base), bool(valid))
+            if valid:
+                dividers = group.get_dividers(base, output_frequencies, deltas, f_out_min, f_out_max)
+                self.assertAlmostEqual(sum(relative_error(output_frequencies[index], base / dividers[index])
+                                           for index in dividers), min(valid))
+
+        frequency_args = {"f_in_1": 33.333, "f_out_0": 125, "f_out_1": 250, "f_out_2": 62.5, "f_out_3": 31.25,
+                          "f_out_4": 15.625, **{f"delta_{index}": 0.0001 for index in range(5)}}
+        configurator = self.get_configurator(MmcmBlockConfiguration, [RatioConstraint(1, 0), RatioConstraint(0, 2),
+                                                                      RatioConstraint(2, 3), RatioConstraint(3, 4)])
+        configuration = configurator.configure_primitive(frequency_args, {}, {})
+        self.assertLess(len(configurator.vco_states), len(configurator.get_vco_candidates(33.333)) / 10)
+        unconstrained = self.get_configurator(MmcmBlockConfiguration, []).configure_primitive(frequency_args, {}, {})
+        self.assertEqual(str(configuration), str(unconstrained))
+
+    def test_invalid_constraints(self):
+        primitive = MmcmBlockConfiguration.get_new_instance()
+        output_frequencies = {0: 400, 1: 200, 2: 100}
+        self.assertRaises(ValueError, get_ratio_groups, primitive, [RatioConstraint(0, 3)], output_frequencies)
+        self.assertRaises(ValueError, get_ratio_groups, primitive, [RatioConstraint(0, 0)], output_frequencies)
+        self.assertRaises(ValueError, get_ratio_groups, primitive,
+                          [RatioConstraint(0, 1), RatioConstraint(1, 2, Fraction(3)), RatioConstraint(0, 2)],
+                          output_frequencies)
+
+        configurator = self.get_configurator(MmcmBlockConfiguration, [RatioConstraint(0, 4)])
+        self.assertRaises(ValueError, configurator.configure_primitive,
+                          {"f_in_1": 100, "f_out_0": 400, "f_out_4": 10, "f_out_4_cascade": True}, {}, {})
+
+        # No divider of output 1 is a thousandth of a divider of output 0
+        constraints = [RatioConstraint(0, 1, Fraction(1, 1000))]
+        self.assertEqual(get_ratio_groups(primitive, constraints, output_frequencies)[0].root_dividers, [])
+        configurator = self.get_configurator(PllBlockConfiguration, constraints)
+        self.assertIsNone(configurator.configure_primitive({"f_in_1": 100, "f_out_0": 10, "f_out_1": 10}, {}, {}))
@@ -0,0 +1,91 @@
+"""
+Tests for the machine-readable result
+"""
+import json
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from fpga_globals import FPGA_MODELS
+from fpga_primitives import PllBlockConfiguration, MmcmBlockConfiguration
+from fpga_configurator import ClockingConfigurator
+from fpga_result import *
+
+
+class ResultTest(unittest.TestCase):
+    fpga_identifier = ("artix-7", "3", "1.0V")
+    fpga = FPGA_MODELS[fpga_identifier]
+    jacc = str(Path(__file__).resolve().parent.parent.joinpath("jacc.py"))
+
+    def run_jacc(self, args: list) -> dict:
+        output = subprocess.run([sys.executable, self.jacc, *args, "-fmt", "json"], stdout=subprocess.PIPE,
+                                check=True).stdout
+        return json.loads(output)
+
+    def test_result_dict(self):
+        frequency_args = {"f_in_1": 100, "f_out_0": 133.7, "f_out_2": 50, "delta_0": 0.01}
+        configurator = ClockingConfigurator(self.fpga, MmcmBlockConfiguration.get_new_instance())
+        configuration = configurator.configure_primitive(frequency_args, {}, {})
+
+        result = json.loads(get_result_json(configurator, self.fpga_identifier, frequency_args, solve_time=0.5))
+        self.assertEqual(result["schema_version"], RESULT_SCHEMA_VERSION)
+        self.assertTrue(result["found"])
+        self.assertEqual(result["fpga_model"], list(self.fpga_identifier))
+        self.assertEqual(result["primitive"], "mmcm")
+        self.assertEqual(result["request"]["frequency_args"], frequency_args)
+
+        self.assertEqual(result["configuration"]["properties"], configuration.get_properties_dict())
+        self.assertEqual(set(result["configuration"]["expected_values"]), {"0", "2"})
+        self.assertEqual(result["configuration"]["expected_values"]["2"]["frequency"],
+                         configuration.get_output_frequency(2))
+        self.assertEqual(result["configuration"]["relative_errors"],
+                         {str(index): error for index, error in configurator.get_achieved_errors().items()})
+        self.assertEqual(result["configuration"]["delta_score"], configuration.delta_score)
+        self.assertEqual(result["configuration"]["verilog"], str(configuration))
+        self.assertEqual(result["stats"], {"vco_candidates": len(configurator.vco_states),
+                                           "configuration_candidates": len(configurator.configuration_candidates),
+                                           "collapsed_equivalents": configurator.collapsed_equivalents,
+                                           "solve_time": 0.5})
+        self.assertNotIn("auto_delta", result)
+
+        # The (M, D) combinations are counted with the cascade as well, although their states are not kept
+        configurator.configure_primitive({**frequency_args, "f_out_4": 4.69, "f_out_4_cascade": True}, {}, {})
+        stats = get_result_dict(configurator, self.fpga_identifier, frequency_args)["stats"]
+        self.assertEqual(configurator.vco_states, [])
+        self.assertEqual(stats["vco_candidates"], len(configurator.get_vco_candidates(100)))
+
+    def test_result_dict_without_configuration(self):
+        # The pll does not support input frequencies below its limitations
+        frequency_args = {"f_in_1": 10, "f_out_0": 100}
+        configurator = ClockingConfigurator(self.fpga, PllBlockConfiguration.get_new_instance())
+        configurator.configure_primitive(frequency_args, {}, {})
+
+        result = get_result_dict(configurator, self.fpga_identifier, frequency_args)
+        self.assertFalse(result["found"])
+        self.assertIsNone(result["configuration"])
+        self.assertEqual(result["primitive"], "pll")
+        self.assertGreater(len(result["feasibility_issues"]), 0)
+        self.assertEqual(set(result["feasibility_issues"][0]), {"reason", "message", "index"})
+
+    def test_json_format_argument(self):
+        result = self.run_jacc(["-fin1", "100", "-fout0", "133.7", "-m"])
+        self.assertTrue(result["found"])
+        self.assertIn("module clk", result["configuration"]["verilog"])
+
+        result = self.run_jacc(["-fin1", "100", "-fout0", "133.7", "-fdelta0", "0.0001", "-ad", "scaled"])
+        self.assertEqual(result["auto_delta"]["mode"], "scaled")
+        self.assertGreater(result["auto_delta"]["delta_scale"], 0)
+
+    def test_json_of_searches(self):
+        # The request contains the selected input frequency and the counts are the ones of its solve
+        result = self.run_jacc(["-finc", "156.25", "125", "-fout0", "133.7", "-j", "1"])
+        self.assertEqual(result["request"]["frequency_args"]["f_in_1"], 125)
+        configurator = ClockingConfigurator(self.fpga, MmcmBlockConfiguration.get_new_instance())
+        configurator.configure_primitive({"f_in_1": 125, "f_out_0": 133.7}, {}, {})
+        self.assertEqual({key: value for key, value in result["stats"].items() if key != "solve_time"},
+                         configurator.get_solve_stats())
+
+        result = self.run_jacc(["-cmtb", "auto", "-fin1", "100", "-fout0", "133.7"])
+        self.assertTrue(result["found"])
+        self.assertGreater(result["stats"]["vco_candidates"], 0)
+        self.assertGreater(result["stats"]["configuration_candidates"], 0)
@@ -0,0 +1,87 @@
+"""
+Tests for the scoring functions of the configuration candidates
+"""
+import unittest
+from fpga_globals import FPGA_MODELS
+from fpga_primitives import MmcmBlockConfiguration
+from fpga_configurator import ClockingConfigurator
+from fpga_search import race_primitives
+from fpga_scoring import *
+
+
+class HighestVcoScore(ScoringFunction):
+    """Plugin that ignores the errors and prefers the highest vco frequency"""
+
+    def score(self, configuration, output_frequencies: dict, phase_shifts: dict, vco_max: float) -> float:
+        return vco_max - configuration.get_vco_frequency()
+
+
+class ScoringTest(unittest.TestCase):
+    fpga = FPGA_MODELS[("artix-7", "3", "1.0V")]
+    frequency_args = {"f_in_1": 100, "f_out_0": 133.7, "f_out_1": 50}
+    phase_shift_args = {"phase_shift_1": 30}
+    output_frequencies = {0: 133.7, 1: 50}
+    phase_shifts = {1: 30}
+
+    def get_configurator(self, scoring_function: ScoringFunction = None,
+                         phase_shift_args: dict = None) -> ClockingConfigurator:
+        configurator = ClockingConfigurator(self.fpga, MmcmBlockConfiguration.get_new_instance())
+        configurator.scoring_function = scoring_function
+        configurator.configure_primitive(self.frequency_args,
+                                         self.phase_shift_args if phase_shift_args is None else phase_shift_args, {})
+        return configurator
+
+    def test_delta_score(self):
+        candidates = self.get_configurator().configuration_candidates
+        vco_max = self.fpga.get_vco_max("mmcm")
+        for use_relative_error in [True, False]:
+            scoring_function = DeltaScore(use_relative_error)
+            scores = scoring_function.score_candidates(candidates, self.output_frequencies, self.phase_shifts,
+                                                       vco_max)
+            for configuration, score in zip(candidates, scores):
+                # The batch form has to give exactly the same scores
+                self.assertEqual(score, scoring_function.score(configuration, self.output_frequencies,
+                                                               self.phase_shifts, vco_max))
+                configuration.set_delta_score(self.output_frequencies, self.phase_shifts, use_relative_error)
+                self.assertEqual(score, configuration.delta_score)
+
+        default_scores = WeightedScore().score_candidates(candidates, self.output_frequencies, self.phase_shifts,
+                                                          vco_max)
+        for configuration, score in zip(candidates, default_scores):
+            self.assertAlmostEqual(score, configuration.delta_score)
+
+    def test_weighted_score(self):
+        default = self.get_configurator(phase_shift_args={}).selected_candidate
+        vco_max = self.fpga.get_vco_max("mmcm")
+
+        with_vco_penalty = self.get_configurator(WeightedScore(vco_penalty=10), {}).selected_candidate
+        self.assertGreater(with_vco_penalty.get_vco_frequency(), default.get_vco_frequency())
+        self.assertLessEqual(with_vco_penalty.get_vco_frequency(), vco_max)
+
+        with_d_penalty = self.get_configurator(WeightedScore(d_penalty=5), {}).selected_candidate
+        self.assertLess(with_d_penalty.d.value, default.d.value)
+
+        # Only output 1 matters
+        configuration = self.get_configurator(WeightedScore({0: 0}, phase_weight=0)).selected_candidate
+        self.assertEqual(configuration.get_output_frequency(1), 50)
+
+        scoring_function = WeightedScore(error_unit=PPM, frequency_weights={0: 1, 1: 1}, phase_weight=0)
+        self.assertAlmostEqual(scoring_function.score(default, self.output_frequencies, {}, vco_max),
+                               sum(relative_error(target, default.get_output_frequency(index)) * 1e6
+                                   for index, target in self.output_frequencies.items()))
+
+        with self.assertRaises(ValueError):
+            WeightedScore(error_unit="percent")
+        with self.assertRaises(ValueError):
+            WeightedScore(d_penalty=-1)
+
+    def test_plugin(self):
+        configurator = self.get_configurator(HighestVcoScore())
+        vco_frequencies = [configuration.get_vco_frequency() for configuration in configurator.configuration_candidates]
+        self.assertEqual(configurator.selected_candidate.get_vco_frequency(), max(vco_frequencies))
+
+        # Scoring functions are passed to the worker processes of the searches
+        ranking = race_primitives(self.fpga, self.frequency_args, self.phase_shift_args,
+                                  scoring_function=WeightedScore(d_penalty=5))
+        for result in ranking:
+            self.assertEqual(result.configuration.d.value, 1)
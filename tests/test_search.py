@@ -0,0 +1,170 @@
+"""
+Tests for the searches over several parameters of one request
+"""
+import time
+import unittest
+from unittest import mock
+from fpga_globals import FPGA_MODELS
+from fpga_primitives import PllBlockConfiguration, MmcmBlockConfiguration
+from fpga_configurator import ClockingConfigurator
+from fpga_scoring import WeightedScore
+from fpga_search import *
+
+
+def solve_request_with_slow_pll(queue, index: int, arguments: tuple) -> None:
+    # The pll has the index 0 in "race_primitives", the mmcm reports first
+    if index == 0:
+        time.sleep(1)
+    solve_request_into_queue(queue, index, arguments)
+
+
+class InputFrequencySearchTest(unittest.TestCase):
+    fpga = FPGA_MODELS[("artix-7", "3", "1.0V")]
+    frequency_args = {"f_out_0": 133.7, "f_out_1": 245.76, "delta_0": 0.01, "delta_1": 0.01}
+
+    def test_input_frequency_candidates(self):
+        self.assertEqual(get_input_frequency_candidates(100, 101, 0.25), [100, 100.25, 100.5, 100.75, 101])
+        self.assertEqual(get_input_frequency_candidates(12.288, 12.288, 1), [12.288])
+
+    def test_rank_input_frequencies(self):
+        pll = PllBlockConfiguration.get_new_instance()
+        input_frequencies = [10, 100, 125, 156.25]
+
+        ranking = rank_input_frequencies(self.fpga, pll, input_frequencies, self.frequency_args, {}, processes=1)
+        self.assertEqual(sorted(result.f_in_1 for result in ranking), input_frequencies)
+
+        # 10 MHz is below the pll input limitations and has to be ranked last
+        self.assertEqual(ranking[-1].f_in_1, 10)
+        self.assertIsNone(ranking[-1].configuration)
+        self.assertGreater(len(ranking[-1].feasibility_issues), 0)
+
+        scores = [result.get_delta_score() for result in ranking]
+        self.assertEqual(scores, sorted(scores))
+
+        # Every score is the score of a normal configuration with that input frequency
+        for result in ranking[:-1]:
+            configurator = ClockingConfigurator(self.fpga, PllBlockConfiguration.get_new_instance())
+            configurator.configure_primitive({**self.frequency_args, "f_in_1": result.f_in_1}, {}, {})
+            self.assertEqual(result.get_delta_score(), configurator.selected_candidate.delta_score)
+
+        # Parallel processes lead to the same ranking
+        parallel_ranking = rank_input_frequencies(self.fpga, pll, input_frequencies, self.frequency_args, {},
+                                                  processes=2)
+        self.assertEqual([result.f_in_1 for result in parallel_ranking], [result.f_in_1 for result in ranking])
+
+
+class ModelSearchTest(unittest.TestCase):
+    fpga_models = {key: fpga for key, fpga in FPGA_MODELS.items() if key != ("dummy", "dummy")}
+    frequency_args = {"f_in_1": 100, "f_out_0": 1000, "delta_0": 0.001}
+
+    def test_model_cost_key(self):
+        identifiers = [("virtex-7", "3"), ("artix-7", "2", "1.0V"), ("artix-7", "2LE", "0.9V"),
+                       ("kintex-7", "1M", "1.0V")]
+        self.assertEqual(sorted(identifiers, key=get_model_cost_key),
+                         [("artix-7", "2LE", "0.9V"), ("artix-7", "2", "1.0V"), ("kintex-7", "1M", "1.0V"),
+                          ("virtex-7", "3")])
+
+        # The family decides before the speed grade
+        identifiers = [("virtex-7", "1"), ("kintex-7", "1", "1.0V"), ("artix-7", "3", "1.0V"),
+                       ("kintex-7", "3", "1.0V"), ("artix-7", "1", "1.0V")]
+        self.assertEqual(sorted(identifiers, key=get_model_cost_key),
+                         [("artix-7", "1", "1.0V"), ("artix-7", "3", "1.0V"), ("kintex-7", "1", "1.0V"),
+                          ("kintex-7", "3", "1.0V"), ("virtex-7", "1")])
+        ranking = sorted(self.fpga_models, key=get_model_cost_key)
+        families = [identifier[0].split("-")[0] for identifier in ranking]
+        self.assertEqual(families, sorted(families, key=MODEL_FAMILY_COST_ORDER.index))
+
+    def test_limit_fingerprint(self):
+        artix, kintex = FPGA_MODELS[("artix-7", "1", "1.0V")], FPGA_MODELS[("kintex-7", "1", "1.0V")]
+        self.assertEqual(artix.get_limit_fingerprint("mmcm"), kintex.get_limit_fingerprint("mmcm"))
+        self.assertNotEqual(artix.get_limit_fingerprint("mmcm"),
+                            FPGA_MODELS[("artix-7", "3", "1.0V")].get_limit_fingerprint("mmcm"))
+
+    def test_rank_models(self):
+        mmcm = MmcmBlockConfiguration.get_new_instance()
+        ranking = rank_models(self.fpga_models, mmcm, self.frequency_args, {}, processes=1)
+        self.assertEqual(len(ranking), len(self.fpga_models))
+
+        # 1000 MHz need the fastest speed grade
+        cheapest_model = get_cheapest_model(ranking)
+        self.assertEqual(cheapest_model.identifier, ("kintex-7", "3", "1.0V"))
+
+        # Every result is the result of a normal configuration with that model
+        for result in ranking:
+            configurator = ClockingConfigurator(result.fpga, MmcmBlockConfiguration.get_new_instance())
+            configuration = configurator.configure_primitive(self.frequency_args, {}, {})
+            self.assertEqual(result.configuration is None, configuration is None)
+
+        artix_ranking = rank_models(self.fpga_models, mmcm, self.frequency_args, {}, model_names=["artix-7"],
+                                    processes=2)
+        self.assertTrue(all(result.identifier[0] == "artix-7" for result in artix_ranking))
+        self.assertIsNone(get_cheapest_model(artix_ranking))
+
+
+class PrimitiveRaceTest(unittest.TestCase):
+    fpga = FPGA_MODELS[("artix-7", "3", "1.0V")]
+
+    def test_race_primitives(self):
+        frequency_args = {"f_in_1": 100, "f_out_0": 133.7, "f_out_1": 245.76, "delta_0": 0.01, "delta_1": 0.01}
+        for processes in [1, 2]:
+            ranking = race_primitives(self.fpga, frequency_args, {}, processes=processes)
+            self.assertEqual({result.primitive.specification for result in ranking}, {"pll", "mmcm"})
+            self.assertFalse(any(result.cancelled for result in ranking))
+            self.assertLessEqual(ranking[0].get_delta_score(), ranking[1].get_delta_score())
+
+            # Every score is the score of a normal configuration with that primitive
+            for result in ranking:
+                configurator = ClockingConfigurator(self.fpga, result.primitive.get_new_instance())
+                configurator.configure_primitive(frequency_args, {}, {})
+                self.assertEqual(result.get_delta_score(), configurator.selected_candidate.delta_score)
+
+        # The output 6 is only available on the mmcm
+        ranking = race_primitives(self.fpga, {"f_in_1": 100, "f_out_0": 133.7, "f_out_6": 20}, {}, processes=2)
+        self.assertEqual(ranking[0].primitive.specification, "mmcm")
+        self.assertGreater(len(ranking[1].feasibility_issues), 0)
+
+        # So is the phase shift of output 6
+        for processes in [1, 2]:
+            ranking = race_primitives(self.fpga, {"f_in_1": 100, "f_out_0": 100}, {"phase_shift_6": 45},
+                                      processes=processes)
+            self.assertEqual(ranking[0].primitive.specification, "mmcm")
+            self.assertEqual([issue.index for issue in ranking[1].feasibility_issues], [6])
+
+        # Errors of the workers are raised instead of waiting for their results forever
+        for processes in [1, 2]:
+            with self.assertRaises(TypeError):
+                race_primitives(self.fpga, {"f_in_1": 100, "f_out_0": 100}, {}, {"unknown": True},
+                                processes=processes)
+
+    def test_race_policies(self):
+        # Both primitives reach 100 MHz exactly, the pll is preferred
+        for processes in [1, 2]:
+            ranking = race_primitives(self.fpga, {"f_in_1": 100, "f_out_0": 100}, {}, processes=processes)
+            self.assertEqual([result.primitive.specification for result in ranking], ["pll", "mmcm"])
+            self.assertEqual([result.get_delta_score() for result in ranking], [0, 0])
+
+            ranking = race_primitives(self.fpga, {"f_in_1": 100, "f_out_0": 100}, {}, policy=CANCEL_ON_EXACT,
+                                      processes=processes)
+            self.assertEqual(ranking[0].primitive.specification, "pll")
+            self.assertEqual(ranking[0].get_delta_score(), 0)
+            self.assertFalse(ranking[0].cancelled)
+            # The mmcm is only cancelled if it has not reported yet
+            if processes == 1:
+                self.assertTrue(ranking[1].cancelled)
+
+        # Exact is decided by the errors, the penalties of the scoring function raise the score above 0
+        ranking = race_primitives(self.fpga, {"f_in_1": 100, "f_out_0": 100}, {}, policy=CANCEL_ON_EXACT,
+                                  processes=1, scoring_function=WeightedScore(vco_penalty=10, d_penalty=1))
+        self.assertGreater(ranking[0].get_delta_score(), 0)
+        self.assertEqual([result.cancelled for result in ranking], [False, True])
+
+        # An exact mmcm that reports first does not cancel the pll
+        with mock.patch("fpga_search.solve_request_into_queue", solve_request_with_slow_pll):
+            ranking = race_primitives(self.fpga, {"f_in_1": 100, "f_out_0": 100}, {}, policy=CANCEL_ON_EXACT,
+                                      processes=2)
+        self.assertEqual([result.primitive.specification for result in ranking], ["pll", "mmcm"])
+        self.assertEqual([result.get_delta_score() for result in ranking], [0, 0])
+        self.assertFalse(any(result.cancelled for result in ranking))
+
+        with self.assertRaises(ValueError):
+            race_primitives(self.fpga, {"f_in_1": 100, "f_out_0": 100}, {}, policy="never")
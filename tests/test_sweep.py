@@ -0,0 +1,62 @@
+"""
+Tests for the frequency sweep
+"""
+import unittest
+from fpga_globals import FPGA_MODELS
+from fpga_primitives import PllBlockConfiguration, MmcmBlockConfiguration
+from fpga_configurator import ClockingConfigurator
+from fpga_search import get_input_frequency_candidates
+from fpga_sweep import *
+
+
+class FrequencySweepTest(unittest.TestCase):
+    fpga = FPGA_MODELS[("artix-7", "3", "1.0V")]
+
+    def assert_same_as_configurator(self, primitive: ClockBlockConfiguration, frequency_args: dict, index: int,
+                                    f_outs: list, phase_shift_args: dict = None, use_relative_error: bool = False):
+        results = list(sweep_output_frequency(self.fpga, primitive, frequency_args, index, f_outs,
+                                              phase_shift_args=phase_shift_args,
+                                              use_relative_error=use_relative_error))
+        self.assertEqual([result.f_out for result in results], f_outs)
+
+        for result in results:
+            configurator = ClockingConfigurator(self.fpga, primitive.get_new_instance())
+            configuration = configurator.configure_primitive({**frequency_args, f"f_out_{index}": result.f_out},
+                                                             {} if phase_shift_args is None else phase_shift_args,
+                                                             {}, use_relative_error=use_relative_error)
+            if configuration is None:
+                self.assertIsNone(result.configuration)
+            else:
+                self.assertEqual(str(result.configuration), str(configuration))
+                self.assertEqual(result.configuration.delta_score, configuration.delta_score)
+        return results
+
+    def test_sweep(self):
+        f_outs = get_input_frequency_candidates(100, 102, 0.5)
+        for primitive in [PllBlockConfiguration.get_new_instance(), MmcmBlockConfiguration.get_new_instance()]:
+            self.assert_same_as_configurator(primitive, {"f_in_1": 100, "f_out_0": 100}, 0, f_outs)
+            self.assert_same_as_configurator(primitive, {"f_in_1": 125, "f_out_0": 100, "f_out_1": 33.3,
+                                                         "f_out_2": 48, "delta_0": 0.01, "delta_2": 0.001}, 0,
+                                             f_outs, use_relative_error=True)
+            self.assert_same_as_configurator(primitive, {"f_in_1": 12.288, "f_out_0": 245.76, "f_out_3": 100,
+                                                         "delta_0": 0.0001, "delta_3": 0.001}, 3, f_outs)
+
+        # Targets beyond the limitations are rejected by the feasibility pre-check
+        results = self.assert_same_as_configurator(MmcmBlockConfiguration.get_new_instance(),
+                                                   {"f_in_1": 100, "f_out_0": 100}, 0, [1000, 2000, 3000])
+        self.assertGreater(len(results[-1].feasibility_issues), 0)
+
+    def test_sweep_with_configurator_update(self):
+        # Phase shifts and the cascade are solved by "ClockingConfigurator.update"
+        mmcm = MmcmBlockConfiguration.get_new_instance()
+        self.assert_same_as_configurator(mmcm, {"f_in_1": 100, "f_out_0": 100, "f_out_1": 50, "delta_0": 0.001,
+                                                "delta_1": 0.001}, 1, [40, 45, 50],
+                                         phase_shift_args={"phase_shift_1": 90})
+        self.assertTrue(FrequencySweep(self.fpga, mmcm, {"f_in_1": 100, "f_out_0": 100, "f_out_4": 5,
+                                                         "f_out_4_cascade": True}, 0).use_configurator_update)
+
+    def test_sweep_errors(self):
+        with self.assertRaises(ValueError):
+            FrequencySweep(self.fpga, PllBlockConfiguration.get_new_instance(), {"f_in_1": 100, "f_out_0": 100}, 6)
+        with self.assertRaises(ValueError):
+            FrequencySweep(self.fpga, MmcmBlockConfiguration.get_new_instance(), {"f_in_1": 100}, 1)
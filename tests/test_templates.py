@@ -0,0 +1,83 @@
+"""
+Tests for the generation of verilog and VHDL modules
+"""
+import os
+import tempfile
+import unittest
+from fpga_globals import FPGA_MODELS
+from fpga_primitives import PllBlockConfiguration, MmcmBlockConfiguration
+from fpga_configurator import ClockingConfigurator
+from fpga_templates import *
+
+
+class TemplateTest(unittest.TestCase):
+    fpga = FPGA_MODELS[("artix-7", "3", "1.0V")]
+
+    def get_configuration(self, primitive, other_args: dict = None):
+        configurator = ClockingConfigurator(self.fpga, primitive.get_new_instance())
+        return configurator.configure_primitive({"f_in_1": 100, "f_out_0": 133.7, "f_out_1": 50},
+                                                {"phase_shift_1": 90}, {} if other_args is None else other_args)
+
+    def test_verilog_module(self):
+        configuration = self.get_configuration(PllBlockConfiguration, {"startup_wait": True})
+        module = generate_module(configuration, "clk_main")
+
+        self.assertTrue(module.startswith("`timescale 1ps/1ps\nmodule clk_main\n\t(\n\t\tinput\tclkin1,\n"))
+        self.assertIn(str(configuration), module)
+        self.assertIn("\t\t.CLKIN1(clkin1),\n", module)
+        self.assertTrue(module.endswith("endmodule"))
+        self.assertEqual(configuration.generate_template("clk_main"), module)
+
+        renamed = generate_module(configuration, "clk_main", port_names={"clkin1": "sys_clk", "locked": "done"})
+        self.assertIn("\t\tinput\tsys_clk,\n", renamed)
+        self.assertIn("\t\t.CLKIN1(sys_clk),\n", renamed)
+        self.assertIn("\t\t.LOCKED(done),\n", renamed)
+        self.assertNotIn("clkin1", renamed)
+
+    def test_vhdl_module(self):
+        configuration = self.get_configuration(MmcmBlockConfiguration, {"startup_wait": True, "bandwidth": "HIGH"})
+        module = generate_module(configuration, "clk_main", VHDL)
+
+        self.assertIn("entity clk_main is\n", module)
+        self.assertIn("architecture rtl of clk_main is\n", module)
+        self.assertIn("\tMMCME2_BASE_inst : MMCME2_BASE\n", module)
+        self.assertIn("\t\t\tCLKIN1 => clkin1,\n", module)
+        # Generics are written as literals of their VHDL types
+        self.assertIn("\t\t\tSTARTUP_WAIT => TRUE", module)
+        self.assertIn("\t\t\tBANDWIDTH => \"HIGH\"", module)
+        self.assertIn(f"\t\t\tCLKFBOUT_MULT_F => {float(configuration.m.value)}", module)
+        if configuration.d.value != 1:
+            self.assertIn(f"\t\t\tDIVCLK_DIVIDE => {int(configuration.d.value)}", module)
+
+    def test_identifiers(self):
+        configuration = self.get_configuration(PllBlockConfiguration)
+        for name in ["1clk", "clk-main", "clk__main", "clk_", ""]:
+            with self.assertRaises(ValueError):
+                generate_module(configuration, name)
+        with self.assertRaises(ValueError):
+            generate_module(configuration, port_names={"clkout6": "clk"})
+        with self.assertRaises(ValueError):
+            generate_module(configuration, port_names={"clkout0": "clkout1"})
+        with self.assertRaises(ValueError):
+            generate_module(configuration, language="systemc")
+
+    def test_modules(self):
+        pll = self.get_configuration(PllBlockConfiguration)
+        mmcm = self.get_configuration(MmcmBlockConfiguration)
+        modules = [("clk_a", pll), ("clk_b", mmcm)]
+
+        content = generate_modules(modules)
+        self.assertEqual(content, generate_module(pll, "clk_a") + "\n\n" + generate_module(mmcm, "clk_b") + "\n")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "clocks.vhd")
+            write_modules(path, modules, VHDL)
+            with open(path) as file:
+                self.assertEqual(file.read(), generate_modules(modules, VHDL))
+
+        with self.assertRaises(ValueError):
+            generate_modules([("clk_a", pll), ("clk_a", mmcm)])
+        # VHDL identifiers are case insensitive
+        generate_modules([("clk_a", pll), ("CLK_A", mmcm)])
+        with self.assertRaises(ValueError):
+            generate_modules([("clk_a", pll), ("CLK_A", mmcm)], VHDL)
@@ -101,3 +101,18 @@ class TerminalInterfaceTest(unittest.TestCase):
             for args in faulty_arg_list:
                 s, code = run_script_with_args(self.args + args)
                 self.assertNotEqual(code, 0, msg=f"args: {args}\n script output: {s}")
+
+    def test_margin_without_configuration(self):
+        s, code = run_script_with_args(self.args + ["-fin1", "100", "-fout0", "133.7", "-fdelta0", "0.0000001",
+                                                    "-mppm", "50"])
+        self.assertEqual(code, 0, msg=s)
+        self.assertIn("No configuration", s)
+
+    def test_base_mode_only_args(self):
+        for search in [["-cmtb", "auto"], ["-cm"], ["-finc", "100", "125"], ["-finr", "100", "125", "25"]]:
+            for args in [["-pf"], ["-da", "2"], ["-mppm", "5"], ["-vcow", "600", "800"], ["-mw", "2", "8"],
+                         ["-dw", "1", "1"], ["-ratio", "0:1"], ["-oc"], ["-pf", "-oc"]]:
+                s, code = run_script_with_args(self.args + ["-fin1", "100", "-fout0", "100", "-fout1", "50"] +
+                                               search + args)
+                self.assertEqual(code, 1, msg=f"args: {search + args}\n script output: {s}")
+                self.assertIn("can not be combined", s)
@@ -1,6 +1,8 @@
 """
 This modules contains small and independent utility functions like the relative error function
 """
+from math import gcd
+
 
 def frequency_to_period_ns_precision(frequency_in_mhz: float) -> float:
     return (1 / frequency_in_mhz) * 1000
@@ -16,3 +18,16 @@ def relative_error(target_value, actual_value):
 
 def absolute_error(target_value, actual_value):
     return abs(target_value - actual_value)
+
+
+def exact_ratio(numerator, denominator) -> tuple:
+    """
+    Floats are converted without rounding, so equal ratios always have the same key (e.g. 2 / 5 and 4.0 / 10).
+    :return: The ratio as reduced tuple (numerator, denominator) of integers
+    """
+    numerator_numerator, numerator_denominator = numerator.as_integer_ratio()
+    denominator_numerator, denominator_denominator = denominator.as_integer_ratio()
+    ratio_numerator = numerator_numerator * denominator_denominator
+    ratio_denominator = numerator_denominator * denominator_numerator
+    divisor = gcd(ratio_numerator, ratio_denominator)
+    return ratio_numerator // divisor, ratio_denominator // divisor